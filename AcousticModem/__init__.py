@@ -1,12 +1,62 @@
-#!/usr/bin/env python
-# -- coding utf-8 --
-"""
-@file   __init__.py
-@author Hamilton Kibbe
-"""
-
-from AcousticModem import ATM900
-
-__version__ = 1.0
-__author__ = 'Hamilton Kibbe'
-__doc__ = ATM900.__doc__
\ No newline at end of file
+#!/usr/bin/env python
+# -- coding utf-8 --
+"""
+@file   __init__.py
+@author Hamilton Kibbe
+"""
+
+from .AcousticModem import ATM900
+from .errors import ModemError, ModeError, NoResponseError, CommandError
+
+__version__ = 1.0
+__author__ = 'Hamilton Kibbe'
+__doc__ = ATM900.__doc__
+
+# Optional subsystems are only imported when first used, keeping
+# ``import AcousticModem`` down to the core modem class.
+_LAZY = {
+    'NeighbourTable': 'routing',
+    'Router': 'routing',
+    'discover': 'discovery',
+    'NodeRegistry': 'registry',
+    'RemoteCache': 'registry',
+    'CommandQueue': 'commandqueue',
+    'Demultiplexer': 'demux',
+    'openTransport': 'transport',
+    'LoopbackTransport': 'transport',
+    'ReconnectingTransport': 'transport',
+    'TCPTransport': 'transport',
+    'TransportPool': 'transport',
+    'ModemBroker': 'broker',
+    'BrokerClient': 'broker',
+    'Survey': 'survey',
+    'SurveyTable': 'survey',
+    'PowerOptimiser': 'power',
+    'Session': 'session',
+    'SessionLimits': 'session',
+    'Schema': 'telemetry',
+    'TelemetryCodec': 'telemetry',
+    'TelemetryDecoder': 'telemetry',
+    'calibrateGuard': 'guard',
+    'PortProfiles': 'profiles',
+    'FountainEncoder': 'fec',
+    'FountainDecoder': 'fec',
+    'Outbox': 'outbox',
+    'Simulator': 'simulator',
+    'Channel': 'simulator',
+    'BaudBoost': 'boost',
+    'DualPort': 'ports',
+    'LinkProfiler': 'profiler',
+    'ResultStore': 'profiler',
+    'loopbackTest': 'selftest',
+}
+
+
+def __getattr__(name):
+    # Python 3.7+ only; on older interpreters import the submodule directly
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    from importlib import import_module
+    value = getattr(import_module('.' + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.boost
+    ~~~~~~~~~~~~~~~~~~~
+
+    Temporary serial baud rate increases for bulk transfers.
+
+    Host links are usually left at a conservative ``P1Baud`` such as 9600,
+    which throttles log downloads and long register dumps. A
+    :class:`BaudBoost` raises the rate to the highest one that passes a
+    verification round trip, and puts the original rate back afterwards::
+
+        with BaudBoost(modem):
+            registers = modem.remoteRegister(5)
+
+    The original rate is only restored when the block exits. Nothing runs
+    on a timer meanwhile, since the modem can't be used from two threads at
+    once: a block that hangs keeps the raised rate, and a host that dies
+    inside one leaves the modem at it. A port profile, if kept, records
+    the raised rate, and :meth:`ATM900.recover` finds it in any case.
+
+    :license: MIT
+"""
+from .errors import ModeError, ModemError, NoResponseError
+
+# Failures that mean the link has been lost rather than a command refused
+_LOST = (ModeError, NoResponseError)
+
+
+class BaudBoost(object):
+    """ Context manager running a block at the fastest stable baud rate.
+
+    If the block raises because the link was lost, the modem is searched
+    for and returned to the original rate on exit.
+
+    :ivar original: The rate to return to.
+    :ivar rate: The rate in use inside the block.
+    :ivar fellBack: True if the modem had to be searched for after a
+        raised rate failed.
+    """
+    def __init__(self, modem, rates=None, checks=3):
+        """
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param rates: Rates to try, fastest first; defaults to the modem's
+            available rates above the current one.
+        :type rates: list.
+        :param checks: Round trips a rate must pass before it is used.
+        :type checks: int.
+        """
+        self.modem = modem
+        self.rates = rates
+        self.checks = checks
+        self.original = None
+        self.rate = None
+        self.fellBack = False
+
+
+    def __enter__(self):
+        modem = self.modem
+        self.original = modem.baud_rate
+        self.rate = self.original
+        self.fellBack = False
+        rates = self.rates
+        if rates is None:
+            rates = sorted(modem.available_baud_rates, reverse=True)
+        for rate in rates:
+            if rate <= self.original:
+                continue
+            try:
+                modem.P1Baud = rate
+            except ModemError:
+                pass
+            else:
+                if self._verify(rate):
+                    self.rate = rate
+                    return self
+            # Too fast for the cable
+            self._restore(True)
+        return self
+
+
+    def __exit__(self, kind, error, traceback):
+        # Recovery on exit: a link lost at the raised rate is found again
+        # and put back to the original rate
+        self._restore(kind is not None and issubclass(kind, _LOST))
+        return False
+
+
+    def run(self, operation, *args, **kwargs):
+        """ Call ``operation(*args, **kwargs)`` at the raised rate.
+
+        If the link is lost during the call, the original rate is restored
+        and the call repeated once at it.
+
+        :returns: The result of 'operation'.
+        :raises: ModemError
+        """
+        try:
+            with self:
+                return operation(*args, **kwargs)
+        except _LOST:
+            if self.rate == self.original:
+                raise
+        return operation(*args, **kwargs)
+
+
+    def _verify(self, rate):
+        """ Check the modem answers correctly at 'rate'.
+        """
+        try:
+            for check in range(self.checks):
+                if self.modem.P1Baud != rate:
+                    return False
+        except (ModemError, ValueError):
+            return False
+        return True
+
+
+    def _restore(self, lost=False):
+        """ Return the modem to the original rate.
+
+        :param lost: The link has failed, so the rate the modem is at is
+            unknown.
+        :type lost: bool.
+        :raises: ModeError
+        """
+        modem = self.modem
+        if modem.baud_rate == self.original and not lost:
+            return
+        if modem.baud_rate != self.original:
+            try:
+                # Commands may get through at a rate too fast for the replies
+                modem.P1Baud = self.original
+            except ModemError:
+                pass
+        if self._verify(self.original):
+            return
+        self.fellBack = True
+        modem.recover()
+        if modem.baud_rate != self.original:
+            modem.P1Baud = self.original
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.broker
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Share one modem between several processes.
+
+    A :class:`ModemBroker` owns the ATM900 and serves clients over a local
+    TCP or Unix socket using newline delimited JSON. All commands pass
+    through one :class:`~AcousticModem.commandqueue.CommandQueue`, identical
+    concurrent property reads are answered by a single modem round trip, and
+    data received from the modem is fanned out to every subscribed client.
+    Received data is only read while the modem is online, or once commands
+    have stopped for a while, so that polling for it doesn't switch modes
+    between every command.
+
+    Requests look like ``{"id": 1, "op": "get", "name": "temp"}`` with ``op``
+    one of ``get``, ``set``, ``call``, ``write`` or ``subscribe``. Replies
+    carry the same id and either ``result`` or ``error``; received data is
+    pushed as ``{"event": "data", "data": <base64>}``. Only the modem's
+    properties and the methods listed in :data:`COMMANDS` are available to
+    clients; anything touching the host, such as file transfers, closing
+    the port or rebooting, is not.
+
+    :license: MIT
+"""
+import base64
+import json
+import socket
+import threading
+from time import sleep, time
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from .commandqueue import CommandQueue, HIGH, LOW, NORMAL
+from .framing import toBytes
+
+
+# Modem methods clients may call
+COMMANDS = ('linkTest', 'rateTest', 'remotePower', 'remoteRate',
+            'readRegister', 'remoteRegister', 'setRegister', 'writeSettings',
+            'dial', 'hangUp', 'attention')
+
+_TEXT = (type(''), type(u''))
+
+
+def _encode(message):
+    return (json.dumps(message) + '\n').encode('utf-8')
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # Replies and events a slow client may fall behind by
+    backlog = 1024
+
+    def setup(self):
+        socketserver.StreamRequestHandler.setup(self)
+        self.closed = False
+        # Written by a thread of the client's own, so that a slow client
+        # never holds up the modem queue
+        self.outgoing = queue.Queue(self.backlog)
+        self.writer = threading.Thread(target=self._write)
+        self.writer.daemon = True
+        self.writer.start()
+
+
+    def send(self, message):
+        """ Queue a message for the client.
+
+        :raises: IOError
+        """
+        if self.closed:
+            raise IOError('Client has gone')
+        try:
+            self.outgoing.put_nowait(_encode(message))
+        except queue.Full:
+            self.closed = True
+            raise IOError('Client is not keeping up')
+
+
+    def _write(self):
+        while True:
+            data = self.outgoing.get()
+            if data is None:
+                return
+            try:
+                self.wfile.write(data)
+                self.wfile.flush()
+            except (IOError, OSError, ValueError):
+                self.closed = True
+                return
+
+
+    def handle(self):
+        broker = self.server.broker
+        try:
+            for line in iter(self.rfile.readline, b''):
+                try:
+                    request = json.loads(line.decode('utf-8'))
+                except ValueError:
+                    self.send({'error': 'Malformed request'})
+                    continue
+                try:
+                    broker._handle(self, request)
+                except (AttributeError, KeyError, TypeError,
+                        ValueError) as error:
+                    self.send({'id': getattr(request, 'get', {}.get)('id'),
+                               'error': 'Invalid request: %s' % error})
+        except (IOError, OSError):
+            pass
+        finally:
+            broker._unsubscribe(self)
+
+
+    def finish(self):
+        self.closed = True
+        try:
+            self.outgoing.put_nowait(None)
+        except queue.Full:
+            pass
+        self.writer.join(1.0)
+        socketserver.StreamRequestHandler.finish(self)
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class _UnixServer(socketserver.ThreadingMixIn,
+                      socketserver.UnixStreamServer):
+        daemon_threads = True
+
+
+def _members(cls):
+    """ (name, attribute) of the public attributes of 'cls' and its bases.
+    """
+    seen = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if not name.startswith('_'):
+                seen[name] = value
+    return seen.items()
+
+
+class ModemBroker(object):
+    """ Serves one modem to many local clients.
+    """
+    def __init__(self, modem, address=('127.0.0.1', 5900), pollInterval=0.1,
+                 resumeAfter=2.0, commands=COMMANDS):
+        """
+        :param modem: The modem to share.
+        :type modem: ATM900.
+        :param address: (host, port) for TCP, or a filesystem path for a
+            Unix socket.
+        :type address: tuple, str.
+        :param pollInterval: Seconds between reads of received data while
+            any client is subscribed.
+        :type pollInterval: float.
+        :param resumeAfter: Seconds without commands after which reading
+            received data takes the modem back online.
+        :type resumeAfter: float.
+        :param commands: Names of the modem methods clients may call.
+        :type commands: tuple.
+        """
+        self.modem = modem
+        self.commands = frozenset(commands)
+        # Clients may read the modem's properties and set the writable ones
+        properties = [(name, value) for name, value in
+                      _members(type(modem)) if isinstance(value, property)]
+        self.readable = frozenset(name for name, value in properties)
+        self.writable = frozenset(name for name, value in properties
+                                  if value.fset is not None)
+        self.address = address
+        self.pollInterval = pollInterval
+        self.resumeAfter = resumeAfter
+        self.queue = CommandQueue(modem)
+        self.roundTrips = 0
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._subscribers = set()
+        self._running = False
+        # When the last client command finished
+        self._lastCommand = 0.0
+        if isinstance(address, tuple):
+            self._server = _TCPServer(address, _Handler)
+            self.address = self._server.server_address
+        else:
+            self._server = _UnixServer(address, _Handler)
+        self._server.broker = self
+        self._threads = []
+
+
+    def start(self):
+        """ Start serving in background threads.
+        """
+        self._running = True
+        for target in (self._server.serve_forever, self._poll):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+
+    def serveForever(self):
+        """ Serve in the calling thread until :meth:`close` is called.
+        """
+        self._running = True
+        poller = threading.Thread(target=self._poll)
+        poller.daemon = True
+        poller.start()
+        self._server.serve_forever()
+
+
+    def close(self):
+        """ Stop serving and release the modem queue.
+        """
+        self._running = False
+        self._server.shutdown()
+        self._server.server_close()
+        self.queue.close()
+
+
+    def get(self, name):
+        """ Read a modem property, sharing the round trip with any identical
+        read already in progress.
+
+        :rtype: Future.
+        """
+        key = ('get', name)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self.queue.submit(self._read, (name,))
+                self._inflight[key] = future
+                future.addDoneCallback(lambda f: self._done(key))
+        return future
+
+
+    def _read(self, modem, name):
+        self.roundTrips += 1
+        return getattr(modem, name)
+
+
+    def _done(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+
+    def _handle(self, client, request):
+        ident = request.get('id')
+        op = request.get('op')
+        name = request.get('name', '')
+        allowed = {'get': self.readable, 'set': self.writable,
+                   'call': self.commands}.get(op)
+        if not isinstance(name, _TEXT) or \
+                (allowed is not None and name not in allowed):
+            client.send({'id': ident, 'error': 'Invalid name %r' % (name,)})
+            return
+        if op == 'get':
+            future = self.get(name)
+        elif op == 'set':
+            future = self.queue.submit(
+                lambda modem: setattr(modem, name, request.get('value')),
+                priority=HIGH)
+        elif op == 'call':
+            future = self.queue.submit(name, request.get('args', ()),
+                                       request.get('kwargs'),
+                                       request.get('priority', NORMAL))
+        elif op == 'write':
+            data = base64.b64decode(request.get('data', ''))
+            future = self.queue.submit('write', (data,), priority=HIGH)
+        elif op == 'subscribe':
+            with self._lock:
+                self._subscribers.add(client)
+            client.send({'id': ident, 'result': True})
+            return
+        else:
+            client.send({'id': ident, 'error': 'Unknown op %r' % op})
+            return
+        self._lastCommand = time()
+        future.addDoneCallback(lambda f: self._reply(client, ident, f))
+
+
+    def _reply(self, client, ident, future):
+        self._lastCommand = time()
+        if future.cancelled():
+            self._send(client, {'id': ident,
+                                'error': 'Cancelled: the broker is closing'})
+            return
+        error = future.exception()
+        if error is not None:
+            message = {'id': ident, 'error': '%s: %s' %
+                       (type(error).__name__, error)}
+        else:
+            message = {'id': ident, 'result': future.result()}
+        try:
+            _encode(message)
+        except (TypeError, ValueError):
+            message = {'id': ident, 'result': repr(future.result())}
+        self._send(client, message)
+
+
+    def _send(self, client, message):
+        try:
+            client.send(message)
+        except (IOError, OSError):
+            self._unsubscribe(client)
+
+
+    def _receive(self, modem):
+        """ Read received data if that doesn't cost a mode switch, or
+        commands have stopped.
+        """
+        if modem.online or time() - self._lastCommand >= self.resumeAfter:
+            return modem.read()
+        return None
+
+
+    def _unsubscribe(self, client):
+        with self._lock:
+            self._subscribers.discard(client)
+
+
+    def _poll(self):
+        """ Fan received data out to subscribers.
+        """
+        while self._running:
+            sleep(self.pollInterval)
+            if not self._subscribers or self.queue.pending():
+                continue
+            try:
+                data = self.queue.submit(self._receive,
+                                         priority=LOW).result()
+            except Exception:
+                continue
+            if not data:
+                continue
+            message = {'event': 'data',
+                       'data': base64.b64encode(toBytes(data)).decode('ascii')}
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for client in subscribers:
+                self._send(client, message)
+
+
+class BrokerClient(object):
+    """ Client side of a :class:`ModemBroker`.
+    """
+    def __init__(self, address=('127.0.0.1', 5900), timeout=60.0):
+        """
+        :param address: The broker's (host, port) or Unix socket path.
+        :type address: tuple, str.
+        :param timeout: Seconds to wait for each reply.
+        :type timeout: float.
+        """
+        if isinstance(address, tuple):
+            self._socket = socket.create_connection(address)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(address)
+        self.timeout = timeout
+        self._file = self._socket.makefile('rb')
+        self._lock = threading.Lock()
+        self._next = 0
+        self._waiting = {}
+        self._onData = []
+        reader = threading.Thread(target=self._read)
+        reader.daemon = True
+        reader.start()
+
+
+    def close(self):
+        self._socket.close()
+
+
+    def get(self, name):
+        """ Read a modem property, e.g. ``client.get('temp')``.
+        """
+        return self._request({'op': 'get', 'name': name})
+
+
+    def set(self, name, value):
+        """ Set a modem property, e.g. ``client.set('TxPower', 3)``.
+        """
+        return self._request({'op': 'set', 'name': name, 'value': value})
+
+
+    def call(self, name, *args):
+        """ Call a modem method, e.g. ``client.call('linkTest', 5)``.
+        """
+        return self._request({'op': 'call', 'name': name, 'args': args})
+
+
+    def write(self, data):
+        """ Transmit data over the acoustic link.
+        """
+        data = base64.b64encode(toBytes(data)).decode('ascii')
+        return self._request({'op': 'write', 'data': data})
+
+
+    def subscribe(self, callback):
+        """ Call ``callback(data)`` with data received by the modem.
+        """
+        self._onData.append(callback)
+        if len(self._onData) == 1:
+            self._request({'op': 'subscribe'})
+
+
+    def _request(self, message):
+        event = threading.Event()
+        with self._lock:
+            self._next += 1
+            ident = message['id'] = self._next
+            self._waiting[ident] = [event, None]
+            self._socket.sendall(_encode(message))
+        if not event.wait(self.timeout):
+            with self._lock:
+                self._waiting.pop(ident, None)
+            raise IOError('No reply from modem broker')
+        reply = self._waiting.pop(ident)[1]
+        if 'error' in reply:
+            raise IOError(reply['error'])
+        return reply.get('result')
+
+
+    def _read(self):
+        for line in iter(self._file.readline, b''):
+            message = json.loads(line.decode('utf-8'))
+            if message.get('event') == 'data':
+                data = base64.b64decode(message['data'])
+                for callback in self._onData:
+                    callback(data)
+                continue
+            with self._lock:
+                waiter = self._waiting.get(message.get('id'))
+            if waiter is not None:
+                waiter[1] = message
+                waiter[0].set()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.commandqueue
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Prioritised command execution for a single modem.
+
+    A :class:`CommandQueue` owns one worker thread that runs commands against
+    its modem strictly one at a time, most urgent first. Long jobs written as
+    generators yield between acoustic operations; at every yield the worker
+    runs any more urgent commands that have arrived before resuming the job.
+
+    :license: MIT
+"""
+import heapq
+import threading
+import types
+from time import time
+
+URGENT = 0
+HIGH = 10
+NORMAL = 50
+LOW = 90
+
+
+class CancelledError(Exception):
+    """ The command was cancelled before it ran.
+    """
+
+
+class DeadlineExceeded(IOError):
+    """ The command's deadline passed before it could run.
+    """
+
+
+class Future(object):
+    """ The pending result of a queued command.
+    """
+    def __init__(self):
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False
+        self._cancelled = False
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+
+    def cancel(self):
+        """ Cancel the command if it hasn't started.
+
+        :returns: True if the command will not run.
+        :rtype: bool.
+        """
+        with self._lock:
+            if self._running or self._done.is_set():
+                return self._cancelled
+            self._cancelled = True
+        self._finish()
+        return True
+
+
+    def cancelled(self):
+        return self._cancelled
+
+
+    def running(self):
+        return self._running and not self._done.is_set()
+
+
+    def done(self):
+        return self._done.is_set()
+
+
+    def result(self, timeout=None):
+        """ Wait for and return the command's result.
+
+        :raises: CancelledError, DeadlineExceeded, or whatever the command
+            raised.
+        """
+        self.exception(timeout)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+    def exception(self, timeout=None):
+        """ Wait for the command and return the exception it raised, if any.
+        """
+        if not self._done.wait(timeout):
+            raise IOError('Timed out waiting for command result')
+        if self._cancelled:
+            raise CancelledError()
+        return self._exception
+
+
+    def addDoneCallback(self, callback):
+        """ Call 'callback(future)' when the command completes.
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+    def _start(self):
+        with self._lock:
+            if self._cancelled:
+                return False
+            self._running = True
+            return True
+
+
+    def _setResult(self, result):
+        self._result = result
+        self._finish()
+
+
+    def _setException(self, exception):
+        self._exception = exception
+        self._finish()
+
+
+    def _finish(self):
+        with self._lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class _Command(object):
+    def __init__(self, command, args, kwargs, priority, deadline):
+        self.command = command
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.deadline = deadline
+        self.future = Future()
+
+
+class CommandQueue(object):
+    """ Per-modem priority command queue.
+
+    Lower priority numbers run first; commands of equal priority run in
+    submission order.
+    """
+    def __init__(self, modem, start=True, maxPending=None):
+        """
+        :param modem: The modem the queue serialises access to.
+        :type modem: ATM900.
+        :param start: Start the worker thread immediately.
+        :type start: bool.
+        :param maxPending: Most commands allowed to wait at once; further
+            submissions are refused. Unbounded if not given.
+        :type maxPending: int.
+        """
+        self.modem = modem
+        self.maxPending = maxPending
+        self._heap = []
+        self._count = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._thread = None
+        if start:
+            self.start()
+
+
+    def start(self):
+        """ Start the worker thread.
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work)
+            self._thread.daemon = True
+            self._thread.start()
+
+
+    def submit(self, command, args=(), kwargs=None, priority=NORMAL,
+               deadline=None):
+        """ Queue a command.
+
+        :param command: A modem method or property name such as
+            ``'linkTest'`` or ``'temp'``, or a callable taking the modem as
+            its first argument. A generator function is run as a pre-emptible
+            job whose result is the last value it yields.
+        :type command: str, callable.
+        :param args: Positional arguments for the command.
+        :type args: tuple.
+        :param kwargs: Keyword arguments for the command.
+        :type kwargs: dict.
+        :param priority: URGENT, HIGH, NORMAL, LOW or any int.
+        :type priority: int.
+        :param deadline: Absolute time (as ``time.time()``) after which the
+            command is abandoned if it hasn't started.
+        :type deadline: float.
+        :returns: The command's future.
+        :rtype: Future.
+        :raises: IOError
+        """
+        item = _Command(command, tuple(args), dict(kwargs or {}), priority,
+                        deadline)
+        with self._condition:
+            if self._closed:
+                raise IOError('Command queue is closed')
+            if self.maxPending is not None and len(self._heap) >= self.maxPending:
+                self._heap = [entry for entry in self._heap
+                              if not entry[2].future.cancelled()]
+                heapq.heapify(self._heap)
+                if len(self._heap) >= self.maxPending:
+                    raise IOError('Command queue is full')
+            self._count += 1
+            heapq.heappush(self._heap, (priority, self._count, item))
+            self._condition.notify()
+        return item.future
+
+
+    def cancelPending(self, priority=None):
+        """ Cancel queued commands that haven't started.
+
+        :param priority: Only cancel commands at this priority or less urgent.
+        :type priority: int.
+        :returns: The number of commands cancelled.
+        :rtype: int.
+        """
+        with self._condition:
+            items = [entry[2] for entry in self._heap
+                     if priority is None or entry[0] >= priority]
+        return len([item for item in items if item.future.cancel()])
+
+
+    def pending(self):
+        """ Number of commands waiting to run.
+
+        :rtype: int.
+        """
+        with self._condition:
+            return len([entry for entry in self._heap
+                        if not entry[2].future.cancelled()])
+
+
+    def reset(self):
+        """ Cancel every queued command and release the queue's memory.
+
+        :returns: The number of commands cancelled.
+        :rtype: int.
+        """
+        cancelled = self.cancelPending()
+        with self._condition:
+            self._heap = [entry for entry in self._heap
+                          if not entry[2].future.cancelled()]
+            heapq.heapify(self._heap)
+        return cancelled
+
+
+    def buffers(self):
+        """ The queue's buffers by name, for memory reports.
+
+        :rtype: dict.
+        """
+        return {'heap': self._heap}
+
+
+    def close(self, wait=True):
+        """ Stop accepting commands and cancel those still queued.
+
+        :param wait: Wait for the running command to finish.
+        :type wait: bool.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self.cancelPending()
+        if wait and self._thread is not None:
+            self._thread.join()
+
+
+    def _next(self, below=None):
+        """ Pop the next runnable command, optionally only if more urgent
+        than priority 'below'. Caller holds the condition.
+        """
+        while self._heap:
+            if below is not None and self._heap[0][0] >= below:
+                return None
+            item = heapq.heappop(self._heap)[2]
+            if not item.future.cancelled():
+                return item
+        return None
+
+
+    def _work(self):
+        while True:
+            with self._condition:
+                item = self._next()
+                while item is None and not self._closed:
+                    self._condition.wait()
+                    item = self._next()
+                if item is None:
+                    return
+            self._run(item)
+
+
+    def _preempt(self, priority):
+        """ Run everything more urgent than 'priority' that is queued.
+        """
+        while True:
+            with self._condition:
+                item = self._next(priority)
+            if item is None:
+                return
+            self._run(item)
+
+
+    def _run(self, item):
+        future = item.future
+        if item.deadline is not None and time() > item.deadline:
+            if future._start():
+                future._setException(DeadlineExceeded(
+                    'Command deadline passed before it could run'))
+            return
+        if not future._start():
+            return
+        try:
+            if callable(item.command):
+                result = item.command(self.modem, *item.args, **item.kwargs)
+            else:
+                result = getattr(self.modem, item.command)
+                if item.args or item.kwargs or callable(result):
+                    result = result(*item.args, **item.kwargs)
+            if isinstance(result, types.GeneratorType):
+                last = None
+                for last in result:
+                    self._preempt(item.priority)
+                result = last
+        except Exception as e:
+            future._setException(e)
+        else:
+            future._setResult(result)
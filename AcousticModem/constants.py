@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.constants
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Values fixed by the ATM-900 firmware.
+
+    :license: MIT
+"""
+
+# The address every modem receives
+BROADCAST = 255
+
+# Test message and packet size in bytes of each PktSize setting
+PACKET_SIZES = {0: 8, 1: 32, 2: 128, 3: 256, 4: 512, 5: 1024, 6: 2048,
+                7: 4096}
+
+# Acoustic bit rate of each TxRate setting
+BIT_RATES = {2: 140, 3: 300, 4: 600, 5: 800, 6: 1066, 7: 1200, 8: 2400,
+             9: 2560, 10: 5120, 11: 7680, 12: 10240, 13: 15360}
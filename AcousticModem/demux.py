@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.demux
+    ~~~~~~~~~~~~~~~~~~~
+
+    Separation of payload data from unsolicited modem messages.
+
+    In online mode the modem interleaves received payload with status lines
+    (connection notices, receive statistics, errors and test messages). A
+    :class:`Demultiplexer` splits the byte stream and dispatches each status
+    line to the callbacks registered for its kind.
+
+    :license: MIT
+"""
+import re
+from time import time
+
+from .framing import toBytes
+
+CONNECTION = 'connection'
+STATISTICS = 'statistics'
+ERROR = 'error'
+TEST = 'test'
+
+# The whole lines of each kind of unsolicited message, as the firmware
+# formats them. Each starts with literal text, which is used to hold back a
+# partial line that may still turn out to be a message.
+DEFAULT_PATTERNS = {
+    CONNECTION: [br'CONNECT( \d{3}.*)?', br'DISCONNECT( \d{3}.*)?',
+                 br'NO CARRIER', br'RING', br'Lowpower', br'Forced Lowpower',
+                 br'Online', br'Command Mode'],
+    STATISTICS: [br'MOD:\d+ .*', br'Source:\d+ Destination:\d+.*',
+                 br'Bit Rate: ?\d+ ?bps', br'CRC: .*',
+                 br'Range: ?[-+]?[\d.]+ ?m', br'RXData[ :(].*',
+                 br'TXData[ :(].*'],
+    ERROR: [br'ERROR( .*)?', br'Error[ :].*', br'Timeout( .*)?',
+            br'Bad Data( .*)?'],
+    TEST: [br'Test Message( .*|:.*)?', br'Pkt ?\d+ .*'],
+}
+# Characters with a meaning in regular expressions
+_SPECIAL = re.compile(br'[\\.^$*+?{}\[\]|()]')
+
+
+def _literal(pattern):
+    """ The literal text a pattern starts with.
+    """
+    match = _SPECIAL.search(pattern)
+    prefix = pattern if match is None else pattern[:match.start()]
+    if match is not None and \
+            pattern[match.start():match.start() + 1] in (b'?', b'*', b'{'):
+        # The last literal character is optional
+        prefix = prefix[:-1]
+    return prefix
+
+
+class Event(object):
+    """ An unsolicited modem message.
+
+    :ivar kind: The message kind, e.g. CONNECTION or STATISTICS.
+    :ivar line: The message line without its line ending.
+    :ivar timestamp: Receive time in integer microseconds since the epoch.
+    """
+    __slots__ = ('kind', 'line', 'timestamp')
+
+    def __init__(self, kind, line, timestamp):
+        self.kind = kind
+        self.line = line
+        self.timestamp = timestamp
+
+
+    def __repr__(self):
+        return 'Event(%r, %r, %d)' % (self.kind, self.line, self.timestamp)
+
+
+class Demultiplexer(object):
+    """ Splits modem output into payload data and status events.
+
+    Status lines are only recognised when they start at a line boundary,
+    are terminated with <CR><LF> and match one of the patterns as a whole;
+    everything else is payload.
+    """
+    def __init__(self, onData=None, patterns=None, maxLine=256):
+        """
+        :param onData: Called as ``onData(view, timestamp)`` with a
+            memoryview over received payload bytes. The view is only valid
+            for the duration of the call; copy it to keep it.
+        :type onData: callable.
+        :param patterns: {kind: [regular expressions matching whole
+            lines]}; defaults to DEFAULT_PATTERNS.
+        :type patterns: dict.
+        :param maxLine: Longest status line; longer unterminated lines are
+            released as payload.
+        :type maxLine: int.
+        """
+        self.onData = onData
+        self.maxLine = maxLine
+        self._callbacks = {}
+        self._buffer = bytearray()
+        self._lineStart = True
+        self._kinds = {}
+        patterns = DEFAULT_PATTERNS if patterns is None else patterns
+        for kind, expressions in patterns.items():
+            for pattern in expressions:
+                self._kinds[bytes(pattern)] = kind
+        self._compile()
+
+
+    def addPattern(self, kind, pattern):
+        """ Treat lines matching 'pattern' as events of 'kind'.
+
+        :param pattern: A regular expression matching the whole line,
+            without its line ending, e.g. ``br'Temp: [0-9.]+ C'``. It should
+            start with literal text; until a partial line has that text, it
+            isn't held back for the pattern.
+        :type pattern: bytes.
+        """
+        self._kinds[bytes(pattern)] = kind
+        self._compile()
+
+
+    def subscribe(self, kind, callback):
+        """ Call ``callback(event)`` for each event of 'kind'.
+
+        :param kind: An event kind, or None for every kind.
+        :type kind: str.
+        """
+        self._callbacks.setdefault(kind, []).append(callback)
+
+
+    def unsubscribe(self, kind, callback):
+        self._callbacks.get(kind, []).remove(callback)
+
+
+    def poll(self, modem):
+        """ Read everything available from 'modem' and dispatch it.
+
+        :type modem: ATM900.
+        :returns: The number of bytes read.
+        :rtype: int.
+        """
+        data = modem.read()
+        if data:
+            self.feed(data)
+        return len(data) if data else 0
+
+
+    def feed(self, data):
+        """ Dispatch newly received bytes.
+
+        :param data: Data read from the modem.
+        :type data: str, bytes.
+        """
+        timestamp = int(time() * 1000000)
+        buf = self._buffer
+        buf.extend(toBytes(data))
+        pos = 0
+        for match in self._expr.finditer(buf):
+            if match.start() == 0 and not self._lineStart:
+                continue
+            if match.start() > pos:
+                self._data(pos, match.start(), timestamp)
+            line = bytes(buf[match.start():match.end() - 2])
+            kind = self._order[int(match.lastgroup[1:])]
+            self._dispatch(Event(kind, line, timestamp))
+            pos = match.end()
+        end = self._release(pos)
+        if end > pos:
+            self._data(pos, end, timestamp)
+        if end:
+            self._lineStart = buf[end - 1:end] == b'\n'
+        del buf[:end]
+
+
+    def flush(self):
+        """ Release any held-back bytes as payload.
+        """
+        if self._buffer:
+            self._data(0, len(self._buffer), int(time() * 1000000))
+            self._lineStart = self._buffer[-1:] == b'\n'
+            del self._buffer[:]
+
+
+    def reset(self):
+        """ Discard any held-back bytes without dispatching them.
+        """
+        del self._buffer[:]
+        self._lineStart = True
+
+
+    def buffers(self):
+        """ The demultiplexer's buffers by name, for memory reports.
+
+        :rtype: dict.
+        """
+        return {'buffer': self._buffer}
+
+
+    def _compile(self):
+        patterns = sorted(self._kinds, key=len, reverse=True)
+        self._order = [self._kinds[pattern] for pattern in patterns]
+        self._prefixes = [prefix for prefix in map(_literal, patterns)
+                          if prefix]
+        self._expr = re.compile(
+            b'(?:^|(?<=\\n))(?:' +
+            b'|'.join(('(?P<p%d>' % n).encode('ascii') + pattern + b')'
+                      for n, pattern in enumerate(patterns)) + b')\\r\\n')
+
+
+    def _release(self, pos):
+        """ How far payload can be released, holding back a trailing partial
+        line that may still turn out to be a status message.
+        """
+        buf = self._buffer
+        start = buf.rfind(b'\n', pos) + 1
+        if start == 0:
+            if pos == 0 and not self._lineStart:
+                return len(buf)
+            start = pos
+        tail = bytes(buf[start:])
+        if not tail or len(tail) > self.maxLine:
+            return len(buf)
+        for prefix in self._prefixes:
+            if prefix.startswith(tail) or tail.startswith(prefix):
+                return start
+        return len(buf)
+
+
+    def _data(self, start, end, timestamp):
+        if self.onData is None:
+            return
+        view = memoryview(self._buffer)[start:end]
+        try:
+            self.onData(view, timestamp)
+        finally:
+            # The buffer can't be resized while a view is exported
+            if hasattr(view, 'release'):
+                view.release()
+
+
+    def _dispatch(self, event):
+        for callback in self._callbacks.get(event.kind, ()):
+            callback(event)
+        for callback in self._callbacks.get(None, ()):
+            callback(event)
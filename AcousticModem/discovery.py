@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.discovery
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Network discovery sweeps over remote addresses 0-249.
+
+    :license: MIT
+"""
+from time import time
+
+from .constants import BROADCAST
+ADDRESSES = list(range(0, 250))
+
+
+def probeOrder(known=(), addresses=None, spread=4):
+    """ Order in which to probe addresses.
+
+    Known nodes come first (in the order given, normally most recently seen
+    first), then addresses within 'spread' of a known node, since deployments
+    tend to be numbered in blocks, then everything else in ascending order.
+
+    :param known: Addresses of previously seen nodes.
+    :type known: list.
+    :param addresses: Addresses to consider; defaults to 0-249.
+    :type addresses: list.
+    :param spread: Distance around known addresses treated as likely.
+    :type spread: int.
+    :rtype: list.
+    """
+    candidates = ADDRESSES if addresses is None else list(addresses)
+    allowed = set(candidates)
+    order = []
+    queued = set()
+
+    def push(address):
+        if address in allowed and address not in queued:
+            queued.add(address)
+            order.append(address)
+
+    for address in known:
+        push(address)
+    for distance in range(1, spread + 1):
+        for address in known:
+            push(address - distance)
+            push(address + distance)
+    for address in candidates:
+        push(address)
+    return order
+
+
+def discover(modem, registry=None, addresses=None, timeout=5.0,
+             broadcast=True, expected=None, table=None, localAddress=None,
+             callback=None):
+    """ Find the remote modems that respond to a link test.
+
+    :param modem: The local modem.
+    :type modem: ATM900.
+    :param registry: Registry used to order the sweep and to store results.
+    :type registry: NodeRegistry.
+    :param addresses: Addresses to probe; defaults to 0-249.
+    :type addresses: list.
+    :param timeout: Seconds to wait for each link test.
+    :type timeout: float.
+    :param broadcast: Probe the broadcast address first and stop immediately
+        if nothing answers it.
+    :type broadcast: bool.
+    :param expected: Stop once this many nodes have responded.
+    :type expected: int.
+    :param table: Neighbour table to update with the link test results.
+    :type table: NeighbourTable.
+    :param localAddress: The local modem's address, required with 'table'.
+    :type localAddress: int.
+    :param callback: Called as ``callback(address, result)`` after each
+        probe, with result None for no response.
+    :type callback: callable.
+    :returns: Link test results of responding nodes, keyed by address.
+    :rtype: dict.
+    """
+    if table is not None and localAddress is None:
+        raise ValueError('localAddress is required to update a table')
+    if broadcast and _probe(modem, BROADCAST, timeout) is None:
+        return {}
+
+    known = registry.known() if registry is not None else ()
+    found = {}
+    for address in probeOrder(known, addresses):
+        result = _probe(modem, address, timeout)
+        if table is not None:
+            table.update(localAddress, address, result)
+        if callback is not None:
+            callback(address, result)
+        if result is None:
+            continue
+        found[address] = result
+        if registry is not None:
+            registry.seen(address, snr=_number(result.get('SNR')),
+                          range=_number(result.get('Range')), when=time())
+        if expected is not None and len(found) >= expected:
+            break
+    return found
+
+
+def _probe(modem, address, timeout):
+    try:
+        return modem.linkTest(address, timeout=timeout)
+    except (IOError, IndexError, ValueError):
+        return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.errors
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Exceptions raised by the modem interface.
+
+    All of them derive from IOError so existing ``except IOError`` handlers
+    keep working.
+
+    :license: MIT
+"""
+
+
+class ModemError(IOError):
+    """ Base class for modem communication failures.
+    """
+
+
+class ModeError(ModemError):
+    """ The modem could not be put into, or kept in, the expected mode.
+    """
+
+
+class NoResponseError(ModemError):
+    """ The modem did not answer a command.
+
+    :ivar command: The command that went unanswered.
+    """
+    def __init__(self, message, command=None):
+        ModemError.__init__(self, message)
+        self.command = command
+
+
+class CommandError(ModemError):
+    """ The modem rejected a command.
+
+    :ivar command: The command sent.
+    :ivar response: The lines the modem returned.
+    """
+    def __init__(self, message, command=None, response=None):
+        ModemError.__init__(self, message)
+        self.command = command
+        self.response = response
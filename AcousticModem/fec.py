@@ -0,0 +1,432 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.fec
+    ~~~~~~~~~~~~~~~~~
+
+    Forward error correction for unacknowledged broadcasts.
+
+    Data is split into K equal blocks and sent as a stream of LT (fountain)
+    code symbols, each the XOR of a pseudo-randomly chosen set of blocks
+    with its size drawn from the robust soliton distribution. A receiver
+    can rebuild the data from any slightly more than K symbols, so every
+    node listening to a broadcast to address 255 completes from one pass
+    whichever packets it happened to lose.
+
+    The block choice for each symbol comes from a xorshift generator seeded
+    by the message id and symbol index, so both ends derive the same
+    symbols on any Python version without sending the block lists.
+
+    :license: MIT
+"""
+import binascii
+import math
+import struct
+import zlib
+
+from .constants import BROADCAST, PACKET_SIZES
+from .framing import extractFrames, toBytes
+
+FRAME_MAGIC = b'\x7eL'
+
+# magic, message id, data length, symbol size, symbol index
+_HEADER = struct.Struct('>2sHIHI')
+_CRC = struct.Struct('>I')
+OVERHEAD = _HEADER.size + _CRC.size
+
+_MASK = 0xffffffff
+_distributions = {}
+
+
+class XorShift(object):
+    """ 32 bit xorshift pseudo-random generator.
+    """
+    def __init__(self, seed):
+        self.state = (seed & _MASK) or 0x9e3779b9
+
+
+    def next(self):
+        x = self.state
+        x ^= (x << 13) & _MASK
+        x ^= x >> 17
+        x ^= (x << 5) & _MASK
+        self.state = x
+        return x
+
+
+    def random(self):
+        """ A float in [0, 1).
+        """
+        return self.next() / 4294967296.0
+
+
+    def randrange(self, n):
+        return self.next() % n
+
+
+def _seed(messageId, index):
+    seed = (messageId * 0x9e3779b1 + index * 0x85ebca6b + 1) & _MASK
+    seed ^= seed >> 16
+    return (seed * 0x45d9f3b) & _MASK
+
+
+def solitonCdf(k, c=0.1, delta=0.5):
+    """ Cumulative robust soliton degree distribution for 'k' blocks.
+
+    :returns: P(degree <= d) at index d - 1.
+    :rtype: list.
+    """
+    if k in _distributions:
+        return _distributions[k]
+    r = c * math.log(k / delta) * math.sqrt(k)
+    spike = int(round(k / r)) if r > 0 else k
+    weights = []
+    for d in range(1, k + 1):
+        rho = 1.0 / k if d == 1 else 1.0 / (d * (d - 1))
+        if 1 <= spike <= k and d < spike:
+            tau = r / (d * k)
+        elif d == spike:
+            tau = r * math.log(r / delta) / k
+        else:
+            tau = 0.0
+        weights.append(rho + max(tau, 0.0))
+    total = sum(weights)
+    cdf = []
+    running = 0.0
+    for weight in weights:
+        running += weight / total
+        cdf.append(running)
+    cdf[-1] = 1.0
+    _distributions[k] = cdf
+    return cdf
+
+
+def neighbours(messageId, index, k):
+    """ The blocks XORed into symbol 'index' of a 'k' block message.
+
+    :rtype: list.
+    """
+    rng = XorShift(_seed(messageId, index))
+    cdf = solitonCdf(k)
+    u = rng.random()
+    degree = 1
+    while cdf[degree - 1] < u:
+        degree += 1
+    chosen = set()
+    while len(chosen) < degree:
+        chosen.add(rng.randrange(k))
+    return sorted(chosen)
+
+
+def _toInt(data):
+    return int(binascii.hexlify(data), 16) if data else 0
+
+
+def _toBytes(value, size):
+    return binascii.unhexlify('%0*x' % (size * 2, value))
+
+
+class FountainEncoder(object):
+    """ LT code symbols for one message.
+    """
+    def __init__(self, data, symbolSize=64, messageId=0):
+        """
+        :param data: The message.
+        :type data: bytes.
+        :param symbolSize: Bytes per symbol.
+        :type symbolSize: int.
+        :param messageId: Distinguishes messages (0-65535); receivers
+            ignore symbols from other messages.
+        :type messageId: int.
+        """
+        data = bytes(bytearray(data))
+        self.length = len(data)
+        self.symbolSize = symbolSize
+        self.messageId = messageId & 0xffff
+        self.k = max(1, -(-self.length // symbolSize))
+        data += b'\x00' * (self.k * symbolSize - self.length)
+        self._blocks = [_toInt(data[n:n + symbolSize])
+                        for n in range(0, len(data), symbolSize)]
+
+
+    def symbol(self, index):
+        """ The payload of symbol 'index'.
+
+        :rtype: bytes.
+        """
+        value = 0
+        for block in neighbours(self.messageId, index, self.k):
+            value ^= self._blocks[block]
+        return _toBytes(value, self.symbolSize)
+
+
+    def frame(self, index):
+        """ Symbol 'index' framed for transmission.
+
+        :rtype: bytes.
+        """
+        frame = _HEADER.pack(FRAME_MAGIC, self.messageId, self.length,
+                             self.symbolSize, index) + self.symbol(index)
+        return frame + _CRC.pack(zlib.crc32(frame) & _MASK)
+
+
+    def count(self, redundancy):
+        """ Symbols to send for a given redundancy, e.g. 0.25 for 25 % more
+        symbols than blocks.
+
+        :rtype: int.
+        """
+        return int(math.ceil(self.k * (1.0 + redundancy)))
+
+
+    def frames(self, redundancy=0.5, start=0):
+        """ Frames for symbols 'start' onwards.
+
+        :returns: A generator of frames.
+        """
+        for index in range(start, start + self.count(redundancy)):
+            yield self.frame(index)
+
+
+def _measure(buf):
+    if len(buf) < _HEADER.size:
+        return None
+    return _HEADER.size + _HEADER.unpack_from(bytes(buf[:_HEADER.size]))[3] + \
+        _CRC.size
+
+
+def _check(frame):
+    return _CRC.unpack(frame[-_CRC.size:])[0] == \
+        zlib.crc32(frame[:-_CRC.size]) & _MASK
+
+
+class FountainDecoder(object):
+    """ Incremental peeling decoder.
+
+    Each symbol is reduced by the blocks already known; a symbol left with
+    a single block recovers it, which in turn reduces the symbols waiting
+    on that block. When peeling stalls with at least as many waiting
+    symbols as missing blocks, the rest is solved by Gaussian elimination.
+
+    :ivar received: Symbols accepted so far.
+    """
+    def __init__(self, messageId=None):
+        """
+        :param messageId: The message to decode. Defaults to the first one
+            a symbol arrives for.
+        :type messageId: int.
+        """
+        self.messageId = messageId
+        self.length = None
+        self.symbolSize = None
+        self.k = None
+        self.received = 0
+        self.blocks = {}
+        self._waiting = {}
+        self._rows = []
+        self._buffer = bytearray()
+
+
+    def done(self):
+        return self.k is not None and len(self.blocks) == self.k
+
+
+    @property
+    def data(self):
+        """ The decoded message, or None until complete.
+
+        :rtype: bytes.
+        """
+        if not self.done():
+            return None
+        return b''.join(_toBytes(self.blocks[n], self.symbolSize)
+                        for n in range(self.k))[:self.length]
+
+
+    def progress(self):
+        """ Fraction of blocks recovered.
+
+        :rtype: float.
+        """
+        return len(self.blocks) / float(self.k) if self.k else 0.0
+
+
+    def add(self, messageId, length, symbolSize, index, payload):
+        """ Add one symbol.
+
+        :returns: True once the message is complete.
+        :rtype: bool.
+        """
+        if self.messageId is None:
+            self.messageId = messageId
+        if messageId != self.messageId:
+            return self.done()
+        if self.k is None:
+            self.length = length
+            self.symbolSize = symbolSize
+            self.k = max(1, -(-length // symbolSize))
+        if (length, symbolSize) != (self.length, self.symbolSize) or \
+                self.done():
+            return self.done()
+        self.received += 1
+        value = _toInt(payload)
+        pending = set()
+        for block in neighbours(messageId, index, self.k):
+            if block in self.blocks:
+                value ^= self.blocks[block]
+            else:
+                pending.add(block)
+        if len(pending) == 1:
+            self._recover(pending.pop(), value)
+        elif pending:
+            entry = [pending, value]
+            self._rows.append(entry)
+            for block in pending:
+                self._waiting.setdefault(block, []).append(entry)
+            if len(self._rows) >= self.k - len(self.blocks):
+                self._solve()
+        return self.done()
+
+
+    def feed(self, data):
+        """ Add received bytes; complete, valid frames are decoded.
+
+        :returns: True once the message is complete.
+        :rtype: bool.
+        """
+        self._buffer.extend(toBytes(data))
+        for frame in extractFrames(self._buffer, FRAME_MAGIC, _measure,
+                                   _check):
+            _, messageId, length, size, index = _HEADER.unpack_from(frame)
+            self.add(messageId, length, size, index,
+                     frame[_HEADER.size:-_CRC.size])
+        return self.done()
+
+
+    def _recover(self, block, value):
+        stack = [(block, value)]
+        while stack:
+            block, value = stack.pop()
+            if block in self.blocks:
+                continue
+            self.blocks[block] = value
+            for entry in self._waiting.pop(block, ()):
+                pending = entry[0]
+                if block not in pending:
+                    continue
+                pending.discard(block)
+                entry[1] ^= value
+                if len(pending) == 1:
+                    stack.append((pending.pop(), entry[1]))
+        self._rows = [entry for entry in self._rows if entry[0]]
+
+
+    def _solve(self):
+        """ Solve the waiting symbols as linear equations over GF(2).
+        """
+        missing = self.k - len(self.blocks)
+        unknown = sorted(set().union(*[entry[0] for entry in self._rows]))
+        if len(unknown) < missing:
+            return
+        bit = dict((block, 1 << n) for n, block in enumerate(unknown))
+        # Rows keyed by their lowest unknown
+        pivots = {}
+        for pending, value in self._rows:
+            mask = 0
+            for block in pending:
+                mask |= bit[block]
+            while mask:
+                low = mask & -mask
+                if low not in pivots:
+                    pivots[low] = (mask, value)
+                    break
+                mask ^= pivots[low][0]
+                value ^= pivots[low][1]
+        if len(pivots) < missing:
+            return
+        # Back substitution from the highest unknown down
+        solved = {}
+        for low in sorted(pivots, reverse=True):
+            mask, value = pivots[low]
+            rest = mask ^ low
+            while rest:
+                high = rest & -rest
+                value ^= solved[high]
+                rest ^= high
+            solved[low] = value
+        for n, block in enumerate(unknown):
+            self._recover(block, solved[1 << n])
+
+
+def broadcast(modem, data, redundancy=0.5, symbolSize=None, messageId=None,
+              interval=0.0):
+    """ Send 'data' to every node as fountain coded symbols.
+
+    :param modem: The local modem.
+    :type modem: ATM900.
+    :param data: The message.
+    :type data: bytes.
+    :param redundancy: Extra symbols to send as a fraction of the block
+        count; raise it for lossier links.
+    :type redundancy: float.
+    :param symbolSize: Bytes per symbol. Defaults to filling one packet at
+        the modem's PktSize setting.
+    :type symbolSize: int.
+    :param messageId: Message id (0-65535); defaults to one derived from the
+        time.
+    :type messageId: int.
+    :param interval: Seconds to wait between frames.
+    :type interval: float.
+    :returns: The encoder, whose ``frames(start=...)`` continues the stream
+        if some nodes need more symbols.
+    :rtype: FountainEncoder.
+    """
+    if symbolSize is None:
+        try:
+            symbolSize = max(PACKET_SIZES[modem.PktSize[0]] - OVERHEAD, 16)
+        except (IOError, KeyError, TypeError, ValueError):
+            symbolSize = 64
+    if messageId is None:
+        messageId = int(modem.time() * 1000)
+    encoder = FountainEncoder(data, symbolSize, messageId)
+    modem.RemoteAddr = BROADCAST
+    for frame in encoder.frames(redundancy):
+        modem.write(frame)
+        if interval:
+            modem.sleep(interval)
+    return encoder
+
+
+def receiveBroadcast(modem, timeout=60.0, messageId=None, onProgress=None):
+    """ Receive a fountain coded broadcast.
+
+    Returns as soon as enough symbols have arrived.
+
+    :param modem: The local modem.
+    :type modem: ATM900.
+    :param timeout: Seconds without a new symbol before giving up.
+    :type timeout: float.
+    :param messageId: Only decode this message.
+    :type messageId: int.
+    :param onProgress: Called with the fraction of blocks recovered.
+    :type onProgress: callable.
+    :returns: The message.
+    :rtype: bytes.
+    :raises: IOError
+    """
+    decoder = FountainDecoder(messageId)
+    deadline = modem.time() + timeout
+    while modem.time() < deadline:
+        data = modem.read()
+        if not data:
+            modem.sleep(0.05)
+            continue
+        received = decoder.received
+        if decoder.feed(data):
+            return decoder.data
+        if decoder.received != received:
+            deadline = modem.time() + timeout
+            if onProgress is not None:
+                onProgress(decoder.progress())
+    raise IOError('Broadcast incomplete: %d of %s blocks recovered' %
+                  (len(decoder.blocks), decoder.k))
@@ -0,0 +1,507 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.filetransfer
+    ~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Resumable file transfer over an online acoustic link.
+
+    The sender first transmits a manifest describing the file: size, chunk
+    size, a SHA-1 of the whole file and a CRC-32 per chunk. For a large
+    file the CRC table alone is many packets long, so the manifest is sent
+    in chunk sized parts, and the receiver asks for any it is missing just
+    as it does for chunks. The sender then sends chunks in windows and
+    polls the receiver, which answers with the chunks it is still missing,
+    in batches of ranges. The receiver journals every verified chunk to
+    disk, so an interrupted transfer restarts where it stopped when the same
+    file is sent again.
+
+    :license: MIT
+"""
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+from .constants import BIT_RATES, PACKET_SIZES
+from .framing import extractFrames, toBytes
+
+FRAME_MAGIC = b'\x7eF'
+MANIFEST = 1
+CHUNK = 2
+POLL = 3
+STATUS = 4
+DONE = 5
+PARTS = 6
+
+# magic, frame type, payload length
+_HEADER = struct.Struct('>2sBH')
+_CRC = struct.Struct('>I')
+_CHUNK = struct.Struct('>II')
+_RANGE = struct.Struct('>II')
+# transfer id, part index, number of parts
+_PART = struct.Struct('>IHH')
+OVERHEAD = _HEADER.size + _CRC.size + _CHUNK.size
+MAX_RANGES = 64
+
+
+def _crc(data):
+    return zlib.crc32(data) & 0xffffffff
+
+
+def defaultChunkSize(modem, default=256):
+    """ Chunk size that fills one packet at the modem's PktSize setting.
+
+    :type modem: ATM900.
+    :rtype: int.
+    """
+    try:
+        size = PACKET_SIZES[modem.PktSize[0]]
+    except (IOError, KeyError, TypeError, ValueError):
+        return default
+    return max(size - OVERHEAD, 16)
+
+
+def bitRate(modem, default=2400):
+    """ The modem's transmit bit rate in bits/sec.
+
+    :type modem: ATM900.
+    :rtype: int.
+    """
+    try:
+        return BIT_RATES[modem.TxRate[0]]
+    except (IOError, KeyError, TypeError, ValueError):
+        return default
+
+
+class FrameLink(object):
+    """ CRC checked frames over a modem in online mode.
+    """
+    def __init__(self, modem):
+        self.modem = modem
+        self._buffer = bytearray()
+        self._frames = []
+
+
+    def send(self, kind, payload=b''):
+        payload = bytes(payload)
+        if len(payload) > 0xffff:
+            raise ValueError('Frame payload of %d bytes is too long' %
+                             len(payload))
+        self.modem.write(_HEADER.pack(FRAME_MAGIC, kind, len(payload)) +
+                         payload + _CRC.pack(_crc(payload)))
+
+
+    def receive(self, timeout):
+        """ Wait up to 'timeout' seconds for a valid frame.
+
+        :returns: (kind, payload), or None on timeout.
+        :rtype: tuple.
+        """
+        modem = self.modem
+        deadline = modem.time() + timeout
+        while True:
+            frame = self._extract()
+            if frame is not None:
+                return frame
+            if modem.time() > deadline:
+                return None
+            data = modem.read()
+            if data:
+                self._buffer.extend(toBytes(data))
+            else:
+                modem.sleep(0.05)
+
+
+    def _extract(self):
+        if not self._frames:
+            self._frames = extractFrames(self._buffer, FRAME_MAGIC, _measure,
+                                         _check)
+        if not self._frames:
+            return None
+        frame = self._frames.pop(0)
+        return (_HEADER.unpack_from(frame)[1],
+                frame[_HEADER.size:-_CRC.size])
+
+
+def _measure(buf):
+    if len(buf) < _HEADER.size:
+        return None
+    return _HEADER.size + _HEADER.unpack_from(bytes(buf[:_HEADER.size]))[2] + \
+        _CRC.size
+
+
+def _check(frame):
+    return _CRC.unpack(frame[-_CRC.size:])[0] == \
+        _crc(frame[_HEADER.size:-_CRC.size])
+
+
+class Manifest(object):
+    """ Description of a file being transferred.
+    """
+    def __init__(self, name, size, chunkSize, digest, crcs):
+        self.name = name
+        self.size = size
+        self.chunkSize = chunkSize
+        self.digest = digest
+        self.crcs = crcs
+
+
+    @property
+    def ident(self):
+        """ Transfer id shared by both ends, derived from the file digest.
+        """
+        return int(self.digest[:8], 16)
+
+
+    @property
+    def count(self):
+        return len(self.crcs)
+
+
+    @classmethod
+    def fromFile(cls, path, chunkSize):
+        digest = hashlib.sha1()
+        crcs = []
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunkSize)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                crcs.append(_crc(chunk))
+        return cls(os.path.basename(path), os.path.getsize(path), chunkSize,
+                   digest.hexdigest(), crcs)
+
+
+    def encode(self):
+        return json.dumps({'name': self.name, 'size': self.size,
+                           'chunk': self.chunkSize, 'sha1': self.digest,
+                           'crc': self.crcs}, separators=(',', ':')
+                          ).encode('utf-8')
+
+
+    @classmethod
+    def decode(cls, data):
+        info = json.loads(bytes(data).decode('utf-8'))
+        return cls(info['name'], info['size'], info['chunk'], info['sha1'],
+                   info['crc'])
+
+
+    def parts(self, size):
+        """ The encoded manifest split into MANIFEST frame payloads.
+
+        :param size: Most manifest bytes per part.
+        :type size: int.
+        :rtype: list.
+        """
+        data = self.encode()
+        count = max(1, -(-len(data) // size))
+        if count > 0xffff:
+            raise ValueError('Manifest too large for %d byte parts' % size)
+        return [_PART.pack(self.ident, index, count) +
+                data[index * size:(index + 1) * size]
+                for index in range(count)]
+
+
+class _Parts(object):
+    """ A manifest being reassembled from its parts.
+    """
+    def __init__(self, ident, count):
+        self.ident = ident
+        self.count = count
+        self.parts = {}
+
+
+    def add(self, payload):
+        """ Add a MANIFEST frame payload.
+
+        :returns: The manifest, once every part has arrived.
+        :rtype: Manifest.
+        """
+        ident, index, count = _PART.unpack(payload[:_PART.size])
+        if (ident, count) == (self.ident, self.count) and index < count:
+            self.parts[index] = payload[_PART.size:]
+        if len(self.parts) < self.count:
+            return None
+        return Manifest.decode(b''.join(self.parts[n]
+                                        for n in range(self.count)))
+
+
+    def missing(self):
+        return [n for n in range(self.count) if n not in self.parts]
+
+
+def _ranges(indices):
+    """ Collapse sorted chunk indices into (start, count) ranges.
+    """
+    ranges = []
+    for index in indices:
+        if ranges and ranges[-1][0] + ranges[-1][1] == index:
+            ranges[-1][1] += 1
+        else:
+            ranges.append([index, 1])
+    return ranges
+
+
+def _encodeStatus(ident, missing):
+    ranges = _ranges(missing)[:MAX_RANGES]
+    return struct.pack('>IH', ident, len(ranges)) + b''.join(
+        _RANGE.pack(start, count) for start, count in ranges)
+
+
+def _decodeStatus(payload):
+    ident, n = struct.unpack('>IH', payload[:6])
+    missing = []
+    for i in range(n):
+        start, count = _RANGE.unpack(payload[6 + i * 8:14 + i * 8])
+        missing.extend(range(start, start + count))
+    return ident, missing
+
+
+def sendFile(modem, path, chunkSize=None, window=16, timeout=None,
+             retries=5, onProgress=None):
+    """ Send a file to the remote modem the local modem is online with.
+
+    :param modem: The local modem, with RemoteAddr set to the receiver.
+    :type modem: ATM900.
+    :param path: File to send.
+    :type path: str.
+    :param chunkSize: Bytes per chunk and per manifest part; by default one
+        packet at the current PktSize setting.
+    :type chunkSize: int.
+    :param window: Chunks sent between status polls.
+    :type window: int.
+    :param timeout: Seconds to wait for each status reply. Derived from the
+        TxRate setting if not given.
+    :type timeout: float.
+    :param retries: Consecutive unanswered polls before giving up.
+    :type retries: int.
+    :param onProgress: Called as ``onProgress(done, total, rate)`` with
+        bytes confirmed, file size and throughput in bytes/sec.
+    :type onProgress: callable.
+    :returns: The file's manifest.
+    :rtype: Manifest.
+    :raises: IOError, ValueError
+    """
+    if chunkSize is None:
+        chunkSize = defaultChunkSize(modem)
+    if not 0 < chunkSize <= 0xffff - _CHUNK.size:
+        raise ValueError('Invalid chunk size %d' % chunkSize)
+    if timeout is None:
+        frame = (chunkSize + OVERHEAD) * 8.0 / bitRate(modem)
+        timeout = 10.0 + 2 * window * frame
+    manifest = Manifest.fromFile(path, chunkSize)
+    parts = manifest.parts(chunkSize)
+    link = FrameLink(modem)
+    start = modem.time()
+    # Manifest parts the receiver lacks, until it has them all; then chunks
+    missingParts = list(range(len(parts)))
+    missing = None
+    failures = 0
+    with open(path, 'rb') as f:
+        while True:
+            if missing is None:
+                for index in missingParts[:window]:
+                    link.send(MANIFEST, parts[index])
+            else:
+                for index in missing[:window]:
+                    f.seek(index * chunkSize)
+                    link.send(CHUNK, _CHUNK.pack(manifest.ident, index) +
+                              f.read(chunkSize))
+            link.send(POLL, struct.pack('>I', manifest.ident))
+            reply = _awaitStatus(link, manifest.ident, timeout)
+            if reply is None:
+                failures += 1
+                if failures > retries:
+                    raise IOError('File transfer to remote modem timed out')
+                continue
+            failures = 0
+            if reply == DONE:
+                if onProgress is not None:
+                    onProgress(manifest.size, manifest.size, manifest.size /
+                               max(modem.time() - start, 1e-6))
+                return manifest
+            kind, indices = reply
+            if kind == PARTS:
+                missingParts = indices
+                continue
+            missing = indices
+            if onProgress is not None:
+                done = manifest.size - _missingBytes(manifest, missing)
+                onProgress(done, manifest.size,
+                           done / max(modem.time() - start, 1e-6))
+
+
+def _missingBytes(manifest, missing):
+    last = manifest.count - 1
+    tail = manifest.size - last * manifest.chunkSize
+    return sum(tail if i == last else manifest.chunkSize for i in missing)
+
+
+def _awaitStatus(link, ident, timeout):
+    """ Wait for the receiver's answer to a poll.
+
+    :returns: DONE, (STATUS, missing chunks), (PARTS, missing manifest
+        parts) or None on timeout.
+    """
+    modem = link.modem
+    deadline = modem.time() + timeout
+    while modem.time() < deadline:
+        frame = link.receive(deadline - modem.time())
+        if frame is None:
+            return None
+        kind, payload = frame
+        if kind == DONE and struct.unpack('>I', payload[:4])[0] == ident:
+            return DONE
+        if kind in (STATUS, PARTS):
+            reply, missing = _decodeStatus(payload)
+            if reply == ident:
+                return kind, missing
+    return None
+
+
+class _Journal(object):
+    """ On-disk receive state: the manifest followed by one line per chunk.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.manifest = None
+        self.received = set()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                lines = f.read().splitlines()
+            if lines:
+                self.manifest = Manifest.decode(lines[0].encode('utf-8'))
+                for line in lines[1:]:
+                    if line.strip().isdigit():
+                        self.received.add(int(line))
+
+
+    def start(self, manifest):
+        self.manifest = manifest
+        self.received = set()
+        with open(self.path, 'w') as f:
+            f.write(manifest.encode().decode('utf-8') + '\n')
+
+
+    def add(self, index):
+        self.received.add(index)
+        with open(self.path, 'a') as f:
+            f.write('%d\n' % index)
+
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def receiveFile(modem, directory, timeout=600.0, linger=10.0,
+                onProgress=None):
+    """ Receive a file sent with :func:`sendFile`.
+
+    Partial data is kept in ``<name>.part`` with a ``<name>.journal`` beside
+    it, so calling receiveFile again after an interruption resumes the
+    transfer.
+
+    :param modem: The local modem, online with the sender.
+    :type modem: ATM900.
+    :param directory: Where to write the received file.
+    :type directory: str.
+    :param timeout: Seconds of silence from the sender before giving up.
+    :type timeout: float.
+    :param linger: Seconds to keep answering polls after completion, in
+        case the sender missed the final acknowledgement.
+    :type linger: float.
+    :param onProgress: Called as ``onProgress(done, total, rate)``.
+    :type onProgress: callable.
+    :returns: Path of the received file.
+    :rtype: str.
+    :raises: IOError
+    """
+    link = FrameLink(modem)
+    journal = None
+    target = None
+    parts = None
+    start = modem.time()
+    while True:
+        frame = link.receive(timeout)
+        if frame is None:
+            raise IOError('File transfer from remote modem timed out')
+        kind, payload = frame
+        if kind == MANIFEST:
+            if len(payload) < _PART.size:
+                continue
+            ident, index, count = _PART.unpack(payload[:_PART.size])
+            if journal is not None and journal.manifest.ident == ident:
+                # A repeat of a manifest already received
+                continue
+            if parts is None or (parts.ident, parts.count) != (ident, count):
+                parts = _Parts(ident, count)
+            manifest = parts.add(payload)
+            if manifest is None:
+                continue
+            parts = None
+            target = os.path.join(directory, os.path.basename(manifest.name))
+            journal = _Journal(target + '.journal')
+            if (journal.manifest is None or
+                    journal.manifest.digest != manifest.digest or
+                    not os.path.exists(target + '.part')):
+                journal.start(manifest)
+                open(target + '.part', 'wb').close()
+        elif journal is None:
+            if kind == POLL and parts is not None and \
+                    struct.unpack('>I', payload[:4])[0] == parts.ident:
+                link.send(PARTS, _encodeStatus(parts.ident, parts.missing()))
+            continue
+        elif kind == CHUNK:
+            ident, index = _CHUNK.unpack(payload[:_CHUNK.size])
+            data = payload[_CHUNK.size:]
+            manifest = journal.manifest
+            if (ident != manifest.ident or index >= manifest.count or
+                    index in journal.received or
+                    _crc(data) != manifest.crcs[index]):
+                continue
+            with open(target + '.part', 'r+b') as f:
+                f.seek(index * manifest.chunkSize)
+                f.write(data)
+            journal.add(index)
+        elif kind == POLL:
+            manifest = journal.manifest
+            if struct.unpack('>I', payload[:4])[0] != manifest.ident:
+                continue
+            missing = sorted(set(range(manifest.count)) - journal.received)
+            if onProgress is not None:
+                done = manifest.size - _missingBytes(manifest, missing)
+                onProgress(done, manifest.size,
+                           done / max(modem.time() - start, 1e-6))
+            if missing:
+                link.send(STATUS, _encodeStatus(manifest.ident, missing))
+                continue
+            if _digest(target + '.part') != manifest.digest:
+                # Chunk CRCs passed but the file doesn't; start over
+                journal.start(manifest)
+                link.send(STATUS, _encodeStatus(manifest.ident,
+                                                range(manifest.count)))
+                continue
+            if os.path.exists(target):
+                os.remove(target)
+            os.rename(target + '.part', target)
+            journal.remove()
+            done = struct.pack('>I', manifest.ident)
+            link.send(DONE, done)
+            while True:
+                frame = link.receive(linger)
+                if frame is None:
+                    return target
+                if frame[0] == POLL and frame[1][:4] == done:
+                    link.send(DONE, done)
+
+
+def _digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.framing
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Frames in a received byte stream.
+
+    The binary protocols carried in online mode (relay routing, file
+    transfer, fountain coded broadcasts, link probes) all start their frames
+    with a two byte magic and give the frame's length in a fixed header.
+    :func:`extractFrames` finds them in the modem's output, skipping
+    anything in between and resynchronising after a corrupt frame.
+
+    :license: MIT
+"""
+
+
+def toBytes(data):
+    """ Received or outgoing data as bytes.
+
+    :param data: Data as read from the modem; None reads as empty.
+    :type data: str, bytes, bytearray.
+    :rtype: bytes.
+    """
+    if data is None:
+        return b''
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, (bytearray, memoryview)):
+        return bytes(data)
+    return data.encode('latin-1')
+
+
+def extractFrames(buf, magic, measure, check=None):
+    """ Remove the complete frames starting with 'magic' from 'buf'.
+
+    Bytes preceding a frame are discarded. A frame failing 'check' is
+    skipped by searching for the next magic after its first byte. An
+    incomplete trailing frame is left in 'buf' for the next call, unless a
+    complete frame passing 'check' starts inside it: then its header was
+    corrupt, e.g. a magic within the payload of a lost frame, and it is
+    skipped too rather than waiting for bytes that will never come.
+
+    :param buf: Received bytes; consumed bytes are removed in place.
+    :type buf: bytearray.
+    :param magic: The bytes every frame starts with.
+    :type magic: bytes.
+    :param measure: Called with 'buf' starting at a magic; returns the
+        frame's total length, or None if more bytes are needed to tell.
+    :type measure: callable.
+    :param check: Called with each complete frame; returns False if it is
+        corrupt.
+    :type check: callable.
+    :returns: The frames, magic included.
+    :rtype: list.
+    """
+    frames = []
+    while True:
+        start = buf.find(magic)
+        if start < 0:
+            # Keep a trailing partial magic
+            del buf[:max(0, len(buf) - len(magic) + 1)]
+            return frames
+        del buf[:start]
+        size = measure(buf)
+        if size is None or len(buf) < size:
+            if check is None or not _followed(buf, magic, measure, check):
+                return frames
+            del buf[:1]
+            continue
+        frame = bytes(buf[:size])
+        if check is not None and not check(frame):
+            del buf[:1]
+            continue
+        del buf[:size]
+        frames.append(frame)
+
+
+def _followed(buf, magic, measure, check):
+    """ Whether a complete frame passing 'check' starts after buf[0].
+    """
+    start = buf.find(magic, 1)
+    while start >= 0:
+        tail = buf[start:]
+        size = measure(tail)
+        if size is not None and len(tail) >= size and \
+                check(bytes(tail[:size])):
+            return True
+        start = buf.find(magic, start + 1)
+    return False
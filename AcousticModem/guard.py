@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.guard
+    ~~~~~~~~~~~~~~~~~~~
+
+    Calibration of the ``+++`` escape guard time.
+
+    The modem only recognises ``+++`` when the line has been quiet for its
+    guard time beforehand. :func:`calibrateGuard` bisects for the shortest
+    guard that works every time, adds a safety margin, and caches the result
+    per modem serial number and firmware version.
+
+    :license: MIT
+"""
+import json
+import os
+
+from .errors import ModeError
+
+REGISTRY_KEY = 'guardTime'
+
+
+def _identity(modem):
+    """ Serial number and firmware version of the local modem.
+    """
+    version = modem.version
+    try:
+        serial = modem.serialNo
+    except (IndexError, ValueError):
+        serial = None
+    return serial, '|'.join(version)
+
+
+def _load(cache, modem, identity):
+    serial, firmware = identity
+    if hasattr(cache, 'lookup'):
+        entry = cache.lookup(modem.LocalAddr, REGISTRY_KEY)
+        if entry and entry.get('serial') == serial and \
+                entry.get('firmware') == firmware:
+            return entry['guard']
+        return None
+    try:
+        with open(cache) as f:
+            return json.load(f).get('%s/%s' % identity)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _save(cache, modem, identity, guard):
+    serial, firmware = identity
+    if hasattr(cache, 'store'):
+        cache.store(modem.LocalAddr, REGISTRY_KEY,
+                    {'serial': serial, 'firmware': firmware, 'guard': guard})
+        return
+    try:
+        with open(cache) as f:
+            entries = json.load(f)
+    except (IOError, OSError, ValueError):
+        entries = {}
+    entries['%s/%s' % identity] = guard
+    temporary = cache + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(entries, f, indent=1, sort_keys=True)
+    os.rename(temporary, cache)
+
+
+def _escapes(modem, guard, safe):
+    """ Try entering config mode from online mode after 'guard' seconds.
+    """
+    modem.guardTime = safe
+    modem.resync()
+    modem.onlineMode()
+    # Start the guard from a known last byte rather than the ATO
+    modem.write('\r\n')
+    modem.guardTime = guard
+    try:
+        modem.configMode()
+        return modem.probe()
+    except ModeError:
+        return False
+    finally:
+        modem.guardTime = safe
+
+
+def calibrateGuard(modem, cache=None, low=0.05, high=1.0, trials=3,
+                   resolution=0.05, margin=1.25, recalibrate=False):
+    """ Find and apply the shortest reliable guard time for 'modem'.
+
+    Each candidate guard must enter config mode in every one of 'trials'
+    attempts. Every attempt sends a line break as data, and a failed one
+    ``+++`` too, so only calibrate while nothing is listening. Leaves the
+    modem in config mode.
+
+    :param modem: The local modem.
+    :type modem: ATM900.
+    :param cache: A NodeRegistry, or the path of a JSON file, to keep the
+        result in per serial number and firmware version.
+    :type cache: NodeRegistry, str.
+    :param low: Shortest guard to try in seconds.
+    :type low: float.
+    :param high: Longest guard to try, known to work.
+    :type high: float.
+    :param trials: Attempts each candidate must pass.
+    :type trials: int.
+    :param resolution: Stop bisecting when the range is this narrow.
+    :type resolution: float.
+    :param margin: Factor applied to the shortest passing guard.
+    :type margin: float.
+    :param recalibrate: Measure again even if a cached value exists.
+    :type recalibrate: bool.
+    :returns: The guard time applied, in seconds.
+    :rtype: float.
+    :raises: ModeError
+    """
+    identity = None
+    if cache is not None:
+        identity = _identity(modem)
+        if not recalibrate:
+            guard = _load(cache, modem, identity)
+            if guard is not None:
+                modem.guardTime = guard
+                return guard
+
+    def passes(guard):
+        for trial in range(trials):
+            if not _escapes(modem, guard, high):
+                return False
+        return True
+
+    if not passes(high):
+        raise ModeError('Escape fails at a %.2f s guard time' % high)
+    if passes(low):
+        best = low
+    else:
+        best = high
+        while best - low > resolution:
+            middle = (low + best) / 2.0
+            if passes(middle):
+                best = middle
+            else:
+                low = middle
+    guard = round(min(best * margin, high), 3)
+    modem.guardTime = guard
+    modem.resync()
+    if cache is not None:
+        _save(cache, modem, identity, guard)
+    return guard
@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.outbox
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Store-and-forward queue for nodes that are only reachable at times.
+
+    Data and remote commands for a hibernating or out of range node are
+    journalled to SQLite instead of being sent once and lost. When the node
+    answers again, everything queued for it is delivered in one batch, in
+    the order it was queued. Items expire after a time to live, and
+    duplicates are queued only once.
+
+    :license: MIT
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+from time import time
+
+from .errors import CommandError
+
+DATA = 'data'
+COMMAND = 'command'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    address     INTEGER,
+    kind        TEXT,
+    payload     BLOB,
+    dedup       TEXT,
+    created     REAL,
+    expires     REAL,
+    attempts    INTEGER DEFAULT 0,
+    UNIQUE (address, dedup)
+);
+CREATE INDEX IF NOT EXISTS outbox_address ON outbox (address, id)
+"""
+
+
+class Outbox(object):
+    """ Durable per-address queue of data and remote commands.
+    """
+    def __init__(self, modem, path=':memory:', ttl=86400.0, registry=None,
+                 probeTimeout=10.0):
+        """
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param path: Journal database file. An in-memory queue is used if
+            omitted.
+        :type path: str.
+        :param ttl: Default seconds an item stays queued; None keeps it
+            until delivered.
+        :type ttl: float.
+        :param registry: Records nodes found reachable.
+        :type registry: NodeRegistry.
+        :param probeTimeout: Seconds to wait for the link test that checks
+            a node is reachable.
+        :type probeTimeout: float.
+        """
+        self.modem = modem
+        self.path = path
+        self.ttl = ttl
+        self.registry = registry
+        self.probeTimeout = probeTimeout
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+
+    def close(self):
+        """ Close the underlying database.
+        """
+        self._db.close()
+
+
+    def send(self, address, data, ttl=None, key=None):
+        """ Queue data to be written to the node at 'address'.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param data: The data to send.
+        :type data: bytes.
+        :param ttl: Seconds to keep the item; defaults to the queue's ttl.
+        :type ttl: float.
+        :param key: Deduplication key. An item queued with the key of a
+            pending one replaces it; without a key, identical data is only
+            queued once.
+        :type key: str.
+        :returns: True if the item was queued, False if it was a duplicate.
+        :rtype: bool.
+        """
+        data = bytes(bytearray(data))
+        return self._queue(address, DATA, sqlite3.Binary(data), ttl, key)
+
+
+    def command(self, address, name, *args, **kwargs):
+        """ Queue a remote command, e.g. ``command(5, 'remotePower', 5, 8)``.
+
+        The command runs as ``getattr(modem, name)(*args)`` once the node is
+        reachable.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param name: ATM900 method name.
+        :type name: str.
+        :param ttl: Keyword only; seconds to keep the item.
+        :type ttl: float.
+        :param key: Keyword only; deduplication key as for :meth:`send`,
+            e.g. ``'TxPower'`` so only the latest setting is delivered.
+        :type key: str.
+        :returns: True if the item was queued, False if it was a duplicate.
+        :rtype: bool.
+        """
+        payload = json.dumps([name, list(args)])
+        return self._queue(address, COMMAND, payload, kwargs.get('ttl'),
+                           kwargs.get('key'))
+
+
+    def pending(self, address=None):
+        """ Items waiting for delivery, oldest first.
+
+        :returns: (id, address, kind, payload, created, attempts) tuples.
+        :rtype: list.
+        """
+        self.expire()
+        query = ('SELECT id, address, kind, payload, created, attempts '
+                 'FROM outbox')
+        params = ()
+        if address is not None:
+            query += ' WHERE address = ?'
+            params = (address,)
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY id', params).fetchall()
+        return [(row[0], row[1], row[2], self._decode(row[2], row[3]),
+                 row[4], row[5]) for row in rows]
+
+
+    def addresses(self):
+        """ Addresses with items waiting.
+
+        :rtype: list.
+        """
+        self.expire()
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT DISTINCT address FROM outbox ORDER BY address')
+            return [row[0] for row in rows]
+
+
+    def cancel(self, address, key=None):
+        """ Drop queued items for 'address', or only the one with 'key'.
+
+        :returns: The number of items dropped.
+        :rtype: int.
+        """
+        query = 'DELETE FROM outbox WHERE address = ?'
+        params = (address,)
+        if key is not None:
+            query += ' AND dedup = ?'
+            params += ('key:' + key,)
+        with self._lock:
+            count = self._db.execute(query, params).rowcount
+            self._db.commit()
+        return count
+
+
+    def expire(self, now=None):
+        """ Drop items past their time to live.
+
+        :returns: The number of items dropped.
+        :rtype: int.
+        """
+        now = time() if now is None else now
+        with self._lock:
+            count = self._db.execute(
+                'DELETE FROM outbox WHERE expires IS NOT NULL AND expires < ?',
+                (now,)).rowcount
+            self._db.commit()
+        return count
+
+
+    def deliver(self, address, probe=True):
+        """ Deliver everything queued for 'address'.
+
+        Items are removed as each one succeeds; the batch stops at the
+        first communication failure and the rest stay queued. Commands the
+        modem rejects as invalid are dropped.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param probe: Check the node is reachable with a link test first.
+            Pass False when contact has just been seen, e.g. on a CONNECT.
+        :type probe: bool.
+        :returns: The number of items delivered.
+        :rtype: int.
+        """
+        items = self.pending(address)
+        if not items:
+            return 0
+        if probe and not self._reachable(address):
+            self._attempted(items[0][0])
+            return 0
+        delivered = 0
+        remote = None
+        for rowid, address, kind, payload, created, attempts in items:
+            try:
+                if kind == DATA:
+                    if remote != address:
+                        self.modem.RemoteAddr = address
+                        remote = address
+                    self.modem.write(payload)
+                else:
+                    name, args = payload
+                    getattr(self.modem, name)(*args)
+            except CommandError:
+                # Rejected by the modem; sending it again won't help
+                self._remove(rowid)
+                continue
+            except IOError:
+                self._attempted(rowid)
+                break
+            except (AttributeError, TypeError, ValueError):
+                # Never going to succeed
+                self._remove(rowid)
+                continue
+            self._remove(rowid)
+            delivered += 1
+        return delivered
+
+
+    def flush(self, probe=True):
+        """ Try to deliver to every address with items waiting.
+
+        :returns: {address: items delivered}
+        :rtype: dict.
+        """
+        return dict((address, self.deliver(address, probe))
+                    for address in self.addresses())
+
+
+    def _queue(self, address, kind, payload, ttl, key):
+        now = time()
+        ttl = self.ttl if ttl is None else ttl
+        expires = now + ttl if ttl is not None else None
+        if key is not None:
+            dedup = 'key:' + key
+            verb = 'INSERT OR REPLACE'
+        else:
+            raw = payload if kind == COMMAND else bytes(payload)
+            if not isinstance(raw, bytes):
+                raw = raw.encode('utf-8')
+            dedup = hashlib.sha1(kind.encode('ascii') + b':' + raw).hexdigest()
+            verb = 'INSERT OR IGNORE'
+        with self._lock:
+            count = self._db.execute(
+                verb + ' INTO outbox (address, kind, payload, dedup, created, '
+                'expires) VALUES (?, ?, ?, ?, ?, ?)',
+                (address, kind, payload, dedup, now, expires)).rowcount
+            self._db.commit()
+        return count > 0
+
+
+    def _decode(self, kind, payload):
+        if kind == COMMAND:
+            return json.loads(payload)
+        return bytes(payload)
+
+
+    def _reachable(self, address):
+        try:
+            result = self.modem.linkTest(address, timeout=self.probeTimeout)
+        except IOError:
+            return False
+        if self.registry is not None:
+            try:
+                snr = float(result.get('SNR'))
+            except (TypeError, ValueError):
+                snr = None
+            self.registry.seen(address, snr=snr)
+        return True
+
+
+    def _attempted(self, rowid):
+        with self._lock:
+            self._db.execute(
+                'UPDATE outbox SET attempts = attempts + 1 WHERE id = ?', (rowid,))
+            self._db.commit()
+
+
+    def _remove(self, rowid):
+        with self._lock:
+            self._db.execute('DELETE FROM outbox WHERE id = ?', (rowid,))
+            self._db.commit()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.ports
+    ~~~~~~~~~~~~~~~~~~~
+
+    Separate data streams for serial ports 1 and 2 of a modem in dual input
+    mode.
+
+    With ``InputMode`` Dual, data input on each of the modem's serial ports
+    is sent with that port's transport address (``SrcP1``, ``SrcP2``), and
+    the receiving modem outputs it on the serial port its ``Dst1``-``Dst4``
+    setting gives for the address. The transport information is consumed
+    by the modems; it never appears on the serial line, so a host keeps the
+    instruments apart by connecting both of the modem's ports and reading
+    each one on its own. :class:`DualPort` does this, with a queue of
+    received data per port, and can direct data to either port of the
+    remote modem.
+
+    :license: MIT
+"""
+from collections import deque
+
+from .framing import toBytes
+
+
+class DualPort(object):
+    """ Per-port receive queues and transmit addressing for one modem.
+
+    Port 1 is read through the ATM900, so it also carries the modem's
+    status messages; pass its data through a Demultiplexer to separate
+    them.
+
+    :ivar queues: {port: deque of received chunks, oldest first}.
+    """
+    def __init__(self, modem, port2, baudRate=None, maxChunks=1024,
+                 onData=None):
+        """
+        :param modem: The local modem, connected through serial port 1.
+        :type modem: ATM900.
+        :param port2: The modem's serial port 2: an open transport, or a
+            port name or URL to open.
+        :type port2: object, str.
+        :param baudRate: The P2Baud setting; defaults to the rate of port 1.
+        :type baudRate: int.
+        :param maxChunks: Most received chunks kept per port; the oldest are
+            dropped first.
+        :type maxChunks: int.
+        :param onData: Called as ``onData(port, data)`` for everything
+            received.
+        :type onData: callable.
+        """
+        self.modem = modem
+        if isinstance(port2, str):
+            from .transport import openTransport
+            port2 = openTransport(port2, baudRate or modem.baud_rate)
+        self.port2 = port2
+        self.onData = onData
+        self.queues = {1: deque(maxlen=maxChunks), 2: deque(maxlen=maxChunks)}
+        # The transport address each local port's data is sent with
+        self._sources = {}
+
+
+    def configure(self):
+        """ Set up symmetric transport addressing on the local modem.
+
+        Data input on port n is sent with transport address n, and data
+        received with transport address n is output on port n. Configure
+        the remote modem the same way, so that each port talks to its
+        namesake.
+
+        :raises: ModemError
+        """
+        results = self.modem.pipeline([('@InputMode', 2), ('@SrcP1', 1),
+                                       ('@SrcP2', 2), ('@Dst1', 1),
+                                       ('@Dst2', 2)])
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        self._sources = {1: 1, 2: 2}
+
+
+    def write(self, data, port=1, remotePort=None):
+        """ Send 'data' as input on local serial port 'port'.
+
+        :param data: The data to send.
+        :type data: bytes.
+        :param port: The local port, 1 or 2.
+        :type port: int.
+        :param remotePort: The remote port to deliver to, assuming the
+            remote modem is configured as by :meth:`configure`. Defaults to
+            the port the local one currently sends to.
+        :type remotePort: int.
+        :raises: ValueError, ModemError
+        """
+        if port not in (1, 2):
+            raise ValueError('Invalid port. Valid ports are 1 or 2.')
+        if remotePort is not None and self._sources.get(port) != remotePort:
+            if remotePort not in (1, 2):
+                raise ValueError('Invalid port. Valid ports are 1 or 2.')
+            setattr(self.modem, 'SrcP%d' % port, remotePort)
+            self._sources[port] = remotePort
+        if port == 1:
+            self.modem.write(data)
+        else:
+            self.port2.write(data)
+
+
+    def poll(self):
+        """ Queue whatever has arrived on either port.
+
+        :returns: The number of bytes received.
+        :rtype: int.
+        """
+        received = 0
+        for port in (1, 2):
+            if port == 1:
+                data = self.modem.read()
+            else:
+                data = self.port2.read(self.port2.inWaiting())
+            if not data:
+                continue
+            data = toBytes(data)
+            self.queues[port].append(data)
+            received += len(data)
+            if self.onData is not None:
+                self.onData(port, data)
+        return received
+
+
+    def read(self, port, size=None):
+        """ Received data from port 'port'.
+
+        :param port: The local port, 1 or 2.
+        :type port: int.
+        :param size: Most bytes to return; everything queued by default.
+        :type size: int.
+        :rtype: bytes.
+        """
+        self.poll()
+        queue = self.queues[port]
+        chunks = []
+        count = 0
+        while queue and (size is None or count < size):
+            chunk = queue.popleft()
+            if size is not None and count + len(chunk) > size:
+                queue.appendleft(chunk[size - count:])
+                chunk = chunk[:size - count]
+            chunks.append(chunk)
+            count += len(chunk)
+        return b''.join(chunks)
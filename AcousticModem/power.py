@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.power
+    ~~~~~~~~~~~~~~~~~~~
+
+    Minimum transmit power selection per acoustic link.
+
+    :license: MIT
+"""
+from time import time
+
+POWER_LEVELS = list(range(1, 9))
+
+
+class PowerOptimiser(object):
+    """ Finds the lowest power level (1-8) that keeps a link healthy.
+
+    A level passes when every linkTest run at it shows no more than
+    'maxErrors' bit errors and at least 'minSnr' dB SNR. Levels are found by
+    bisection, cached per node (in a NodeRegistry if given) and re-validated
+    once older than 'revalidate' seconds.
+    """
+    def __init__(self, modem, registry=None, maxErrors=0, minSnr=10.0,
+                 samples=2, revalidate=3600.0, timeout=None):
+        """
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param registry: Where chosen levels are stored between runs.
+        :type registry: NodeRegistry.
+        :param maxErrors: Highest acceptable ERR count per test.
+        :type maxErrors: int.
+        :param minSnr: Lowest acceptable SNR in dB.
+        :type minSnr: float.
+        :param samples: Link tests per power level.
+        :type samples: int.
+        :param revalidate: Seconds before a cached level is checked again.
+        :type revalidate: float.
+        :param timeout: Seconds to wait for each link test.
+        :type timeout: float.
+        """
+        self.modem = modem
+        self.registry = registry
+        self.maxErrors = maxErrors
+        self.minSnr = minSnr
+        self.samples = samples
+        self.revalidate = revalidate
+        self.timeout = timeout
+        self._levels = {}
+        # The local TxPower as last read or set
+        self._power = None
+
+
+    def level(self, address):
+        """ The minimum power level for the link to 'address'.
+
+        Uses the cached level if it is recent, re-validates it with a link
+        test if it is old, and runs a full search otherwise.
+
+        :rtype: int.
+        :raises: IOError
+        """
+        cached = self._cached(address)
+        if cached is None:
+            return self.optimise(address)
+        level, when = cached
+        if time() - when < self.revalidate:
+            return level
+
+        def revalidate():
+            if not self._passes(address, level):
+                return self._search(address, level + 1, POWER_LEVELS[-1])
+            if level > POWER_LEVELS[0] and self._passes(address, level - 1):
+                return self._search(address, POWER_LEVELS[0], level - 1)
+            return level
+        return self._choose(address, revalidate)
+
+
+    def optimise(self, address, low=POWER_LEVELS[0], high=POWER_LEVELS[-1]):
+        """ Bisect power levels between 'low' and 'high' for 'address'.
+
+        Both ends of the link are left at the chosen level, or at their
+        original levels if setting it fails.
+
+        :returns: The lowest passing level, or the maximum level if none
+            passes.
+        :rtype: int.
+        :raises: IOError
+        """
+        return self._choose(address,
+                            lambda: self._search(address, low, high))
+
+
+    def apply(self, address):
+        """ Set the local transmit power for talking to 'address'.
+
+        :returns: The level applied.
+        :rtype: int.
+        """
+        level = self.level(address)
+        self._setLocal(level)
+        return level
+
+
+    def _choose(self, address, search):
+        """ Find a level with 'search' and set both ends of the link to it.
+        """
+        # The local level is read afresh for each search
+        self._power = None
+        local = self._localLevel()
+        remote = self._remoteLevel(address, local)
+        done = False
+        try:
+            best = search()
+            self._set(address, best)
+            done = True
+        finally:
+            if not done:
+                self._restore(address, local, remote)
+        self._store(address, best)
+        return best
+
+
+    def _search(self, address, low, high):
+        low = max(low, POWER_LEVELS[0])
+        high = min(high, POWER_LEVELS[-1])
+        if low > high or not self._passes(address, high):
+            # Nothing in range works; fall back to full power
+            return POWER_LEVELS[-1]
+        best = high
+        while low < best:
+            mid = (low + best) // 2
+            if self._passes(address, mid):
+                best = mid
+            else:
+                low = mid + 1
+        return best
+
+
+    def _passes(self, address, level):
+        try:
+            self._set(address, level)
+            for sample in range(self.samples):
+                result = self.modem.linkTest(address, timeout=self.timeout)
+                errors = int(result.get('ERR', 0))
+                snr = float(result.get('SNR', 0.0))
+                if errors > self.maxErrors or snr < self.minSnr:
+                    return False
+        except (IOError, IndexError, ValueError, AttributeError):
+            return False
+        return True
+
+
+    def _set(self, address, level):
+        """ Set both ends of the link to 'level'.
+
+        The command to the remote modem goes out at the local level in
+        force, so when stepping up the local level is raised first, and when
+        stepping down the remote one is lowered first.
+        """
+        if level > self._localLevel():
+            self._setLocal(level)
+            self.modem.remotePower(address, level)
+        else:
+            self.modem.remotePower(address, level)
+            self._setLocal(level)
+        if self.registry is not None:
+            self.registry.store(address, 'TxPower', level)
+
+
+    def _restore(self, address, local, remote):
+        """ Return both ends to the levels they had before a search, as far
+        as the link allows.
+        """
+        try:
+            self._setLocal(max(local, remote, self._localLevel()))
+            self.modem.remotePower(address, remote)
+            if self.registry is not None:
+                self.registry.store(address, 'TxPower', remote)
+        except IOError:
+            pass
+        try:
+            self._setLocal(local)
+        except IOError:
+            pass
+
+
+    def _localLevel(self):
+        if self._power is None:
+            self._power = int(self.modem.TxPower[0])
+        return self._power
+
+
+    def _setLocal(self, level):
+        self.modem.TxPower = level
+        self._power = level
+
+
+    def _remoteLevel(self, address, default):
+        """ The remote modem's last known level, or 'default'.
+        """
+        if self.registry is not None:
+            value = self.registry.lookup(address, 'TxPower')
+            if value is not None:
+                return value
+        return default
+
+
+    def _cached(self, address):
+        if self.registry is not None:
+            level = self.registry.properties(address).get('optimalPower')
+            if level is not None:
+                return level
+        return self._levels.get(address)
+
+
+    def _store(self, address, level):
+        now = time()
+        self._levels[address] = (level, now)
+        if self.registry is not None:
+            self.registry.store(address, 'optimalPower', level, now)
@@ -0,0 +1,430 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.profiler
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    End-to-end latency and throughput of the acoustic link.
+
+    A :class:`LinkProfiler` sends sequenced, timestamped probe payloads
+    across the water for each combination of ``TxRate`` and ``PktSize`` in a
+    sweep, and reports one-way and round-trip latency distributions,
+    goodput and loss. With both modems attached to the same host (or to one
+    :class:`~AcousticModem.simulator.Simulator`) both latencies are measured
+    on one clock, the remote modem echoing each probe. With only the local
+    modem, something at the far end must echo the probes, e.g.
+    :func:`reflect` running on the remote host, and only round trips are
+    measured.
+
+    Firmware packet echo (``PktEcho``) is turned off while profiling, since
+    the copies of packets it outputs would be counted with the probes.
+
+    Results can be kept in a :class:`ResultStore` to follow a link's
+    performance over time.
+
+    :license: MIT
+"""
+import json
+import sqlite3
+import struct
+import threading
+from time import time
+
+from .constants import PACKET_SIZES
+from .framing import extractFrames, toBytes
+from .telemetry import crc16
+
+PROBE_MAGIC = b'\x7eQ'
+# magic, run, sequence, send time
+_HEADER = struct.Struct('>2sHId')
+_CRC = struct.Struct('>H')
+MIN_PROBE = _HEADER.size + _CRC.size
+
+
+def encodeProbe(run, sequence, sent, size):
+    """ A probe payload of 'size' bytes, at least MIN_PROBE.
+
+    :rtype: bytes.
+    """
+    frame = _HEADER.pack(PROBE_MAGIC, run, sequence, sent)
+    frame += b'\x00' * (max(size, MIN_PROBE) - MIN_PROBE)
+    return frame + _CRC.pack(crc16(frame))
+
+
+def _check(probe):
+    return _CRC.unpack(probe[-_CRC.size:])[0] == crc16(probe[:-_CRC.size])
+
+
+class ProbeParser(object):
+    """ Finds probes in a received byte stream.
+    """
+    def __init__(self, size):
+        """
+        :param size: Size of the probes being sent.
+        :type size: int.
+        """
+        self.size = max(size, MIN_PROBE)
+        self._buffer = bytearray()
+
+
+    def feed(self, data):
+        """ Add received bytes.
+
+        :returns: (run, sequence, sent time, probe) of each valid probe
+            completed by 'data'.
+        :rtype: list.
+        """
+        self._buffer.extend(toBytes(data))
+        probes = []
+        for probe in extractFrames(self._buffer, PROBE_MAGIC,
+                                   lambda buf: self.size, _check):
+            magic, run, sequence, sent = _HEADER.unpack_from(probe)
+            probes.append((run, sequence, sent, probe))
+        return probes
+
+
+def distribution(values):
+    """ Summary statistics of 'values'.
+
+    :returns: count, min, mean, p50, p90, p99 and max; None for an empty
+        list.
+    :rtype: dict.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+
+    def percentile(q):
+        position = (len(ordered) - 1) * q / 100.0
+        low = int(position)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    return {'count': len(ordered), 'min': ordered[0],
+            'mean': sum(ordered) / float(len(ordered)),
+            'p50': percentile(50), 'p90': percentile(90),
+            'p99': percentile(99), 'max': ordered[-1]}
+
+
+def _read(modem):
+    return toBytes(modem.read())
+
+
+class LinkProfiler(object):
+    """ Measures the link from a local modem to a remote one.
+    """
+    def __init__(self, local, remote=None, echo=True, count=20,
+                 interval=0.0, timeout=30.0, store=None, label=None):
+        """
+        :param local: The sending modem; its RemoteAddr selects the remote.
+        :type local: ATM900.
+        :param remote: The receiving modem if it is attached to this host,
+            with its RemoteAddr set to the local modem.
+        :type remote: ATM900.
+        :param echo: Have each probe echoed back before sending the next,
+            measuring round trips. Otherwise probes are streamed to the
+            attached remote and only one-way latency is measured, giving
+            the streaming goodput.
+        :type echo: bool.
+        :param count: Probes per setting.
+        :type count: int.
+        :param interval: Seconds between probes; 0 sends them back to back.
+        :type interval: float.
+        :param timeout: Seconds to wait for each echo, or when streaming
+            for the next probe to arrive after the last is sent.
+        :type timeout: float.
+        :param store: Where to keep results.
+        :type store: ResultStore.
+        :param label: Name of the link in stored results.
+        :type label: str.
+        """
+        self.local = local
+        self.remote = remote
+        self.echo = echo
+        if not echo and remote is None:
+            raise ValueError('Streaming needs the remote modem attached')
+        self.count = count
+        self.interval = interval
+        self.timeout = timeout
+        self.store = store
+        self.label = label
+        self._run = 0
+
+
+    def sweep(self, rates=(8,), sizes=(2,)):
+        """ Profile every combination of 'rates' and 'sizes'.
+
+        PktEcho is disabled on both modems for the sweep. It, the local
+        modem's PktSize and both modems' TxRate are put back afterwards.
+
+        :param rates: TxRate settings.
+        :type rates: list.
+        :param sizes: PktSize settings; probes are the size of the test
+            message, but at least MIN_PROBE bytes.
+        :type sizes: list.
+        :returns: One result per combination, as from :meth:`measure`.
+        :rtype: list.
+        """
+        modems = [self.local] + ([self.remote] if self.remote else [])
+        saved = [(modem, modem.TxRate[0], modem.PktEcho) for modem in modems]
+        savedSize = self.local.PktSize[0]
+        results = []
+        try:
+            for modem in modems:
+                modem.PktEcho = False
+            for rate in rates:
+                for modem in modems:
+                    modem.TxRate = rate
+                for size in sizes:
+                    self.local.PktSize = size
+                    result = self.measure(PACKET_SIZES[size])
+                    result.update(txRate=rate, pktSize=size)
+                    if self.store is not None:
+                        self.store.add(self.label, result)
+                    results.append(result)
+        finally:
+            for modem, rate, echo in saved:
+                modem.TxRate = rate
+                if echo is not None:
+                    modem.PktEcho = echo
+            self.local.PktSize = savedSize
+        return results
+
+
+    def measure(self, size):
+        """ Send 'count' probes of 'size' bytes at the current settings.
+
+        PktEcho should be disabled, as :meth:`sweep` does.
+
+        :returns: sent, received and echoed probe counts, loss (one-way
+            unless echoing without the remote attached), goodput in payload
+            bytes per second and the 'oneWay' and 'roundTrip' latency
+            distributions in seconds.
+        :rtype: dict.
+        """
+        local, remote = self.local, self.remote
+        self._run = (self._run + 1) & 0xffff
+        run = self._run
+        outbound = ProbeParser(size)
+        inbound = ProbeParser(size)
+        oneWay = []
+        roundTrip = []
+        arrivals = []
+        seen = set()
+        echoed = set()
+
+        def collect():
+            if remote is not None:
+                for probe in outbound.feed(_read(remote)):
+                    if probe[0] != run or probe[1] in seen:
+                        continue
+                    now = local.time()
+                    seen.add(probe[1])
+                    oneWay.append(now - probe[2])
+                    arrivals.append(now)
+                    if self.echo:
+                        remote.write(probe[3])
+            if not self.echo:
+                return
+            for probe in inbound.feed(_read(local)):
+                if probe[0] != run or probe[1] in echoed:
+                    continue
+                now = local.time()
+                echoed.add(probe[1])
+                roundTrip.append(now - probe[2])
+                if remote is None:
+                    arrivals.append(now)
+
+        def wait(done):
+            # Keep waiting while probes are still arriving
+            deadline = local.time() + self.timeout
+            progress = len(seen) + len(echoed)
+            while not done() and local.time() < deadline:
+                local.sleep(0.05)
+                collect()
+                if len(seen) + len(echoed) != progress:
+                    progress = len(seen) + len(echoed)
+                    deadline = local.time() + self.timeout
+
+        # Go online and drop stale input before the clock starts
+        _read(local)
+        if remote is not None:
+            _read(remote)
+        start = local.time()
+        for sequence in range(self.count):
+            local.write(encodeProbe(run, sequence, local.time(), size))
+            if self.echo:
+                # Stop and wait: the link is half duplex
+                wait(lambda: sequence in echoed)
+            else:
+                collect()
+            if self.interval:
+                local.sleep(self.interval)
+        if not self.echo:
+            wait(lambda: len(seen) == self.count)
+
+        received = len(echoed) if remote is None else len(seen)
+        payload = max(size, MIN_PROBE) * received
+        elapsed = (max(arrivals) - start) if arrivals else None
+        return {'when': time(), 'size': max(size, MIN_PROBE),
+                'sent': self.count, 'received': received,
+                'echoed': len(echoed),
+                'loss': 1.0 - received / float(self.count),
+                'goodput': payload / elapsed if elapsed else 0.0,
+                'oneWay': distribution(oneWay),
+                'roundTrip': distribution(roundTrip)}
+
+
+def reflect(modem, duration, size=None):
+    """ Echo probes back to the sender for 'duration' seconds.
+
+    Runs on the host of the remote modem when profiling with only the local
+    modem attached. Only whole, valid probes are echoed. PktEcho is
+    disabled meanwhile and restored afterwards.
+
+    :param modem: The remote modem, with its RemoteAddr set to the sender.
+    :type modem: ATM900.
+    :param duration: Seconds to keep echoing.
+    :type duration: float.
+    :param size: The probe size, if known; otherwise every PktSize in
+        turn is tried.
+    :type size: int.
+    :returns: The number of probes echoed.
+    :rtype: int.
+    """
+    sizes = [size] if size else sorted(set(max(s, MIN_PROBE)
+                                           for s in PACKET_SIZES.values()))
+    parsers = [ProbeParser(s) for s in sizes]
+    echoed = 0
+    packetEcho = modem.PktEcho
+    modem.PktEcho = False
+    try:
+        deadline = modem.time() + duration
+        while modem.time() < deadline:
+            data = _read(modem)
+            for parser in parsers:
+                for probe in parser.feed(data):
+                    modem.write(probe[3])
+                    echoed += 1
+            modem.sleep(0.05)
+    finally:
+        if packetEcho is not None:
+            modem.PktEcho = packetEcho
+    return echoed
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    label       TEXT,
+    recorded    REAL,
+    tx_rate     INTEGER,
+    pkt_size    INTEGER,
+    loss        REAL,
+    goodput     REAL,
+    one_way     REAL,
+    round_trip  REAL,
+    result      TEXT
+);
+CREATE INDEX IF NOT EXISTS results_setting
+    ON results (label, tx_rate, pkt_size, recorded)
+"""
+
+
+class ResultStore(object):
+    """ Profiler results kept in SQLite for trend analysis.
+
+    Besides the full result, the median latencies, goodput and loss are
+    stored in columns of their own for querying.
+    """
+    def __init__(self, path=':memory:'):
+        """
+        :param path: Database file.
+        :type path: str.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+
+    def close(self):
+        self._db.close()
+
+
+    def add(self, label, result):
+        """ Store a result from :meth:`LinkProfiler.sweep`.
+        """
+        def median(name):
+            return result[name]['p50'] if result.get(name) else None
+
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO results (label, recorded, tx_rate, pkt_size, '
+                'loss, goodput, one_way, round_trip, result) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (label, result['when'], result.get('txRate'),
+                 result.get('pktSize'), result['loss'], result['goodput'],
+                 median('oneWay'), median('roundTrip'),
+                 json.dumps(result, sort_keys=True)))
+            self._db.commit()
+
+
+    def history(self, label=None, txRate=None, pktSize=None, since=None):
+        """ Stored results, oldest first.
+
+        :param label: Only results for this link.
+        :param txRate: Only results at this TxRate.
+        :param pktSize: Only results at this PktSize.
+        :param since: Only results recorded at or after this time.
+        :rtype: list.
+        """
+        clauses = []
+        params = []
+        for column, value in (('label', label), ('tx_rate', txRate),
+                              ('pkt_size', pktSize)):
+            if value is not None:
+                clauses.append(column + ' = ?')
+                params.append(value)
+        if since is not None:
+            clauses.append('recorded >= ?')
+            params.append(since)
+        query = 'SELECT result FROM results'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        with self._lock:
+            rows = self._db.execute(query + ' ORDER BY recorded, id',
+                                    params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+
+    def best(self, label=None, maxLoss=0.1):
+        """ The setting with the highest median goodput whose median loss
+        is at most 'maxLoss'.
+
+        :returns: (txRate, pktSize), or None if none qualifies.
+        :rtype: tuple.
+        """
+        query = ('SELECT tx_rate, pkt_size, loss, goodput FROM results '
+                 'WHERE tx_rate IS NOT NULL')
+        params = []
+        if label is not None:
+            query += ' AND label = ?'
+            params.append(label)
+        settings = {}
+        with self._lock:
+            for rate, size, loss, goodput in self._db.execute(query, params):
+                entry = settings.setdefault((rate, size), ([], []))
+                entry[0].append(loss)
+                entry[1].append(goodput)
+        best = None
+        bestGoodput = -1.0
+        for setting, (losses, goodputs) in settings.items():
+            if distribution(losses)['p50'] > maxLoss:
+                continue
+            goodput = distribution(goodputs)['p50']
+            if goodput > bestGoodput:
+                best, bestGoodput = setting, goodput
+        return best
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.profiles
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Remembered modem state per serial port.
+
+    After an ATM900 has detected its baud rate and put the modem into a
+    known state, it records the result here. The next ATM900 opened on the
+    same port starts from the recorded state instead of repeating the
+    detection and setup commands.
+
+    :license: MIT
+"""
+import json
+import os
+from time import time
+
+
+class PortProfiles(object):
+    """ Modem state per port, kept in a JSON file.
+    """
+    def __init__(self, path, maxAge=None):
+        """
+        :param path: The profile file; created on first store.
+        :type path: str.
+        :param maxAge: Ignore profiles older than this many seconds.
+        :type maxAge: float.
+        """
+        self.path = path
+        self.maxAge = maxAge
+
+
+    def get(self, port):
+        """ The recorded state of the modem on 'port'.
+
+        :returns: The profile, or None if there is no fresh one.
+        :rtype: dict.
+        """
+        profile = self._read().get(port)
+        if profile is None:
+            return None
+        if self.maxAge is not None and \
+                time() - profile.get('updated', 0) > self.maxAge:
+            return None
+        return profile
+
+
+    def store(self, port, **state):
+        """ Record the state of the modem on 'port', e.g. ``baudRate=9600``.
+        """
+        profiles = self._read()
+        profile = profiles.setdefault(port, {})
+        profile.update(state)
+        profile['updated'] = time()
+        self._write(profiles)
+
+
+    def discard(self, port):
+        """ Forget the modem on 'port'.
+        """
+        profiles = self._read()
+        if profiles.pop(port, None) is not None:
+            self._write(profiles)
+
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+
+    def _write(self, profiles):
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(profiles, f, indent=1, sort_keys=True)
+        os.rename(temporary, self.path)
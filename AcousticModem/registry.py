@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.registry
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Persistent registry of remote modems seen on the acoustic network.
+
+    Besides reachability, the registry keeps the last known answer to remote
+    queries (``remoteRegister``, ``linkTest``, power and rate settings) so
+    callers can answer them locally instead of over the acoustic link.
+
+    :license: MIT
+"""
+import json
+import sqlite3
+import threading
+from time import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    address     INTEGER PRIMARY KEY,
+    last_seen   REAL,
+    snr         REAL,
+    range       REAL,
+    serial      INTEGER,
+    firmware    TEXT
+);
+CREATE INDEX IF NOT EXISTS nodes_serial ON nodes (serial);
+CREATE TABLE IF NOT EXISTS properties (
+    address     INTEGER,
+    name        TEXT,
+    value       TEXT,
+    updated     REAL,
+    PRIMARY KEY (address, name)
+)
+"""
+
+_NODE_COLUMNS = (('serial', 'INTEGER'), ('firmware', 'TEXT'))
+
+
+class NodeRegistry(object):
+    """ SQLite backed store of remote node state keyed by modem address.
+    """
+    def __init__(self, path=':memory:'):
+        """ Open (or create) a registry.
+
+        :param path: Database file. An in-memory registry is used if omitted.
+        :type path: str.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            # Registries written before serial/firmware were tracked
+            columns = [row[1] for row in
+                       self._db.execute('PRAGMA table_info(nodes)')]
+            if columns:
+                for name, kind in _NODE_COLUMNS:
+                    if name not in columns:
+                        self._db.execute('ALTER TABLE nodes ADD COLUMN %s %s'
+                                         % (name, kind))
+            self._db.executescript(_SCHEMA)
+            self._db.commit()
+
+
+    def close(self):
+        """ Close the underlying database.
+        """
+        self._db.close()
+
+
+    def seen(self, address, snr=None, range=None, when=None):
+        """ Record a response from the node at 'address'.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param snr: Measured signal to noise ratio in dB.
+        :type snr: float.
+        :param range: Measured range in meters.
+        :type range: float.
+        :param when: Time of the response; defaults to now.
+        :type when: float.
+        """
+        when = time() if when is None else when
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO nodes (address) VALUES (?)', (address,))
+            self._db.execute(
+                'UPDATE nodes SET last_seen = ?, '
+                'snr = COALESCE(?, snr), range = COALESCE(?, range) '
+                'WHERE address = ?', (when, snr, range, address))
+            self._db.commit()
+
+
+    def get(self, address):
+        """ Stored state of the node at 'address'.
+
+        :returns: The node's fields, or None if it has never been seen.
+        :rtype: dict.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT * FROM nodes WHERE address = ?',
+                                   (address,)).fetchone()
+        return dict(row) if row is not None else None
+
+
+    def known(self, maxAge=None):
+        """ Addresses of known nodes, most recently seen first.
+
+        :param maxAge: Only return nodes seen within this many seconds.
+        :type maxAge: float.
+        :rtype: list.
+        """
+        since = time() - maxAge if maxAge is not None else 0
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT address FROM nodes WHERE last_seen >= ? '
+                'ORDER BY last_seen DESC', (since,)).fetchall()
+        return [row[0] for row in rows]
+
+
+    def identify(self, address, serial=None, firmware=None):
+        """ Record the serial number and firmware version of a node.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param serial: The modem's serial number.
+        :type serial: int.
+        :param firmware: The modem's firmware version string.
+        :type firmware: str.
+        """
+        with self._lock:
+            self._db.execute(
+                'INSERT OR IGNORE INTO nodes (address) VALUES (?)', (address,))
+            self._db.execute(
+                'UPDATE nodes SET serial = COALESCE(?, serial), '
+                'firmware = COALESCE(?, firmware) WHERE address = ?',
+                (serial, firmware, address))
+            self._db.commit()
+
+
+    def address(self, serial):
+        """ Address last associated with a modem serial number.
+
+        :rtype: int.
+        """
+        with self._lock:
+            row = self._db.execute('SELECT address FROM nodes WHERE serial = ?',
+                                   (serial,)).fetchone()
+        return row[0] if row is not None else None
+
+
+    def store(self, address, name, value, when=None):
+        """ Store the last known value of a remote property.
+
+        :param address: The address of the remote modem.
+        :type address: int.
+        :param name: Property name, e.g. ``'remoteRegister'`` or ``'TxPower'``.
+        :type name: str.
+        :param value: Any JSON serialisable value.
+        :param when: Time the value was observed; defaults to now.
+        :type when: float.
+        """
+        when = time() if when is None else when
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO properties VALUES (?, ?, ?, ?)',
+                (address, name, json.dumps(value), when))
+            self._db.commit()
+
+
+    def lookup(self, address, name, maxAge=None, default=None):
+        """ Last known value of a remote property.
+
+        :param maxAge: Ignore values older than this many seconds.
+        :type maxAge: float.
+        :returns: The stored value, or 'default' if missing or stale.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, updated FROM properties '
+                'WHERE address = ? AND name = ?', (address, name)).fetchone()
+        if row is None or (maxAge is not None and time() - row[1] > maxAge):
+            return default
+        return json.loads(row[0])
+
+
+    def properties(self, address):
+        """ All stored properties of a node with their update times.
+
+        :returns: {name: (value, updated)}
+        :rtype: dict.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT name, value, updated FROM properties WHERE address = ?',
+                (address,)).fetchall()
+        return dict((row[0], (json.loads(row[1]), row[2])) for row in rows)
+
+
+    def cached(self, address, name, fetch, maxAge):
+        """ Answer a query locally if the stored value is fresh enough.
+
+        :param fetch: Called with no arguments to query the modem when the
+            stored value is missing or older than 'maxAge'.
+        :type fetch: callable.
+        :param maxAge: Maximum acceptable staleness in seconds.
+        :type maxAge: float.
+        """
+        missing = object()
+        value = self.lookup(address, name, maxAge, missing)
+        if value is missing:
+            value = fetch()
+            self.store(address, name, value)
+        return value
+
+
+class RemoteCache(object):
+    """ Remote modem queries answered from a NodeRegistry where possible.
+
+    Queries go over the acoustic link only when the stored answer is older
+    than 'maxAge'. Remote settings made through this object are recorded so
+    they can be read back without a query.
+    """
+    def __init__(self, modem, registry, maxAge=3600.0):
+        """
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param registry: Where remote state is stored.
+        :type registry: NodeRegistry.
+        :param maxAge: Default staleness bound in seconds.
+        :type maxAge: float.
+        """
+        self.modem = modem
+        self.registry = registry
+        self.maxAge = maxAge
+
+
+    def remoteRegister(self, address, maxAge=None):
+        """ Remote configuration listing, see ``ATM900.remoteRegister``.
+        """
+        return self.registry.cached(
+            address, 'remoteRegister',
+            lambda: list(self.modem.remoteRegister(address)),
+            self.maxAge if maxAge is None else maxAge)
+
+
+    def linkTest(self, address, maxAge=None, timeout=None):
+        """ Link statistics, see ``ATM900.linkTest``.
+
+        A fresh test also updates the node's last seen time and SNR.
+        """
+        def fetch():
+            result = self.modem.linkTest(address, timeout=timeout)
+            try:
+                snr = float(result.get('SNR'))
+            except (TypeError, ValueError):
+                snr = None
+            self.registry.seen(address, snr=snr)
+            return result
+        return self.registry.cached(address, 'linkTest', fetch,
+                                    self.maxAge if maxAge is None else maxAge)
+
+
+    def remotePower(self, address, level):
+        """ Set and record a remote transmit power level.
+        """
+        self.modem.remotePower(address, level)
+        self.registry.store(address, 'TxPower', level)
+
+
+    def remoteRate(self, address, rate):
+        """ Set and record a remote transmit bit rate.
+        """
+        self.modem.remoteRate(address, rate)
+        self.registry.store(address, 'TxRate', rate)
+
+
+    def power(self, address, maxAge=None):
+        """ Last power level set on a remote modem, or None if unknown.
+        """
+        return self.registry.lookup(address, 'TxPower', maxAge)
+
+
+    def rate(self, address, maxAge=None):
+        """ Last bit rate set on a remote modem, or None if unknown.
+        """
+        return self.registry.lookup(address, 'TxRate', maxAge)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.response
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Parsed replies to AT commands.
+
+    A reply is tokenised once, in a single regular expression pass, into a
+    :class:`Response`. It is still a list of the reply's lines, so code
+    indexing the raw lines keeps working, and also carries the final
+    status, any echoed command and the value of the first value line split
+    into its numeric code and label, e.g. ``2 (Hardware)``.
+
+    :license: MIT
+"""
+import re
+
+# One match per line: a final status, or an optional "Name=" / "Name:"
+# prefix, a value and an optional "(label)"
+_LINE = re.compile(r'''
+    ^[ \t]*(?:
+        (?P<status>OK|ERROR|Error)\b[^\r\n]*?
+      | (?:(?P<name>@?[A-Za-z][\w ]*?)[ \t]*[=:][ \t]*)?
+        (?P<value>[^\s(][^\r\n(]*)?
+        (?:[ \t]*\((?P<label>[^)\r\n]*)\))?
+        [^\r\n]*?
+    )[ \t]*\r?$''', re.M | re.X)
+_NUMBER = re.compile(r'[-+]?\d+(\.\d*)?')
+# Space separated NAME:value pairs, as in link test results
+_PAIRS = re.compile(r'(\w+):(\S+)')
+
+
+def native(data):
+    """ Serial data as a native string, as the ATM900 reads and writes it:
+    bytes on Python 2, latin-1 text on Python 3.
+
+    :type data: str, bytes, bytearray.
+    :rtype: str.
+    """
+    if isinstance(data, (bytearray, memoryview)):
+        data = bytes(bytearray(data))
+    if isinstance(data, str):
+        return data
+    if isinstance(data, bytes):
+        return data.decode('latin-1')
+    return data.encode('latin-1')
+
+
+def number(text):
+    """ The first number in 'text'.
+
+    :returns: An int, or a float if it has a decimal point.
+    :rtype: int, float.
+    :raises: ValueError
+    """
+    match = _NUMBER.search(text or '')
+    if match is None:
+        raise ValueError('No number in %r' % text)
+    if match.group(1):
+        return float(match.group())
+    return int(match.group())
+
+
+def pairs(text):
+    """ NAME:value pairs in 'text' as a dict of strings.
+
+    :rtype: dict.
+    """
+    return dict(_PAIRS.findall(text))
+
+
+class Response(list):
+    """ A modem reply: its lines, plus the tokens parsed from them.
+
+    :ivar status: ``'OK'``, ``'ERROR'`` or None if the reply had no status
+        line.
+    :ivar echo: The command line echoed back by the modem, if any.
+    :ivar name: The parameter name the value was prefixed with, if any.
+    :ivar value: The first value in the reply, e.g. ``'9600'``.
+    :ivar code: The value as an int when it is numeric, else None.
+    :ivar label: The parenthesised label after the value, e.g. ``'Ena'``.
+    :ivar extra: Lines after the first value line, without the status.
+    """
+    __slots__ = ('status', 'echo', 'name', 'value', 'code', 'label', 'extra')
+
+    def __init__(self, raw='', command=None):
+        """
+        :param raw: The reply as read from the modem.
+        :type raw: str.
+        :param command: The command sent, used to recognise an echo.
+        :type command: str.
+        """
+        list.__init__(self)
+        self.status = self.echo = self.name = self.value = None
+        self.code = self.label = None
+        self.extra = []
+        sent = command.strip() if command else None
+        for match in _LINE.finditer(raw.strip('\r\n')):
+            line = match.group().strip('\r').rstrip(' ')
+            self.append(line)
+            if match.group('status'):
+                self.status = match.group('status').upper()
+            elif self.echo is None and line.strip() == sent:
+                self.echo = line.strip()
+            elif self.value is None and match.group('value'):
+                self.name = match.group('name')
+                self.value = match.group('value').rstrip()
+                self.label = match.group('label')
+                if self.value.isdigit():
+                    self.code = int(self.value)
+            elif line:
+                self.extra.append(line)
+
+
+    @property
+    def ok(self):
+        return self.status == 'OK'
+
+
+    def __repr__(self):
+        return 'Response(%s, value=%r, label=%r, status=%r)' % (
+            list.__repr__(self), self.value, self.label, self.status)
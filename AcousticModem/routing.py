@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.routing
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Multi-hop relay routing over ATM-900 acoustic links.
+
+    Every node in a relay chain is an ATM900 driven by its own host running a
+    :class:`Router`. Messages are wrapped in a small routing frame carrying the
+    full hop list, sent to the first hop in online mode and acknowledged hop
+    by hop. Relays re-address their local modem (``RemoteAddr``) to the next
+    hop and pass the frame on. Frames end with a CRC, so a corrupt frame is
+    dropped and the next one found.
+
+    :license: MIT
+"""
+import heapq
+import struct
+from collections import deque
+
+from .framing import extractFrames, toBytes
+from .telemetry import crc16
+
+FRAME_MAGIC = b'\x7eR'
+FRAME_DATA = 0
+FRAME_ACK = 1
+
+# magic, kind, source, destination, sequence number, hop count
+_HEADER = struct.Struct('>2sBBBHB')
+_LENGTH = struct.Struct('>H')
+_CRC = struct.Struct('>H')
+
+
+def linkCost(result):
+    """ Link cost from a linkTest result.
+
+    Cost is 1 per hop plus a penalty for bit errors and for SNR below 20 dB,
+    so a clean two-hop path is preferred over a marginal single hop.
+
+    :param result: The dictionary returned by ``ATM900.linkTest``.
+    :type result: dict.
+    :returns: The cost of the link, or None if the result is unusable.
+    :rtype: float.
+    """
+    try:
+        errors = int(result.get('ERR', 0))
+        snr = float(result.get('SNR', 0.0))
+    except (AttributeError, ValueError):
+        return None
+    return 1.0 + errors / 10.0 + max(0.0, 20.0 - snr) / 10.0
+
+
+def encodeFrame(kind, source, destination, sequence, route=(), payload=b''):
+    """ Build a routing frame.
+
+    An acknowledgement carries the source and sequence number of the
+    message it acknowledges, the address of the hop it goes back to as
+    'destination' and the acknowledging hop as its only route entry.
+
+    :param kind: FRAME_DATA or FRAME_ACK.
+    :type kind: int.
+    :param source: The address of the originating modem.
+    :type source: int.
+    :param destination: The address of the final destination.
+    :type destination: int.
+    :param sequence: Message sequence number (0-65535).
+    :type sequence: int.
+    :param route: The hops after the source, ending with the destination.
+    :type route: list.
+    :param payload: Message data.
+    :type payload: str.
+    :rtype: str.
+    """
+    payload = bytes(bytearray(payload))
+    frame = (_HEADER.pack(FRAME_MAGIC, kind, source, destination,
+                          sequence & 0xffff, len(route)) +
+             bytes(bytearray(route)) + _LENGTH.pack(len(payload)) + payload)
+    return frame + _CRC.pack(crc16(frame))
+
+
+def decodeFrames(buf):
+    """ Extract complete routing frames from a receive buffer.
+
+    Bytes preceding a frame header and frames failing their CRC are
+    discarded. Consumed bytes are removed from ``buf`` in place; an
+    incomplete trailing frame is left for the next call.
+
+    :param buf: Received bytes.
+    :type buf: bytearray.
+    :returns: (kind, source, destination, sequence, route, payload) tuples.
+    :rtype: list.
+    """
+    frames = []
+    for frame in extractFrames(buf, FRAME_MAGIC, _measure, _check):
+        _, kind, src, dst, seq, hops = _HEADER.unpack_from(frame)
+        offset = _HEADER.size + hops + _LENGTH.size
+        frames.append((kind, src, dst, seq,
+                       list(bytearray(frame[_HEADER.size:offset -
+                                            _LENGTH.size])),
+                       frame[offset:-_CRC.size]))
+    return frames
+
+
+def _measure(buf):
+    if len(buf) < _HEADER.size:
+        return None
+    offset = _HEADER.size + buf[_HEADER.size - 1]
+    if len(buf) < offset + _LENGTH.size:
+        return None
+    return offset + _LENGTH.size + \
+        _LENGTH.unpack(bytes(buf[offset:offset + _LENGTH.size]))[0] + \
+        _CRC.size
+
+
+def _check(frame):
+    return _CRC.unpack(frame[-_CRC.size:])[0] == crc16(frame[:-_CRC.size])
+
+
+class NeighbourTable(object):
+    """ Directed link costs between modem addresses.
+    """
+    def __init__(self):
+        self.links = {}
+
+
+    def update(self, a, b, result, symmetric=True):
+        """ Record a linkTest result for the link from 'a' to 'b'.
+
+        The ATX test measures both directions, so by default the reverse link
+        is recorded with the same cost.
+
+        :param result: linkTest result, or None if the test failed.
+        :type result: dict.
+        """
+        cost = linkCost(result) if result is not None else None
+        if cost is None:
+            self.remove(a, b, symmetric)
+        else:
+            self.setCost(a, b, cost, symmetric)
+
+
+    def setCost(self, a, b, cost, symmetric=True):
+        """ Set the cost of the link from 'a' to 'b' directly.
+        """
+        self.links.setdefault(a, {})[b] = float(cost)
+        if symmetric:
+            self.links.setdefault(b, {})[a] = float(cost)
+
+
+    def remove(self, a, b, symmetric=True):
+        """ Remove the link from 'a' to 'b'.
+        """
+        self.links.get(a, {}).pop(b, None)
+        if symmetric:
+            self.links.get(b, {}).pop(a, None)
+
+
+    def neighbours(self, address):
+        """ Addresses directly reachable from 'address'.
+
+        :rtype: dict.
+        """
+        return dict(self.links.get(address, {}))
+
+
+    def path(self, source, destination):
+        """ Least-cost path from 'source' to 'destination'.
+
+        :returns: The addresses along the path including both ends, or None
+            if the destination is unreachable.
+        :rtype: list.
+        """
+        if source == destination:
+            return [source]
+        best = {source: 0.0}
+        previous = {}
+        heap = [(0.0, source)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if node == destination:
+                break
+            if cost > best.get(node, float('inf')):
+                continue
+            for nxt, weight in self.links.get(node, {}).items():
+                total = cost + weight
+                if total < best.get(nxt, float('inf')):
+                    best[nxt] = total
+                    previous[nxt] = node
+                    heapq.heappush(heap, (total, nxt))
+        if destination not in previous:
+            return None
+        route = [destination]
+        while route[-1] != source:
+            route.append(previous[route[-1]])
+        return route[::-1]
+
+
+class Router(object):
+    """ Hop-by-hop acknowledged message routing.
+
+    The same class is used at the origin, at relays and at the destination:
+    call :meth:`poll` regularly on relays and destinations to acknowledge,
+    forward and deliver incoming frames. A frame sent again because its
+    acknowledgement was lost is acknowledged again but not passed on twice.
+    """
+    def __init__(self, modem, address, table=None, ackTimeout=30.0,
+                 retries=3, onMessage=None, history=None, window=256):
+        """ Create a router on top of a connected modem.
+
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param address: The local modem's address (``LocalAddr``).
+        :type address: int.
+        :param table: Shared neighbour table. A new one is created if omitted.
+        :type table: NeighbourTable.
+        :param ackTimeout: Seconds to wait for each hop's acknowledgement.
+        :type ackTimeout: float.
+        :param retries: Transmissions per hop before giving up.
+        :type retries: int.
+        :param onMessage: Called as ``onMessage(source, payload)`` for
+            messages addressed to this node.
+        :type onMessage: callable.
+        :param history: Number of delivered messages and stray
+            acknowledgements to keep; unbounded if not given.
+        :type history: int.
+        :param window: Number of recently handled messages remembered to
+            recognise retransmissions.
+        :type window: int.
+        """
+        self.modem = modem
+        self.address = address
+        self.table = table if table is not None else NeighbourTable()
+        self.ackTimeout = ackTimeout
+        self.retries = retries
+        self.onMessage = onMessage
+        self.delivered = deque(maxlen=history)
+        self._sequence = 0
+        self._remote = None
+        self._buffer = bytearray()
+        self._pending = []
+        # (next hop, frame, source, sequence) of messages to pass on
+        self._outgoing = []
+        # (hop, source, sequence) of acknowledgements received
+        self._acks = deque(maxlen=history)
+        # (source, sequence) of messages already forwarded or delivered
+        self._seen = deque(maxlen=window)
+
+
+    def setHistory(self, history):
+        """ Change how many delivered messages and stray acknowledgements
+        are kept. The most recent are kept.
+
+        :param history: Entries to keep; unbounded if None.
+        :type history: int.
+        """
+        self.delivered = deque(self.delivered, maxlen=history)
+        self._acks = deque(self._acks, maxlen=history)
+
+
+    def reset(self):
+        """ Discard buffered input, undelivered and unforwarded frames,
+        stray acknowledgements, the delivery history and the record of
+        handled messages. Sequence numbering carries on.
+        """
+        del self._buffer[:]
+        del self._pending[:]
+        del self._outgoing[:]
+        self._acks.clear()
+        self._seen.clear()
+        self.delivered.clear()
+
+
+    def buffers(self):
+        """ The router's buffers by name, for memory reports.
+
+        :rtype: dict.
+        """
+        return {'delivered': self.delivered, 'acks': self._acks,
+                'pending': self._pending, 'outgoing': self._outgoing,
+                'buffer': self._buffer, 'seen': self._seen}
+
+
+    def updateNeighbours(self, addresses):
+        """ Run linkTest against each address and update the table.
+
+        :param addresses: Candidate neighbour addresses.
+        :type addresses: list.
+        :returns: The addresses that responded.
+        :rtype: list.
+        """
+        alive = []
+        for address in addresses:
+            try:
+                result = self.modem.linkTest(address)
+            except (IOError, IndexError, ValueError):
+                result = None
+            self.table.update(self.address, address, result)
+            if result is not None:
+                alive.append(address)
+        return alive
+
+
+    def path(self, destination):
+        """ Least-cost path from this node to 'destination'.
+
+        :rtype: list.
+        """
+        return self.table.path(self.address, destination)
+
+
+    def send(self, destination, data):
+        """ Send 'data' to 'destination' along the least-cost path.
+
+        :returns: The path used.
+        :rtype: list.
+        :raises: ValueError, IOError
+        """
+        route = self.path(destination)
+        if route is None:
+            raise ValueError('No route to address %d' % destination)
+        self._sequence = (self._sequence + 1) & 0xffff
+        frame = encodeFrame(FRAME_DATA, self.address, destination,
+                            self._sequence, route[1:], data)
+        self._transmit(route[1], frame, self.address, self._sequence)
+        return route
+
+
+    def poll(self):
+        """ Process received frames.
+
+        Acknowledges frames addressed through this node, delivers those
+        whose destination is this node and then forwards the others to their
+        next hop. Retransmissions of frames already handled are only
+        acknowledged. Messages are delivered even if forwarding fails;
+        frames not yet forwarded are tried again on the next call.
+
+        :returns: (source, payload) for each message delivered.
+        :rtype: list.
+        :raises: IOError
+        """
+        self._receive()
+        delivered = []
+        while self._pending:
+            kind, src, dst, seq, route, payload = self._pending.pop(0)
+            if kind != FRAME_DATA or self.address not in route:
+                continue
+            hop = route.index(self.address)
+            previous = route[hop - 1] if hop > 0 else src
+            self._setRemote(previous)
+            self.modem.write(encodeFrame(FRAME_ACK, src, previous, seq,
+                                         [self.address]))
+            if (src, seq) in self._seen:
+                continue
+            self._seen.append((src, seq))
+            if dst == self.address:
+                delivered.append((src, payload))
+                self.delivered.append((src, payload))
+                if self.onMessage is not None:
+                    self.onMessage(src, payload)
+            else:
+                frame = encodeFrame(FRAME_DATA, src, dst, seq, route, payload)
+                self._outgoing.append((route[hop + 1], frame, src, seq))
+        while self._outgoing:
+            self._transmit(*self._outgoing[0])
+            self._outgoing.pop(0)
+        return delivered
+
+
+    def _setRemote(self, address):
+        """ Point the local modem at the next hop if it isn't already.
+        """
+        if self._remote != address:
+            self.modem.RemoteAddr = address
+            self._remote = address
+
+
+    def _receive(self):
+        data = self.modem.read()
+        if data:
+            self._buffer.extend(toBytes(data))
+        for frame in decodeFrames(self._buffer):
+            kind, src, dst, seq, route, payload = frame
+            if kind != FRAME_ACK:
+                self._pending.append(frame)
+            elif dst == self.address and route:
+                self._acks.append((route[0], src, seq))
+
+
+    def _transmit(self, hop, frame, source, sequence):
+        """ Send a frame to one hop and wait for its acknowledgement of
+        message 'sequence' from 'source'.
+        """
+        modem = self.modem
+        self._setRemote(hop)
+        for attempt in range(self.retries):
+            modem.write(frame)
+            deadline = modem.time() + self.ackTimeout
+            while modem.time() < deadline:
+                self._receive()
+                if (hop, source, sequence) in self._acks:
+                    self._acks.remove((hop, source, sequence))
+                    return
+                modem.sleep(0.05)
+        self.table.remove(self.address, hop)
+        raise IOError('No acknowledgement from relay %d' % hop)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.selftest
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Bench loopback test of the host-side stack using the modem's simulated
+    acoustic delay.
+
+    With ``@SimAcDly`` set, the modem stands in for the water: packets it
+    addresses to itself come back after the simulated delay, without a
+    transducer, tank or second modem. :func:`loopbackTest` configures this
+    along with the test message parameters (``PktSize``, ``RcvAll``),
+    streams sequenced probes through the loop and reports the effective
+    throughput and how much time the host adds, then restores the original
+    settings. Firmware packet echo (``PktEcho``) is turned off for the
+    test, as the profiler does: an echo of each looped probe would be
+    looped again and counted against the throughput.
+
+    :license: MIT
+"""
+import os
+
+from .constants import PACKET_SIZES
+from .profiler import MIN_PROBE, ProbeParser, distribution, encodeProbe
+
+
+def _cpu():
+    """ CPU seconds used by this process so far.
+    """
+    times = os.times()
+    return times[0] + times[1]
+
+
+def _save(modem):
+    return {'SimAcDly': modem.SimAcDly, 'PktSize': modem.PktSize[0],
+            'RcvAll': modem.RcvAll, 'PktEcho': modem.PktEcho,
+            'RemoteAddr': modem.RemoteAddr}
+
+
+def _restore(modem, settings):
+    for name in ('SimAcDly', 'PktSize', 'RcvAll', 'PktEcho', 'RemoteAddr'):
+        if settings[name] is not None:
+            setattr(modem, name, settings[name])
+
+
+def loopbackTest(modem, delay=500, size=2, count=50, timeout=10.0):
+    """ Stream probes through the modem's simulated acoustic loop.
+
+    Probes are streamed, so the throughput is what the whole loop sustains.
+    A probe's overhead is the time it took beyond the simulated delay and
+    its transfer over the serial line in both directions: queueing and
+    packet handling in the firmware plus the host's reading and parsing.
+    The host's own share is given separately as CPU time.
+
+    :param modem: The modem under test.
+    :type modem: ATM900.
+    :param delay: SimAcDly in ms.
+    :type delay: int.
+    :param size: PktSize setting; probes are the size of the test
+        message, but at least MIN_PROBE bytes.
+    :type size: int.
+    :param count: Probes to send.
+    :type count: int.
+    :param timeout: Seconds to wait for the next probe to come back.
+    :type timeout: float.
+    :returns: sent and received counts, loss, elapsed seconds, throughput
+        in bytes per second, the 'latency' and 'overhead' distributions in
+        seconds and 'cpu', the host CPU seconds used per probe.
+    :rtype: dict.
+    :raises: ValueError, ModemError
+    """
+    if size not in PACKET_SIZES:
+        raise ValueError('Invalid PktSize. Valid sizes are 0-7.')
+    length = max(PACKET_SIZES[size], MIN_PROBE)
+    saved = _save(modem)
+    try:
+        modem.SimAcDly = delay
+        modem.PktSize = size
+        modem.RcvAll = True
+        modem.PktEcho = False
+        modem.RemoteAddr = modem.LocalAddr
+
+        parser = ProbeParser(length)
+        latency = []
+        arrivals = []
+        seen = set()
+        # Go online and drop stale input before the clock starts
+        modem.read()
+        cpu = _cpu()
+        start = modem.time()
+
+        def collect():
+            for run, sequence, sent, probe in parser.feed(modem.read()):
+                if sequence in seen or sequence >= count:
+                    continue
+                now = modem.time()
+                seen.add(sequence)
+                latency.append(now - sent)
+                arrivals.append(now)
+
+        for sequence in range(count):
+            modem.write(encodeProbe(0, sequence, modem.time(), length))
+            collect()
+        deadline = modem.time() + timeout
+        while len(seen) < count and modem.time() < deadline:
+            modem.sleep(0.01)
+            received = len(seen)
+            collect()
+            if len(seen) != received:
+                deadline = modem.time() + timeout
+        cpu = _cpu() - cpu
+    finally:
+        _restore(modem, saved)
+
+    elapsed = (max(arrivals) - start) if arrivals else None
+    serial = 2 * length * 10.0 / (modem.baud_rate or 9600)
+    return {'sent': count, 'received': len(seen), 'size': length,
+            'delay': delay / 1000.0,
+            'loss': 1.0 - len(seen) / float(count),
+            'elapsed': elapsed,
+            'throughput': length * len(seen) / elapsed if elapsed else 0.0,
+            'latency': distribution(latency),
+            'overhead': distribution([value - delay / 1000.0 - serial
+                                      for value in latency]),
+            'cpu': cpu / float(count)}
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.session
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Memory-bounded operation for long running deployments.
+
+    A :class:`Session` applies fixed capacity limits to a modem and to the
+    subsystems attached to it, keeps a ring buffer of recent command
+    timings, and reports how much memory each tracked buffer and the
+    process are using.
+
+    :license: MIT
+"""
+import sys
+from collections import deque
+from time import time
+
+
+class SessionLimits(object):
+    """ Capacity limits for every growing buffer in a session.
+
+    :ivar maxResponse: Characters of modem response kept while waiting for a
+        pattern.
+    :ivar history: Entries kept in per-command and per-message histories.
+    :ivar maxPending: Commands allowed to wait in a CommandQueue.
+    :ivar maxLine: Longest status line held back by a Demultiplexer.
+    """
+    def __init__(self, maxResponse=65536, history=1024, maxPending=256,
+                 maxLine=256):
+        self.maxResponse = maxResponse
+        self.history = history
+        self.maxPending = maxPending
+        self.maxLine = maxLine
+
+
+def residentMemory():
+    """ Current resident set size of this process in bytes.
+
+    Falls back to the peak RSS where the current value isn't available.
+
+    :rtype: int.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        import os
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS bytes
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Session(object):
+    """ A modem and its subsystems running under fixed memory limits.
+    """
+    def __init__(self, modem, limits=None):
+        """
+        :param modem: The modem to bound.
+        :type modem: ATM900.
+        :param limits: Capacity limits; defaults to SessionLimits().
+        :type limits: SessionLimits.
+        """
+        self.modem = modem
+        self.limits = limits if limits is not None else SessionLimits()
+        self.history = deque(maxlen=self.limits.history)
+        self.commands = 0
+        self._components = []
+        modem.maxResponse = self.limits.maxResponse
+
+
+    def attach(self, component):
+        """ Apply the session limits to a subsystem and track it.
+
+        Understands Router, CommandQueue and Demultiplexer; anything else
+        is only tracked in the memory report.
+
+        :returns: The component.
+        """
+        limits = self.limits
+        if hasattr(component, 'setHistory'):
+            component.setHistory(limits.history)
+        if hasattr(component, 'maxPending'):
+            component.maxPending = limits.maxPending
+        if hasattr(component, 'maxLine'):
+            component.maxLine = limits.maxLine
+        self._components.append(component)
+        return component
+
+
+    def reset(self):
+        """ Clear the command history and reset every attached subsystem.
+        """
+        self.history.clear()
+        for component in self._components:
+            if hasattr(component, 'reset'):
+                component.reset()
+
+
+    def command(self, name, *args):
+        """ Run a modem method or read a property, recording its duration.
+
+        :param name: Method or property name, e.g. ``'linkTest'``.
+        :type name: str.
+        """
+        start = time()
+        try:
+            value = getattr(self.modem, name)
+            if args or callable(value):
+                value = value(*args)
+            return value
+        finally:
+            self.commands += 1
+            self.history.append((name, start, time() - start))
+
+
+    def report(self):
+        """ Memory used by the session.
+
+        :returns: ``rss`` (process resident bytes) and, per tracked buffer,
+            its entry count and approximate size in bytes.
+        :rtype: dict.
+        """
+        buffers = {'history': self.history}
+        for n, component in enumerate(self._components):
+            if not hasattr(component, 'buffers'):
+                continue
+            name = '%s%d' % (type(component).__name__, n)
+            for attr, buf in component.buffers().items():
+                buffers[name + '.' + attr] = buf
+        report = {'rss': residentMemory(), 'commands': self.commands}
+        for name, buf in buffers.items():
+            size = sys.getsizeof(buf)
+            if not isinstance(buf, (bytes, bytearray)):
+                size += sum(sys.getsizeof(item) for item in buf)
+            report[name] = (len(buf), size)
+        return report
@@ -0,0 +1,732 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.simulator
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Discrete-event simulation of a network of ATM-900 modems.
+
+    A :class:`Simulator` hosts any number of :class:`VirtualModem` nodes
+    sharing one acoustic :class:`Channel`. The channel model covers
+    propagation delay from range, packet duration from the ``TxRate`` bit
+    rate, half duplex operation, collisions between overlapping packets and
+    packet loss against SNR.
+
+    Each node has a serial port that can be handed to a real ATM900::
+
+        sim = Simulator(seed=1)
+        sim.addNode(1, (0, 0, 100))
+        sim.addNode(2, (1500, 0, 100))
+        modem = ATM900('sim://1', 9600, transport=sim.port(1))
+        modem.linkTest(2, timeout=30)
+
+    The ports carry the simulator's clock, so the ATM900 waits in simulated
+    time and the network runs as fast as the host can process events. The
+    simulator is driven from one thread. Hosts that must run at the same
+    time as it, e.g. a relay's router while the origin waits for an
+    acknowledgement, are started with :meth:`Simulator.spawn`: each runs
+    in its own thread, but only while the simulation waits on it, so the
+    simulation stays deterministic. Background traffic can be scheduled
+    with :meth:`Simulator.schedule`, e.g. ``VirtualModem.transmit`` calls.
+
+    The nodes understand AT, ATO, ATI, ATH, ATD, ATX (link test), ``+++``
+    and getting and setting ``@`` parameters; other commands are answered
+    with ERROR. Serial port 2 and transport addressing (``InputMode``,
+    ``TPortMode``, ``SrcP1``, ``SrcP2``, ``Dst1``-``Dst4``) are modelled
+    too, as is the ``SimAcDly`` bench loopback of data a node addresses to
+    itself.
+
+    :license: MIT
+"""
+import heapq
+import itertools
+import math
+import random
+import threading
+
+from .constants import BIT_RATES, BROADCAST
+from .response import native
+
+SPEED_OF_SOUND = 1500.0
+
+# SNR in dB at which half of the packets sent at each TxRate are lost
+THRESHOLDS = {2: -3.0, 3: 0.0, 4: 3.0, 5: 4.0, 6: 5.0, 7: 6.0, 8: 9.0,
+              9: 8.0, 10: 11.0, 11: 14.0, 12: 17.0, 13: 20.0}
+# Source level relative to maximum for each TxPower setting
+POWER_LEVELS = {1: -21.0, 2: -18.0, 3: -15.0, 4: -12.0, 5: -9.0, 6: -6.0,
+                7: -3.0, 8: 0.0}
+
+DEFAULTS = {
+    'AcRspTmOut': '12.0',
+    'DataRetry': 'Dis',
+    'Dst1': '1',
+    'Dst2': '2',
+    'Dst3': '1',
+    'Dst4': '2',
+    'FwdDelay': '0.05',
+    'InputMode': '1',
+    'LocalAddr': '0',
+    'LogMode': '0',
+    'P1Baud': '9600',
+    'P1EchoChar': 'Ena',
+    'P2Baud': '9600',
+    'PktEcho': 'Dis',
+    'PktSize': '2',
+    'RcvAll': 'Dis',
+    'RemoteAddr': '0',
+    'SimAcDly': '0',
+    'SrcP1': '1',
+    'SrcP2': '2',
+    'TPortMode': '0',
+    'TxPower': '8',
+    'TxRate': '8',
+    'Verbose': '1',
+    'WakeTones': 'Dis',
+}
+
+DATA = 'data'
+PING = 'ping'
+PONG = 'pong'
+
+
+class Packet(object):
+    """ An acoustic transmission.
+    """
+    __slots__ = ('kind', 'source', 'destination', 'payload', 'rate',
+                 'power', 'transport')
+
+    def __init__(self, kind, source, destination, payload='', rate=8,
+                 power=8, transport=None):
+        self.kind = kind
+        self.source = source
+        self.destination = destination
+        self.payload = payload
+        self.rate = rate
+        self.power = power
+        self.transport = transport
+
+
+    def __len__(self):
+        return max(len(self.payload), 8)
+
+
+class Channel(object):
+    """ Acoustic propagation between nodes.
+
+    Received SNR is the source level less spherical spreading, absorption
+    and ambient noise. A packet is lost with a probability that rises
+    smoothly as its SNR falls below the threshold for its bit rate.
+    """
+    def __init__(self, sourceLevel=185.0, noise=100.0, absorption=1.2,
+                 overhead=0.5, width=1.5, capture=10.0, floor=-10.0):
+        """
+        :param sourceLevel: Source level at TxPower 8 in dB re 1 uPa @ 1 m.
+        :type sourceLevel: float.
+        :param noise: Ambient noise level over the receive band in dB.
+        :type noise: float.
+        :param absorption: Absorption in dB/km.
+        :type absorption: float.
+        :param overhead: Seconds of wakeup and training signal per packet.
+        :type overhead: float.
+        :param width: dB over which packet loss goes from about 27% to 73%
+            around the threshold.
+        :type width: float.
+        :param capture: A packet survives a collision if it is this many dB
+            stronger than every packet it overlaps.
+        :type capture: float.
+        :param floor: Signals below this SNR neither decode nor interfere.
+        :type floor: float.
+        """
+        self.sourceLevel = sourceLevel
+        self.noise = noise
+        self.absorption = absorption
+        self.overhead = overhead
+        self.width = width
+        self.capture = capture
+        self.floor = floor
+
+
+    def distance(self, a, b):
+        """ Slant range between two nodes in metres.
+        """
+        return math.sqrt(sum((p - q) ** 2
+                             for p, q in zip(a.position, b.position)))
+
+
+    def delay(self, distance):
+        """ Propagation delay over 'distance' metres in seconds.
+        """
+        return distance / SPEED_OF_SOUND
+
+
+    def duration(self, packet):
+        """ Seconds 'packet' takes to transmit.
+        """
+        return self.overhead + len(packet) * 8.0 / BIT_RATES[packet.rate]
+
+
+    def snr(self, packet, distance):
+        """ Received SNR of 'packet' after 'distance' metres in dB.
+        """
+        loss = 20.0 * math.log10(max(distance, 1.0)) + \
+            self.absorption * distance / 1000.0
+        return self.sourceLevel + POWER_LEVELS[packet.power] - loss - \
+            self.noise
+
+
+    def success(self, packet, snr):
+        """ Probability that 'packet' received at 'snr' decodes.
+        """
+        margin = (snr - THRESHOLDS[packet.rate]) / self.width
+        if margin < -50:
+            return 0.0
+        return 1.0 / (1.0 + math.exp(-margin))
+
+
+class Process(object):
+    """ A host program running in simulated time.
+
+    :ivar done: True once the program has returned or raised.
+    :ivar result: What it returned.
+    :ivar error: The exception it raised, if any.
+    """
+    def __init__(self, simulator, function, args, kwargs):
+        self.simulator = simulator
+        self.done = False
+        self.result = None
+        self.error = None
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+        # Handed back and forth so that only one side runs at a time
+        self._turn = threading.Event()
+        self._idle = threading.Event()
+        self.thread = threading.Thread(target=self._main)
+        self.thread.daemon = True
+
+
+    def _main(self):
+        self._turn.wait()
+        self._turn.clear()
+        try:
+            self.result = self._function(*self._args, **self._kwargs)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.done = True
+            del self.simulator._processes[self.thread]
+            self._idle.set()
+
+
+    def _step(self):
+        """ Let the program run until it next waits or finishes.
+        """
+        self._turn.set()
+        self._idle.wait()
+        self._idle.clear()
+
+
+    def _wait(self, seconds):
+        self.simulator.schedule(seconds, self._step)
+        self._idle.set()
+        self._turn.wait()
+        self._turn.clear()
+
+
+class _Reception(object):
+    __slots__ = ('packet', 'sender', 'end', 'snr', 'lost')
+
+    def __init__(self, packet, sender, end, snr):
+        self.packet = packet
+        self.sender = sender
+        self.end = end
+        self.snr = snr
+        self.lost = False
+
+
+class Simulator(object):
+    """ Event queue, virtual clock and shared channel of a modem network.
+
+    :ivar now: Simulated time in seconds.
+    :ivar stats: Counters of packets sent, delivered, lost in collisions
+        and lost to low SNR by their intended receivers.
+    """
+    def __init__(self, channel=None, seed=None, poll=0.01):
+        """
+        :param channel: The propagation model; a default Channel if omitted.
+        :type channel: Channel.
+        :param seed: Seed for packet loss and reply jitter, for repeatable
+            runs.
+        :type seed: int.
+        :param poll: Simulated seconds each empty poll of a port takes.
+        :type poll: float.
+        """
+        self.channel = channel or Channel()
+        self.random = random.Random(seed)
+        self.poll = poll
+        self.now = 0.0
+        self.nodes = []
+        self.stats = {'sent': 0, 'delivered': 0, 'collisions': 0,
+                      'faded': 0}
+        self._events = []
+        self._sequence = itertools.count()
+        # Running host programs by thread
+        self._processes = {}
+
+
+    def addNode(self, address, position=(0.0, 0.0, 0.0), **settings):
+        """ Add a modem to the network.
+
+        :param address: Its LocalAddr.
+        :type address: int.
+        :param position: (x, y, depth) in metres.
+        :type position: tuple.
+        :param settings: Initial ``@`` parameters, e.g. ``TxRate=10``.
+        :returns: The new node.
+        :rtype: VirtualModem.
+        """
+        node = VirtualModem(self, address, position, settings)
+        self.nodes.append(node)
+        return node
+
+
+    def node(self, address):
+        """ The node whose LocalAddr is 'address'.
+
+        :rtype: VirtualModem.
+        :raises: KeyError
+        """
+        for node in self.nodes:
+            if node.address == address:
+                return node
+        raise KeyError(address)
+
+
+    def port(self, address, baudrate=None, number=1):
+        """ A host serial port of the node at 'address'.
+
+        :param number: Serial port 1 or 2.
+        :type number: int.
+        :rtype: VirtualPort.
+        """
+        node = self.node(address)
+        port = node.port if number == 1 else node.port2
+        if baudrate is not None:
+            port.baudrate = baudrate
+        return port
+
+
+    def time(self):
+        return self.now
+
+
+    def sleep(self, seconds):
+        process = self._processes.get(threading.current_thread())
+        if process is None:
+            self.run(self.now + seconds)
+        else:
+            process._wait(seconds)
+
+
+    def spawn(self, function, *args, **kwargs):
+        """ Run ``function(*args, **kwargs)`` as a host program alongside
+        the caller, starting at the current simulated time.
+
+        The program runs in a thread of its own whenever the simulation
+        reaches the time it is waiting for, and the simulation waits for it
+        in turn, so programs never run concurrently. Waits made through the
+        simulator's clock, e.g. by an ATM900 on a simulated port, take
+        simulated time. A program that is still waiting when the
+        simulation is abandoned is left blocked.
+
+        :rtype: Process.
+        """
+        process = Process(self, function, args, kwargs)
+        self._processes[process.thread] = process
+        process.thread.start()
+        self.schedule(0.0, process._step)
+        return process
+
+
+    def schedule(self, delay, callback, *args):
+        """ Call ``callback(*args)`` after 'delay' simulated seconds.
+        """
+        heapq.heappush(self._events, (self.now + delay, next(self._sequence),
+                                      callback, args))
+
+
+    def run(self, until=None):
+        """ Process events up to simulated time 'until', or until none are
+        left.
+        """
+        events = self._events
+        while events and (until is None or events[0][0] <= until):
+            when, _, callback, args = heapq.heappop(events)
+            self.now = when
+            callback(*args)
+        if until is not None and until > self.now:
+            self.now = until
+
+
+    def _transmit(self, sender, packet):
+        """ Start 'packet' from 'sender' towards every other node.
+        """
+        channel = self.channel
+        duration = channel.duration(packet)
+        extra = float(sender.settings['SimAcDly']) / 1000.0
+        self.stats['sent'] += 1
+        if extra and packet.kind == DATA and \
+                packet.destination == sender.address:
+            # The modem's bench loopback: data to itself comes back after
+            # the simulated delay, without touching the channel
+            self.schedule(duration + extra, sender._looped, packet)
+        for node in self.nodes:
+            if node is sender:
+                continue
+            distance = channel.distance(sender, node)
+            snr = channel.snr(packet, distance)
+            if snr < channel.floor:
+                continue
+            self.schedule(channel.delay(distance) + extra, node._arrive,
+                          packet, sender, duration, snr)
+        return duration
+
+
+class VirtualPort(object):
+    """ Host end of a simulated modem's serial port.
+
+    Offers the transport interface of :mod:`AcousticModem.transport`, with
+    the simulator as its clock. Reads wait in simulated time, and polling an
+    empty port advances the simulation by one poll interval.
+
+    :ivar buffer: Output of the modem waiting to be read.
+    """
+    def __init__(self, node, number, baudrate=None, timeout=1.0):
+        self.node = node
+        self.number = number
+        self.clock = node.simulator
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.buffer = ''
+        self._open = True
+
+
+    def isOpen(self):
+        return self._open
+
+
+    def open(self):
+        self._open = True
+
+
+    def close(self):
+        self._open = False
+
+
+    def write(self, data):
+        if not self._open:
+            raise IOError('Port is closed')
+        if self.inStep():
+            self.node._hostWrite(self.number, native(data))
+        return len(data)
+
+
+    def inWaiting(self):
+        if not self.buffer:
+            self.clock.sleep(self.clock.poll)
+        return len(self.buffer)
+
+
+    def read(self, size=1):
+        self._wait(lambda: len(self.buffer) >= size)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+    def readline(self):
+        self._wait(lambda: '\n' in self.buffer)
+        end = self.buffer.find('\n') + 1 or len(self.buffer)
+        data, self.buffer = self.buffer[:end], self.buffer[end:]
+        return data
+
+
+    def inStep(self):
+        """ Whether the host and modem agree on the baud rate; if not,
+        nothing gets through intact.
+        """
+        rate = int(self.node.settings['P%dBaud' % self.number])
+        return self.baudrate in (None, rate)
+
+
+    def _wait(self, ready):
+        clock = self.clock
+        deadline = clock.now + (self.timeout or 0)
+        while not ready() and clock.now < deadline:
+            clock.run(min(deadline, clock.now + clock.poll))
+
+
+class VirtualModem(object):
+    """ A simulated ATM-900 node.
+
+    :ivar settings: ``@`` parameters as the strings the modem reports.
+    :ivar port: Host end of serial port 1.
+    :ivar port2: Host end of serial port 2.
+    :ivar configMode: True in command mode, False online.
+    """
+    guard = 1.0  # Silence required either side of +++
+    latency = 0.02  # Seconds to answer a command
+    turnaround = 1.0  # Seconds before answering a link test
+    maxPacket = 256  # Largest data packet in bytes
+
+    def __init__(self, simulator, address, position, settings):
+        self.simulator = simulator
+        self.position = tuple(position)
+        self.settings = dict(DEFAULTS)
+        for name, value in settings.items():
+            self.settings[name] = str(value)
+        self.settings['LocalAddr'] = str(address)
+        self.configMode = True
+        self.port = VirtualPort(self, 1, int(self.settings['P1Baud']))
+        self.port2 = VirtualPort(self, 2, int(self.settings['P2Baud']))
+        self._line = ''
+        self._data = {1: '', 2: ''}
+        self._writes = {1: 0, 2: 0}
+        self._lastInput = float('-inf')
+        self._escaping = False
+        self._queue = []
+        self._transmitting = False
+        self._receptions = []
+        self._tests = {}
+
+
+    @property
+    def address(self):
+        return int(self.settings['LocalAddr'])
+
+
+    def transmit(self, data, destination=None, transport=None):
+        """ Send 'data' acoustically, as if written by the host online.
+
+        :param destination: Address to send to; defaults to RemoteAddr.
+        :type destination: int.
+        :param transport: Transport address to tag the data with.
+        :type transport: int.
+        """
+        if destination is None:
+            destination = int(self.settings['RemoteAddr'])
+        data = native(data)
+        for start in range(0, len(data), self.maxPacket):
+            self._send(Packet(DATA, self.address, destination,
+                              data[start:start + self.maxPacket],
+                              transport=transport))
+
+
+    def _emit(self, text, number=1):
+        port = self.port if number == 1 else self.port2
+        if port.inStep():
+            port.buffer += text
+
+
+    def _hostWrite(self, number, data):
+        if number == 2:
+            # Port 2 only takes data, and only in dual input mode
+            if self.settings['InputMode'] == '2':
+                self._online(2, data)
+            return
+        now = self.simulator.now
+        quiet = now - self._lastInput
+        self._lastInput = now
+        self._writes[1] += 1
+        if self._escaping:
+            # More input within the guard time: the +++ was just data
+            self._escaping = False
+            data = '+++' + data
+        elif data == '+++' and quiet >= self.guard - 1e-9 and \
+                not self._line:
+            self._escaping = True
+            self.simulator.schedule(self.guard, self._escape,
+                                    self._writes[1])
+            return
+        if self.configMode:
+            self._typed(data)
+        else:
+            self._online(1, data)
+
+
+    def _online(self, number, data):
+        """ Buffer data input on serial port 'number' for forwarding.
+        """
+        self._writes[number] += 1
+        self._data[number] += data
+        if len(self._data[number]) >= self.maxPacket:
+            self._forward(number, None)
+        else:
+            self.simulator.schedule(float(self.settings['FwdDelay']),
+                                    self._forward, number,
+                                    self._writes[number])
+
+
+    def _escape(self, writes):
+        if writes != self._writes[1]:
+            return
+        self._escaping = False
+        self.configMode = True
+        self._emit('\r\nOK\r\n')
+
+
+    def _forward(self, number, writes):
+        if writes is not None and writes != self._writes[number]:
+            return
+        data, self._data[number] = self._data[number], ''
+        if not data:
+            return
+        transport = None
+        if self.settings['InputMode'] == '2' or \
+                self.settings['TPortMode'] == '1':
+            transport = int(self.settings['SrcP%d' % number])
+        self.transmit(data, transport=transport)
+
+
+    def _typed(self, data):
+        if self.settings['P1EchoChar'] == 'Ena':
+            self._emit(data)
+        self._line += data
+        while True:
+            end = min([i for i in (self._line.find('\r'),
+                                   self._line.find('\n')) if i >= 0] or [-1])
+            if end < 0:
+                break
+            command, self._line = self._line[:end].strip(), \
+                self._line[end + 1:]
+            if command:
+                self.simulator.schedule(self.latency, self._command, command)
+
+
+    def _command(self, command):
+        upper = command.upper()
+        if command.startswith('@'):
+            name, equals, value = command[1:].partition('=')
+            if name not in self.settings:
+                self._emit('\r\nERROR\r\n')
+            elif not equals:
+                self._emit('\r\n%s=%s\r\nOK\r\n' % (name,
+                                                     self.settings[name]))
+            else:
+                self._emit('\r\nOK\r\n')
+                self.settings[name] = value
+        elif upper == 'AT' or upper == 'ATH' or upper == 'AT&W':
+            self._emit('\r\nOK\r\n')
+        elif upper == 'ATO':
+            self.configMode = False
+            self._emit('\r\nOnline\r\n')
+        elif upper == 'ATI':
+            self._emit('\r\nATM-900 Simulator\r\nFirmware 0.0.0\r\nOK\r\n')
+        elif upper.startswith('ATD') and command[3:].isdigit():
+            self.settings['RemoteAddr'] = str(int(command[3:]))
+            self.configMode = False
+            self._emit('\r\nCONNECT %03d\r\n' % int(command[3:]))
+        elif upper.startswith('ATX') and command[3:].isdigit():
+            self._linkTest(int(command[3:]))
+        else:
+            self._emit('\r\nERROR\r\n')
+
+
+    def _linkTest(self, destination):
+        token = object()
+        self._tests[destination] = token
+        self._send(Packet(PING, self.address, destination))
+        self.simulator.schedule(float(self.settings['AcRspTmOut']),
+                                self._testTimeout, destination, token)
+
+
+    def _testTimeout(self, destination, token):
+        if self._tests.get(destination) is token:
+            del self._tests[destination]
+            self._emit('\r\nResponse Not Received\r\n')
+
+
+    def _send(self, packet):
+        packet.rate = int(self.settings['TxRate'])
+        packet.power = int(self.settings['TxPower'])
+        self._queue.append(packet)
+        if not self._transmitting:
+            self._next()
+
+
+    def _next(self):
+        if not self._queue:
+            self._transmitting = False
+            return
+        self._transmitting = True
+        # Half duplex: whatever is being received now is lost
+        for reception in self._receptions:
+            reception.lost = True
+        duration = self.simulator._transmit(self, self._queue.pop(0))
+        self.simulator.schedule(duration, self._next)
+
+
+    def _arrive(self, packet, sender, duration, snr):
+        simulator = self.simulator
+        reception = _Reception(packet, sender, simulator.now + duration, snr)
+        reception.lost = self._transmitting
+        capture = simulator.channel.capture
+        for other in self._receptions:
+            if other.end <= simulator.now + 1e-9:
+                # Ends as this one starts, e.g. back to back from one sender
+                continue
+            if other.snr - reception.snr < capture:
+                other.lost = True
+            if reception.snr - other.snr < capture:
+                reception.lost = True
+        self._receptions.append(reception)
+        simulator.schedule(duration, self._received, reception)
+
+
+    def _looped(self, packet):
+        self.simulator.stats['delivered'] += 1
+        number = 1
+        if packet.transport is not None:
+            number = int(self.settings['Dst%d' % packet.transport])
+        self._emit(packet.payload, number)
+
+
+    def _received(self, reception):
+        self._receptions.remove(reception)
+        packet = reception.packet
+        simulator = self.simulator
+        address = self.address
+        intended = packet.destination in (address, BROADCAST)
+        if not intended and not (packet.kind == DATA and
+                                 self.settings['RcvAll'] == 'Ena'):
+            return
+        if reception.lost:
+            simulator.stats['collisions'] += intended
+            return
+        if simulator.random.random() >= \
+                simulator.channel.success(packet, reception.snr):
+            simulator.stats['faded'] += intended
+            return
+        simulator.stats['delivered'] += intended
+        if packet.kind == DATA:
+            number = 1
+            if packet.transport is not None:
+                number = int(self.settings['Dst%d' % packet.transport])
+            self._emit(packet.payload, number)
+        elif packet.kind == PING:
+            self.settings['RemoteAddr'] = str(packet.source)
+            delay = self.turnaround
+            if packet.destination == BROADCAST:
+                # Spread the replies so that they don't all collide
+                delay += simulator.random.random() * 2.0
+            simulator.schedule(delay, self._send,
+                               Packet(PONG, address, packet.source))
+        elif packet.kind == PONG:
+            # A reply to a link test of this node or of everyone
+            if self._tests.pop(packet.source, None) is None and \
+                    self._tests.pop(BROADCAST, None) is None:
+                return
+            self._emit('\r\nSource:%03d Destination:%03d Range:%06.1f\r\n'
+                       'ERR:000 SNR:%04.1f AGC:42 SPD:+00.0 CCERR:000\r\n' %
+                       (packet.source, address,
+                        simulator.channel.distance(self, reception.sender),
+                        max(reception.snr, 0.0)))
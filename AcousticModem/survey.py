@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.survey
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Link surveys built from repeated ``rateTest`` runs.
+
+    A :class:`Survey` sweeps remote addresses and transmit power levels,
+    running the multiple bit rate test at each point, and stores the results
+    in NumPy arrays indexed by (address, power, mode, repeat) so summaries
+    are computed without any per-line string handling.
+
+    Requires NumPy.
+
+    :license: MIT
+"""
+import re
+from time import sleep, time
+
+import numpy as np
+
+# Fields reported for each mode of a rate test
+FIELDS = ('err', 'snr', 'agc', 'spd', 'ccerr')
+MODES = (0, 1, 2, 3)
+
+_RATE_LINE = re.compile(r'MOD:(\d+) ERR:(\d+) SNR:([-\d.]+) AGC:(\d+) '
+                        r'SPD:([+-]?[\d.]+) CCERR:(\d+)')
+
+
+def parseRateTest(lines):
+    """ Parse rateTest output into an array.
+
+    :param lines: Lines returned by one or more ``ATM900.rateTest`` calls.
+    :type lines: list.
+    :returns: One row per mode of (mod, err, snr, agc, spd, ccerr).
+    :rtype: numpy.ndarray.
+    """
+    rows = _RATE_LINE.findall('\n'.join(lines))
+    return np.array(rows, dtype=float).reshape(-1, 6)
+
+
+class SurveyTable(object):
+    """ Rate test results over address x power x mode x repeat.
+
+    Each field in FIELDS is an array of that shape, NaN where no result was
+    recorded. ``time`` holds the start time of each test, shaped address x
+    power x repeat.
+    """
+    def __init__(self, addresses, powers, repeats=1, modes=MODES):
+        self.addresses = list(addresses)
+        self.powers = list(powers)
+        self.modes = list(modes)
+        self.repeats = repeats
+        shape = (len(self.addresses), len(self.powers), len(self.modes),
+                 repeats)
+        for field in FIELDS:
+            setattr(self, field, np.full(shape, np.nan))
+        self.time = np.full(shape[:2] + (repeats,), np.nan)
+
+
+    def record(self, address, power, repeat, lines, when=None):
+        """ Store the output of one rateTest run.
+        """
+        i = self.addresses.index(address)
+        j = self.powers.index(power)
+        self.time[i, j, repeat] = time() if when is None else when
+        rows = parseRateTest(lines)
+        if not len(rows):
+            return
+        mods = rows[:, 0].astype(int)
+        k = np.minimum(np.searchsorted(self.modes, mods), len(self.modes) - 1)
+        valid = np.asarray(self.modes)[k] == mods
+        for n, field in enumerate(FIELDS):
+            getattr(self, field)[i, j, k[valid], repeat] = rows[valid, n + 1]
+
+
+    def successRate(self):
+        """ Fraction of error free tests, shaped address x power x mode.
+
+        :rtype: numpy.ndarray.
+        """
+        tested = ~np.isnan(self.err)
+        clean = (self.err == 0) & (self.ccerr == 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return clean.sum(axis=-1) / tested.sum(axis=-1)
+
+
+    def bestMode(self, minSuccess=0.9):
+        """ Highest mode meeting 'minSuccess' at any power, per address.
+
+        :param minSuccess: Required fraction of error free tests.
+        :type minSuccess: float.
+        :returns: The best mode per address, or -1 where none qualifies.
+        :rtype: numpy.ndarray.
+        """
+        good = (self.successRate() >= minSuccess).any(axis=1)
+        modes = np.asarray(self.modes)
+        best = np.where(good, modes[np.newaxis, :], -1)
+        return best.max(axis=1)
+
+
+    def snrPercentiles(self, q=(10, 50, 90)):
+        """ SNR percentiles over powers and repeats.
+
+        :returns: Array shaped len(q) x address x mode.
+        :rtype: numpy.ndarray.
+        """
+        snr = np.moveaxis(self.snr, 1, -1)
+        snr = snr.reshape(snr.shape[:2] + (-1,))
+        return np.nanpercentile(snr, q, axis=-1)
+
+
+    def throughput(self, bitRates=None):
+        """ Expected throughput against power, per address.
+
+        The best mode at each power is chosen by bit rate times success
+        rate.
+
+        :param bitRates: Bit rate of each mode in bits/sec. Without it the
+            result is relative to each mode's nominal rate.
+        :type bitRates: dict.
+        :returns: Array shaped address x power.
+        :rtype: numpy.ndarray.
+        """
+        rates = np.array([bitRates[m] if bitRates else 1.0
+                          for m in self.modes], dtype=float)
+        return np.nan_to_num(self.successRate() * rates).max(axis=-1)
+
+
+    def save(self, path):
+        """ Save the table as a NumPy .npz archive.
+        """
+        arrays = dict((field, getattr(self, field)) for field in FIELDS)
+        np.savez(path, addresses=self.addresses, powers=self.powers,
+                 modes=self.modes, time=self.time, **arrays)
+
+
+    @classmethod
+    def load(cls, path):
+        """ Load a table written by :meth:`save`.
+        """
+        data = np.load(path)
+        table = cls(data['addresses'].tolist(), data['powers'].tolist(),
+                    data['time'].shape[-1], data['modes'].tolist())
+        table.time = data['time']
+        for field in FIELDS:
+            setattr(table, field, data[field])
+        return table
+
+
+class Survey(object):
+    """ Sweep rate tests across addresses and power levels.
+    """
+    def __init__(self, modem, addresses, powers=range(1, 9), repeats=1,
+                 interval=0.0, onResult=None):
+        """
+        :param modem: The local modem.
+        :type modem: ATM900.
+        :param addresses: Remote addresses to test.
+        :type addresses: list.
+        :param powers: Power levels (1-8) applied to both ends of the link.
+        :type powers: list.
+        :param repeats: Number of passes over the whole sweep.
+        :type repeats: int.
+        :param interval: Seconds to wait between passes.
+        :type interval: float.
+        :param onResult: Called as ``onResult(address, power, repeat,
+            lines)`` after each test.
+        :type onResult: callable.
+        """
+        self.modem = modem
+        self.interval = interval
+        self.onResult = onResult
+        self.table = SurveyTable(addresses, powers, repeats)
+
+
+    def steps(self, modem=None):
+        """ Run the survey one rate test at a time.
+
+        A generator, so it can be submitted to a CommandQueue as a
+        pre-emptible job. Yields the table after every test.
+        """
+        modem = self.modem if modem is None else modem
+        table = self.table
+        for repeat in range(table.repeats):
+            if repeat and self.interval:
+                sleep(self.interval)
+            for power in table.powers:
+                modem.TxPower = power
+                for address in table.addresses:
+                    when = time()
+                    try:
+                        modem.remotePower(address, power)
+                        lines = modem.rateTest(address)
+                    except IOError:
+                        lines = []
+                    table.record(address, power, repeat, lines, when)
+                    if self.onResult is not None:
+                        self.onResult(address, power, repeat, lines)
+                    yield table
+
+
+    def run(self):
+        """ Run the whole survey.
+
+        :rtype: SurveyTable.
+        """
+        for table in self.steps():
+            pass
+        return self.table
@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.telemetry
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Compact binary records for instrument telemetry.
+
+    Each record carries a schema id and its field values as varints
+    (zigzag encoded when signed, optionally fixed point scaled) or IEEE
+    floats, followed by a CRC-16. The record is COBS encoded so it contains
+    no zero bytes and is terminated by a single zero, which makes every
+    record self-delimiting: the modem's data logger can be set to split on
+    that sentinel, and a decoder can resynchronise after a corrupt record
+    at the next zero.
+
+    :license: MIT
+"""
+import struct
+
+SENTINEL = 0
+
+# Field kind -> maximum value in bits, or a struct for fixed width floats
+_INTEGERS = {'u8': 8, 'u16': 16, 'u32': 32, 'u64': 64,
+             'i8': 8, 'i16': 16, 'i32': 32, 'i64': 64}
+_FLOATS = {'f32': struct.Struct('>f'), 'f64': struct.Struct('>d')}
+
+
+def _crcTable():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for bit in range(8):
+            crc = ((crc << 1) ^ 0x1021 if crc & 0x8000 else crc << 1) & 0xffff
+        table.append(crc)
+    return table
+
+_CRC_TABLE = _crcTable()
+
+
+def crc16(data, crc=0xffff):
+    """ CRC-16/CCITT-FALSE of 'data'.
+
+    :type data: bytes, bytearray.
+    :rtype: int.
+    """
+    for byte in bytearray(data):
+        crc = ((crc << 8) & 0xffff) ^ _CRC_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+
+def encodeVarint(value, out):
+    """ Append unsigned 'value' to bytearray 'out' as a base 128 varint.
+    """
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decodeVarint(data, pos):
+    """ Read a varint from bytearray 'data' at 'pos'.
+
+    :returns: (value, next position).
+    :rtype: tuple.
+    :raises: ValueError
+    """
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('Truncated varint')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+        if shift > 70:
+            raise ValueError('Varint too long')
+
+
+def cobsEncode(data):
+    """ Consistent overhead byte stuffing; the result contains no zeros.
+
+    :rtype: bytearray.
+    """
+    out = bytearray([0])
+    code = 0
+    for byte in bytearray(data):
+        if byte == 0:
+            out[code] = len(out) - code
+            code = len(out)
+            out.append(0)
+        else:
+            out.append(byte)
+            if len(out) - code == 0xff:
+                out[code] = 0xff
+                code = len(out)
+                out.append(0)
+    out[code] = len(out) - code
+    return out
+
+
+def cobsDecode(data):
+    """ Reverse :func:`cobsEncode`.
+
+    :rtype: bytearray.
+    :raises: ValueError
+    """
+    data = bytearray(data)
+    out = bytearray()
+    pos = 0
+    while pos < len(data):
+        code = data[pos]
+        if code == 0 or pos + code > len(data):
+            raise ValueError('Invalid COBS block')
+        out.extend(data[pos + 1:pos + code])
+        pos += code
+        if code < 0xff and pos < len(data):
+            out.append(0)
+    return out
+
+
+def _cobsSize(size):
+    return size + 1 + size // 254
+
+
+class Schema(object):
+    """ The layout of one kind of telemetry record.
+
+    Fields are given as ``(name, kind)`` or ``(name, kind, scale)`` where
+    kind is one of u8, u16, u32, u64 (unsigned varints), i8, i16, i32, i64
+    (zigzag varints), f32 or f64 (IEEE floats). A scale stores
+    ``round(value * scale)`` in an integer field, e.g. ``('depth', 'u32',
+    100)`` keeps centimetres while the record holds metres.
+    """
+    def __init__(self, schemaId, fields, name=None):
+        """
+        :param schemaId: Identifier written with every record, 0 or more.
+        :type schemaId: int.
+        :param fields: The record's fields in order.
+        :type fields: list.
+        :param name: A readable name; defaults to the id.
+        :type name: str.
+        :raises: ValueError
+        """
+        if schemaId < 0:
+            raise ValueError('Schema id must not be negative')
+        self.schemaId = schemaId
+        self.name = name if name is not None else str(schemaId)
+        self.fields = []
+        for field in fields:
+            name, kind = field[:2]
+            scale = field[2] if len(field) > 2 else None
+            if kind not in _INTEGERS and kind not in _FLOATS:
+                raise ValueError('Unknown field kind %r' % kind)
+            if scale is not None and kind in _FLOATS:
+                raise ValueError('Only integer fields can be scaled')
+            self.fields.append((name, kind, scale))
+        self.names = [field[0] for field in self.fields]
+
+
+    def encode(self, values):
+        """ Encode a record body, without schema id or CRC.
+
+        :param values: Value per field name.
+        :type values: dict.
+        :rtype: bytearray.
+        :raises: KeyError, ValueError
+        """
+        out = bytearray()
+        for name, kind, scale in self.fields:
+            value = values[name]
+            if kind in _FLOATS:
+                out.extend(_FLOATS[kind].pack(value))
+                continue
+            if scale is not None:
+                value = value * scale
+            value = int(round(value)) if isinstance(value, float) else \
+                int(value)
+            bits = _INTEGERS[kind]
+            if kind[0] == 'i':
+                if not -(1 << bits - 1) <= value < 1 << bits - 1:
+                    raise ValueError('%s out of range for %s' % (name, kind))
+                value = (value << 1) ^ (value >> bits - 1)
+            elif not 0 <= value < 1 << bits:
+                raise ValueError('%s out of range for %s' % (name, kind))
+            encodeVarint(value, out)
+        return out
+
+
+    def decode(self, data, pos=0):
+        """ Decode a record body from bytearray 'data' at 'pos'.
+
+        :returns: Value per field name and the position after the body.
+        :rtype: tuple.
+        :raises: ValueError
+        """
+        values = {}
+        for name, kind, scale in self.fields:
+            if kind in _FLOATS:
+                packer = _FLOATS[kind]
+                if pos + packer.size > len(data):
+                    raise ValueError('Truncated record')
+                values[name] = packer.unpack(
+                    bytes(data[pos:pos + packer.size]))[0]
+                pos += packer.size
+                continue
+            value, pos = decodeVarint(data, pos)
+            if kind[0] == 'i':
+                value = (value >> 1) ^ -(value & 1)
+            values[name] = value / float(scale) if scale is not None else value
+        return values, pos
+
+
+    def maxSize(self):
+        """ Largest encoded body in bytes.
+
+        :rtype: int.
+        """
+        size = 0
+        for name, kind, scale in self.fields:
+            if kind in _FLOATS:
+                size += _FLOATS[kind].size
+            else:
+                size += (_INTEGERS[kind] + 6) // 7
+        return size
+
+
+class Record(object):
+    """ A decoded telemetry record.
+
+    :ivar schema: The record's Schema.
+    :ivar values: Value per field name.
+    """
+    __slots__ = ('schema', 'values')
+
+    def __init__(self, schema, values):
+        self.schema = schema
+        self.values = values
+
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+
+    def __repr__(self):
+        return 'Record(%r, %r)' % (self.schema.name, self.values)
+
+
+class TelemetryCodec(object):
+    """ Encodes and decodes records for a set of schemas.
+    """
+    def __init__(self, schemas=(), fixedSize=False):
+        """
+        :param schemas: The schemas in use.
+        :type schemas: list.
+        :param fixedSize: Pad every record to :meth:`recordSize` bytes so the
+            data logger can split records by character count.
+        :type fixedSize: bool.
+        """
+        self.fixedSize = fixedSize
+        self._schemas = {}
+        self._names = {}
+        for schema in schemas:
+            self.register(schema)
+
+
+    def register(self, schema):
+        """ Add a schema.
+
+        :raises: ValueError
+        """
+        if schema.schemaId in self._schemas:
+            raise ValueError('Schema id %d already registered' %
+                             schema.schemaId)
+        self._schemas[schema.schemaId] = schema
+        self._names[schema.name] = schema
+
+
+    def schema(self, key):
+        """ Look up a schema by id or name.
+
+        :raises: KeyError
+        """
+        if key in self._schemas:
+            return self._schemas[key]
+        return self._names[key]
+
+
+    def encode(self, key, values):
+        """ Encode one complete record, including its terminating zero.
+
+        :param key: Schema id or name.
+        :param values: Value per field name.
+        :type values: dict.
+        :rtype: bytes.
+        :raises: KeyError, ValueError
+        """
+        schema = self.schema(key)
+        body = bytearray()
+        encodeVarint(schema.schemaId, body)
+        body.extend(schema.encode(values))
+        body.extend(struct.pack('>H', crc16(body)))
+        record = cobsEncode(body)
+        record.append(SENTINEL)
+        if self.fixedSize:
+            # Zero padding reads as empty records and is skipped on decode
+            record.extend(bytearray(self.recordSize() - len(record)))
+        return bytes(record)
+
+
+    def decode(self, record):
+        """ Decode one record without its terminating zero.
+
+        :rtype: Record.
+        :raises: ValueError
+        """
+        body = cobsDecode(record)
+        if len(body) < 3:
+            raise ValueError('Record too short')
+        if crc16(body[:-2]) != struct.unpack('>H', bytes(body[-2:]))[0]:
+            raise ValueError('Record CRC mismatch')
+        schemaId, pos = decodeVarint(body, 0)
+        if schemaId not in self._schemas:
+            raise ValueError('Unknown schema id %d' % schemaId)
+        schema = self._schemas[schemaId]
+        values, pos = schema.decode(body, pos)
+        if pos != len(body) - 2:
+            raise ValueError('Record length does not match schema')
+        return Record(schema, values)
+
+
+    def recordSize(self):
+        """ Largest encoded record in bytes, including the terminator.
+
+        :rtype: int.
+        """
+        largest = 0
+        for schema in self._schemas.values():
+            body = (schema.schemaId.bit_length() + 6) // 7 or 1
+            body += schema.maxSize() + 2
+            largest = max(largest, _cobsSize(body) + 1)
+        return largest
+
+
+    def configure(self, modem):
+        """ Set the modem's data logger to store one record per entry.
+
+        Variable size records are split on the zero sentinel (LogMode 1);
+        fixed size records by character count (LogMode 2).
+
+        :type modem: ATM900.
+        :raises: ValueError
+        """
+        if self.fixedSize:
+            size = self.recordSize()
+            if size > 4096:
+                raise ValueError('Records of %d bytes exceed ChrCount' % size)
+            modem.ChrCount = size
+            modem.LogMode = 2
+        else:
+            modem.Sentinel = SENTINEL
+            modem.LogMode = 1
+
+
+    def send(self, modem, key, values):
+        """ Encode a record and write it to the modem.
+        """
+        modem.write(self.encode(key, values))
+
+
+class TelemetryDecoder(object):
+    """ Incremental record decoder for modem reads and logger downloads.
+
+    :ivar errors: Number of corrupt records discarded.
+    """
+    def __init__(self, codec, onRecord=None):
+        """
+        :param codec: Codec holding the schemas to decode.
+        :type codec: TelemetryCodec.
+        :param onRecord: Called with each Record decoded.
+        :type onRecord: callable.
+        """
+        self.codec = codec
+        self.onRecord = onRecord
+        self.errors = 0
+        self._buffer = bytearray()
+
+
+    def feed(self, data):
+        """ Add received bytes and decode every complete record.
+
+        :returns: The records completed by 'data'.
+        :rtype: list.
+        """
+        if not isinstance(data, (bytes, bytearray)):
+            data = data.encode('latin-1')
+        buf = self._buffer
+        buf.extend(data)
+        records = []
+        start = 0
+        end = buf.find(b'\x00')
+        while end >= 0:
+            if end > start:
+                try:
+                    record = self.codec.decode(buf[start:end])
+                except ValueError:
+                    self.errors += 1
+                else:
+                    records.append(record)
+                    if self.onRecord is not None:
+                        self.onRecord(record)
+            start = end + 1
+            end = buf.find(b'\x00', start)
+        del buf[:start]
+        return records
+
+
+    def poll(self, modem):
+        """ Read whatever the modem has received and decode it.
+
+        :rtype: list.
+        """
+        data = modem.read()
+        if not data:
+            return []
+        return self.feed(data)
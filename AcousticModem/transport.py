@@ -0,0 +1,361 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    AcousticModem.transport
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Byte transports between the host and a modem.
+
+    Every transport offers the subset of the pyserial interface used by
+    :class:`ATM900`: ``write``, ``read``, ``readline``, ``inWaiting``,
+    ``isOpen``, ``close`` and a ``baudrate`` attribute. ``write`` takes
+    bytes or native strings, and ``read`` and ``readline`` return native
+    strings (see :func:`AcousticModem.response.native`), the type the
+    ATM900 builds its replies from. A transport may also
+    have a ``clock`` with ``time()`` and ``sleep(seconds)``, which the ATM900
+    then uses for its waits, as simulated ports do. Transports are
+    normally created from a port string with :func:`openTransport`:
+
+        * ``/dev/ttyS0``, ``COM1`` -- a local serial port (pyserial)
+        * ``rfc2217://host:port`` -- an RFC 2217 serial server (pyserial)
+        * ``socket://host:port`` -- a raw TCP serial server
+        * ``loop://`` -- an in-process loopback
+
+    :license: MIT
+"""
+import select
+import socket
+import threading
+from time import sleep, time
+
+from .framing import toBytes
+from .response import native
+
+
+def openTransport(port, baudrate, timeout=1.0):
+    """ Open a transport for a port name or URL.
+
+    :param port: Serial device name or transport URL.
+    :type port: str.
+    :param baudrate: Serial baud rate. Ignored by raw sockets and loopback,
+        whose far end sets its own rate.
+    :type baudrate: int.
+    :param timeout: Read timeout in seconds.
+    :type timeout: float.
+    :rtype: object.
+    :raises: IOError
+    """
+    if port.startswith('socket://'):
+        host, _, number = port[len('socket://'):].partition(':')
+        return TCPTransport(host, int(number), baudrate, timeout)
+    if port.startswith('loop://'):
+        return LoopbackTransport(baudrate=baudrate, timeout=timeout)
+    # debian: apt-get install pyserial
+    import serial
+    if '://' in port:
+        return serial.serial_for_url(port, baudrate=baudrate, timeout=timeout)
+    return serial.Serial(port, baudrate, timeout=timeout)
+
+
+class TCPTransport(object):
+    """ Raw TCP connection to a serial-to-Ethernet server.
+    """
+    def __init__(self, host, port, baudrate=None, timeout=1.0,
+                 connectTimeout=10.0):
+        self.host = host
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self._buffer = b''
+        try:
+            self._socket = socket.create_connection((host, port),
+                                                    connectTimeout)
+        except socket.error as e:
+            raise IOError('Failed to connect to %s:%d: %s' % (host, port, e))
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(None)
+
+
+    def isOpen(self):
+        return self._socket is not None
+
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+    def write(self, data):
+        if self._socket is None:
+            raise IOError('Transport is closed')
+        try:
+            self._socket.sendall(toBytes(data))
+        except socket.error as e:
+            raise IOError(str(e))
+
+
+    def inWaiting(self):
+        self._fill(0)
+        return len(self._buffer)
+
+
+    def read(self, size=1):
+        deadline = time() + (self.timeout or 0)
+        while len(self._buffer) < size:
+            remaining = deadline - time()
+            if remaining <= 0 or not self._fill(remaining):
+                break
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return native(data)
+
+
+    def readline(self):
+        deadline = time() + (self.timeout or 0)
+        while b'\n' not in self._buffer:
+            remaining = deadline - time()
+            if remaining <= 0 or not self._fill(remaining):
+                break
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return native(data)
+
+
+    def _fill(self, wait):
+        """ Receive whatever arrives within 'wait' seconds.
+        """
+        if self._socket is None:
+            raise IOError('Transport is closed')
+        try:
+            ready = select.select([self._socket], [], [], wait)[0]
+            if not ready:
+                return False
+            data = self._socket.recv(4096)
+        except (socket.error, select.error) as e:
+            raise IOError(str(e))
+        if not data:
+            raise IOError('Connection closed by %s:%d' % (self.host, self.port))
+        self._buffer += data
+        return True
+
+
+class LoopbackTransport(object):
+    """ In-process transport.
+
+    Without a peer, written bytes are read straight back. Two transports
+    created with :meth:`pair` are cross-connected, so one can be handed to
+    an ATM900 and the other driven by a modem emulator.
+    """
+    def __init__(self, peer=None, baudrate=None, timeout=1.0):
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.peer = peer
+        self._buffer = b''
+        self._condition = threading.Condition()
+        self._open = True
+
+
+    @classmethod
+    def pair(cls, baudrate=None, timeout=1.0):
+        """ Two cross-connected loopback transports.
+
+        :rtype: tuple.
+        """
+        a = cls(baudrate=baudrate, timeout=timeout)
+        b = cls(peer=a, baudrate=baudrate, timeout=timeout)
+        a.peer = b
+        return a, b
+
+
+    def isOpen(self):
+        return self._open
+
+
+    def close(self):
+        self._open = False
+
+
+    def write(self, data):
+        if not self._open:
+            raise IOError('Transport is closed')
+        (self.peer or self)._deliver(toBytes(data))
+
+
+    def inWaiting(self):
+        return len(self._buffer)
+
+
+    def read(self, size=1):
+        with self._condition:
+            if len(self._buffer) < size and self.timeout:
+                deadline = time() + self.timeout
+                while len(self._buffer) < size and time() < deadline:
+                    self._condition.wait(deadline - time())
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return native(data)
+
+
+    def readline(self):
+        with self._condition:
+            deadline = time() + (self.timeout or 0)
+            while b'\n' not in self._buffer and time() < deadline:
+                self._condition.wait(deadline - time())
+            end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+            data, self._buffer = self._buffer[:end], self._buffer[end:]
+        return native(data)
+
+
+    def _deliver(self, data):
+        with self._condition:
+            self._buffer += data
+            self._condition.notify_all()
+
+
+class ReconnectingTransport(object):
+    """ Transport that transparently reopens its connection on failure.
+
+    After a reconnect the baud rate is restored and 'onReconnect' is called
+    so the owner can restore any further state before the failed operation
+    is retried. An ATM900 given the transport sets 'onReconnect', unless
+    already set, to put the modem back in the mode it was in.
+    """
+    def __init__(self, opener, baudrate=None, retries=5, backoff=0.5,
+                 onReconnect=None):
+        """
+        :param opener: Called as ``opener(baudrate)`` to open a new
+            underlying transport.
+        :type opener: callable.
+        :param baudrate: Initial baud rate.
+        :type baudrate: int.
+        :param retries: Reconnection attempts before giving up.
+        :type retries: int.
+        :param backoff: Initial delay between attempts, doubled each time.
+        :type backoff: float.
+        :param onReconnect: Called as ``onReconnect(transport)`` after a
+            successful reconnection.
+        :type onReconnect: callable.
+        """
+        self.opener = opener
+        self.retries = retries
+        self.backoff = backoff
+        self.onReconnect = onReconnect
+        self.reconnects = 0
+        self._baudrate = baudrate
+        self._transport = opener(baudrate)
+
+
+    @property
+    def baudrate(self):
+        return self._baudrate
+
+
+    @property
+    def clock(self):
+        return getattr(self._transport, 'clock', None)
+
+
+    @baudrate.setter
+    def baudrate(self, rate):
+        self._baudrate = rate
+        self._call(lambda t: setattr(t, 'baudrate', rate))
+
+
+    def isOpen(self):
+        return self._transport is not None and self._transport.isOpen()
+
+
+    def close(self):
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+
+    def write(self, data):
+        return self._call(lambda t: t.write(data))
+
+
+    def read(self, size=1):
+        return self._call(lambda t: t.read(size))
+
+
+    def readline(self):
+        return self._call(lambda t: t.readline())
+
+
+    def inWaiting(self):
+        return self._call(lambda t: t.inWaiting())
+
+
+    def _call(self, operation):
+        if self._transport is None:
+            raise IOError('Transport is closed')
+        try:
+            return operation(self._transport)
+        except (IOError, OSError):
+            self._reconnect()
+            return operation(self._transport)
+
+
+    def _reconnect(self):
+        try:
+            self._transport.close()
+        except (IOError, OSError):
+            pass
+        delay = self.backoff
+        for attempt in range(self.retries):
+            try:
+                self._transport = self.opener(self._baudrate)
+            except (IOError, OSError):
+                sleep(delay)
+                delay *= 2
+                continue
+            self.reconnects += 1
+            if self.onReconnect is not None:
+                self.onReconnect(self)
+            return
+        self._transport = None
+        raise IOError('Failed to reconnect transport')
+
+
+class TransportPool(object):
+    """ Shared, reference counted transports keyed by port.
+
+    Lets several modem objects in one process share a connection to the
+    same serial server instead of each opening its own.
+    """
+    def __init__(self, opener=openTransport):
+        self.opener = opener
+        self._lock = threading.Lock()
+        self._transports = {}
+
+
+    def acquire(self, port, baudrate, timeout=1.0):
+        """ Get the open transport for 'port', opening it if needed.
+        """
+        with self._lock:
+            entry = self._transports.get(port)
+            if entry is None or not entry[0].isOpen():
+                entry = [self.opener(port, baudrate, timeout), 0]
+                self._transports[port] = entry
+            entry[1] += 1
+            return entry[0]
+
+
+    def release(self, port):
+        """ Drop a reference, closing the transport when it is unused.
+        """
+        with self._lock:
+            entry = self._transports.get(port)
+            if entry is None:
+                return
+            entry[1] -= 1
+            if entry[1] <= 0:
+                entry[0].close()
+                del self._transports[port]
+
+
+    def closeAll(self):
+        with self._lock:
+            for transport, _ in self._transports.values():
+                transport.close()
+            self._transports.clear()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Import time benchmark
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Measures ``import AcousticModem`` in fresh interpreters and fails if it
+    is slower than the limit or pulls in modules that should only load on
+    first use.
+
+    Usage::
+
+        python benchmarks/import_time.py [--runs N] [--limit SECONDS]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that the core import must not load
+DEFERRED = ['serial', 'socket', 'sqlite3', 'numpy', 'json', 'hashlib',
+            'threading', 'AcousticModem.transport', 'AcousticModem.broker',
+            'AcousticModem.registry', 'AcousticModem.survey']
+
+_PROBE = """
+import sys, time
+start = time.time()
+import AcousticModem
+elapsed = time.time() - start
+loaded = [m for m in %r if m in sys.modules]
+sys.stdout.write('%%f %%s\\n' %% (elapsed, ','.join(loaded)))
+"""
+
+
+def measure(runs):
+    """ Import the package in 'runs' fresh interpreters.
+
+    :returns: Import times in seconds and the deferred modules loaded.
+    :rtype: tuple.
+    """
+    times = []
+    loaded = set()
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    for run in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _PROBE % DEFERRED], env=env, cwd=ROOT)
+        elapsed, modules = output.decode('ascii').split(' ')
+        times.append(float(elapsed))
+        loaded.update(m for m in modules.strip().split(',') if m)
+    return sorted(times), sorted(loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--limit', type=float, default=0.05,
+                        help='maximum median import time in seconds')
+    args = parser.parse_args()
+
+    times, loaded = measure(args.runs)
+    median = times[len(times) // 2]
+    print('import AcousticModem: median %.1f ms, min %.1f ms, max %.1f ms'
+          % (median * 1000, times[0] * 1000, times[-1] * 1000))
+    failed = False
+    if loaded:
+        print('FAIL: deferred modules loaded at import: %s' % ', '.join(loaded))
+        failed = True
+    if median > args.limit:
+        print('FAIL: median import time exceeds %.1f ms' % (args.limit * 1000))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+    Soak test
+    ~~~~~~~~~
+
+    Runs millions of simulated commands through a memory-bounded Session
+    and fails if resident memory keeps growing after warm-up.
+
+    The modem is an ATM900 on an in-process transport that answers link
+    tests immediately, so the run is limited by the library rather than by
+    the serial line. A Router, Demultiplexer and CommandQueue are exercised
+    alongside it.
+
+    Usage::
+
+        python benchmarks/soak.py [--commands N] [--growth BYTES]
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from AcousticModem import ATM900
+from AcousticModem.commandqueue import CommandQueue
+from AcousticModem.demux import Demultiplexer
+from AcousticModem.response import native
+from AcousticModem.routing import FRAME_DATA, Router, encodeFrame
+from AcousticModem.session import Session, SessionLimits, residentMemory
+
+_LINK_REPLY = ('\r\nSource:%03d Destination:001 Range:0123.4\r\n'
+               'ERR:000 SNR:21.5 AGC:42 SPD:+00.1 CCERR:000\r\n')
+
+
+class ResponderTransport(object):
+    """ A modem that answers each command as soon as it is written.
+    """
+    def __init__(self):
+        self.baudrate = 9600
+        self._output = ''
+
+
+    def isOpen(self):
+        return True
+
+
+    def close(self):
+        pass
+
+
+    def write(self, data):
+        data = native(data)
+        if data.startswith('ATX'):
+            self._output += _LINK_REPLY % int(data[3:].strip())
+        elif data == '+++' or data[:1] in ('A', '@'):
+            self._output += '\r\nOK\r\n'
+        return len(data)
+
+
+    def inWaiting(self):
+        return len(self._output)
+
+
+    def read(self, size=1):
+        data, self._output = self._output[:size], self._output[size:]
+        return data
+
+
+class FrameModem(object):
+    """ Just enough of a modem to carry routing frames.
+    """
+    def __init__(self):
+        self.RemoteAddr = None
+        self.incoming = []
+
+
+    def write(self, data):
+        return len(data)
+
+
+    def read(self, size=1):
+        return self.incoming.pop() if self.incoming else b''
+
+
+def soak(commands, sample):
+    """ Run 'commands' link tests, sampling RSS every 'sample' commands.
+
+    :returns: The session and a list of (commands, rss) samples.
+    :rtype: tuple.
+    """
+    modem = ATM900('soak', 9600, transport=ResponderTransport())
+    session = Session(modem, SessionLimits(history=256, maxPending=64))
+
+    frames = FrameModem()
+    router = session.attach(Router(frames, 1))
+    demux = session.attach(Demultiplexer(maxLine=128))
+    queue = session.attach(CommandQueue(modem, start=False))
+    status = b'payload\r\nCONNECT 002\r\nSNR: 21.5\r\nmore payload'
+
+    samples = []
+    for n in range(commands):
+        address = n % 250
+        session.command('linkTest', address)
+        frames.incoming.append(encodeFrame(FRAME_DATA, 2, 1, n & 0xffff, [1],
+                                           b'hello'))
+        router.poll()
+        demux.feed(status)
+        queue.submit('temp').cancel()
+        if n % sample == 0:
+            samples.append((n, residentMemory()))
+    samples.append((commands, residentMemory()))
+    queue.close()
+    return session, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[4])
+    parser.add_argument('--commands', type=int, default=1000000)
+    parser.add_argument('--growth', type=int, default=1 << 20,
+                        help='allowed RSS growth after warm-up in bytes')
+    args = parser.parse_args()
+
+    sample = max(args.commands // 20, 1)
+    session, samples = soak(args.commands, sample)
+    for n, rss in samples:
+        sys.stdout.write('%10d commands  %8.1f MiB\n' % (n, rss / 1048576.0))
+    for name, value in sorted(session.report().items()):
+        sys.stdout.write('%s: %s\n' % (name, value))
+
+    # The first quarter of the run is warm-up
+    settled = samples[len(samples) // 4:]
+    growth = max(rss for n, rss in settled) - settled[0][1]
+    if growth > args.growth:
+        sys.stdout.write('FAIL: RSS grew %d bytes after warm-up\n' % growth)
+        return 1
+    sys.stdout.write('OK: RSS grew %d bytes after warm-up\n' % growth)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -13,6 +13,7 @@ setup(
     maintainer='Hamilton Kibbe',
     maintainer_email='hamilton.kibbe@gmail.com',
     install_requires=['pyserial'], 
+    extras_require={'survey': ['numpy']},
 
     description='Python interface to Teledyne Benthos Acoustic modems',
     url='http://github.com/hamiltonkibbe/AcousticModem',
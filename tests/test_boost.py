@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import ModeError
+from AcousticModem.simulator import Simulator
+
+
+class BaudBoostTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100))
+        self.modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+
+    def test_raised_for_the_block(self):
+        with self.modem.boost() as boost:
+            self.assertEqual(boost.rate, 115200)
+            self.assertEqual(self.node.settings['P1Baud'], '115200')
+            self.assertEqual(self.modem.LocalAddr, 1)
+        self.assertEqual(self.modem.baud_rate, 9600)
+        self.assertEqual(self.node.settings['P1Baud'], '9600')
+        self.assertFalse(boost.fellBack)
+
+    def test_chosen_rates(self):
+        with self.modem.boost(rates=[4800, 19200]) as boost:
+            self.assertEqual(boost.rate, 19200)
+        self.assertEqual(self.modem.baud_rate, 9600)
+
+    def test_lost_link_found_on_exit(self):
+        try:
+            with self.modem.boost() as boost:
+                # The modem drops to another rate behind the host's back
+                self.node.settings['P1Baud'] = '4800'
+                raise ModeError('Link lost')
+        except ModeError:
+            pass
+        self.assertTrue(boost.fellBack)
+        self.assertEqual(self.modem.baud_rate, 9600)
+        self.assertEqual(self.node.settings['P1Baud'], '9600')
+
+    def test_retried_at_original_rate(self):
+        calls = []
+
+        def operation():
+            calls.append(self.modem.baud_rate)
+            if len(calls) == 1:
+                self.node.settings['P1Baud'] = '9600'
+                raise ModeError('Link lost')
+            return self.modem.LocalAddr
+        self.assertEqual(self.modem.boost().run(operation), 1)
+        self.assertEqual(calls, [115200, 9600])
+
+
+if __name__ == '__main__':
+    unittest.main()
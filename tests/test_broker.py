@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+
+from AcousticModem.broker import BrokerClient, ModemBroker
+
+
+class FakeModem(object):
+    """ Counts the mode switches commands and data reads cost.
+    """
+    def __init__(self):
+        self.online = True
+        self.switches = 0
+        self.received = ['sensor data']
+        self.lock = threading.Lock()
+        self.holding = threading.Event()
+        self.release = threading.Event()
+
+    def _mode(self, online):
+        with self.lock:
+            if self.online != online:
+                self.switches += 1
+                self.online = online
+
+    @property
+    def TxRate(self):
+        self._mode(False)
+        return [9, '(2400 bps)']
+
+    @property
+    def temp(self):
+        return 20.0
+
+    def read(self):
+        self._mode(True)
+        return self.received.pop(0) if self.received else ''
+
+    def hold(self):
+        self.holding.set()
+        self.release.wait(5)
+        return 'released'
+
+    def reboot(self):
+        raise AssertionError('Clients must not reboot the modem')
+
+
+class ModemBrokerTest(unittest.TestCase):
+    def setUp(self):
+        self.modem = FakeModem()
+        self.broker = ModemBroker(self.modem, ('127.0.0.1', 0),
+                                  pollInterval=0.01, resumeAfter=0.5,
+                                  commands=('hold',))
+        self.broker.start()
+        self.client = BrokerClient(self.broker.address, timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.broker.close()
+
+    def test_commands_with_subscribers_stay_in_config_mode(self):
+        data = []
+        self.client.subscribe(data.append)
+        self.client.get('TxRate')
+        for n in range(10):
+            self.assertEqual(self.client.get('TxRate'), [9, '(2400 bps)'])
+            time.sleep(0.05)
+        # One switch to config mode, not one there and back per command
+        self.assertEqual(self.modem.switches, 1)
+        # Polling resumes once commands have been quiet for resumeAfter
+        deadline = time.time() + 5
+        while not (data and self.modem.online) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(data, [b'sensor data'])
+        self.assertTrue(self.modem.online)
+
+    def test_reads_while_online(self):
+        data = []
+        self.client.subscribe(data.append)
+        deadline = time.time() + 5
+        while not data and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(data, [b'sensor data'])
+        self.assertEqual(self.modem.switches, 0)
+
+    def test_only_listed_names(self):
+        self.assertRaises(IOError, self.client.call, 'reboot')
+        self.assertRaises(IOError, self.client.set, 'temp', 30.0)
+        self.assertRaises(IOError, self.client.set, 'holding', None)
+        self.assertRaises(IOError, self.client.get, 'switches')
+        self.assertRaises(IOError, self.client.get, 5)
+        self.assertRaises(IOError, self.client._request,
+                          {'op': 'call', 'name': 'hold', 'args': 5})
+        self.assertEqual(self.client.get('temp'), 20.0)
+
+    def test_close_replies_to_queued_commands(self):
+        errors = []
+
+        def get():
+            try:
+                self.client.get('TxRate')
+            except IOError as error:
+                errors.append(str(error))
+        holder = threading.Thread(target=self.client.call, args=('hold',))
+        holder.start()
+        self.assertTrue(self.modem.holding.wait(5))
+        getter = threading.Thread(target=get)
+        getter.start()
+        deadline = time.time() + 5
+        while not self.broker.queue.buffers()['heap'] and \
+                time.time() < deadline:
+            time.sleep(0.01)
+        closer = threading.Thread(target=self.broker.close)
+        closer.start()
+        getter.join(5)
+        self.modem.release.set()
+        closer.join(5)
+        holder.join(5)
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(errors[0].startswith('Cancelled'), errors[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+from AcousticModem.commandqueue import HIGH, LOW, NORMAL, URGENT, \
+    CancelledError, CommandQueue, DeadlineExceeded
+
+
+class FakeModem(object):
+    @property
+    def temp(self):
+        return 20.0
+
+    def linkTest(self, address):
+        return {'Source': address}
+
+
+class CommandQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+        self.queue = CommandQueue(FakeModem(), start=False)
+
+    def tearDown(self):
+        self.queue.close()
+
+    def _record(self, name, priority=NORMAL):
+        return self.queue.submit(lambda modem: self.order.append(name),
+                                 priority=priority)
+
+    def test_most_urgent_first(self):
+        futures = [self._record('low', LOW), self._record('normal'),
+                   self._record('urgent', URGENT), self._record('high', HIGH),
+                   self._record('normal again')]
+        self.queue.start()
+        for future in futures:
+            future.result(5)
+        self.assertEqual(self.order, ['urgent', 'high', 'normal',
+                                      'normal again', 'low'])
+
+    def test_jobs_preempted_at_yields(self):
+        def job(modem):
+            self.order.append('job 1')
+            self._record('urgent', URGENT)
+            self._record('later', NORMAL)
+            yield 1
+            self.order.append('job 2')
+            yield 2
+        future = self.queue.submit(job)
+        self.queue.start()
+        self.assertEqual(future.result(5), 2)
+        self._record('last').result(5)
+        self.assertEqual(self.order, ['job 1', 'urgent', 'job 2', 'later',
+                                      'last'])
+
+    def test_names_and_arguments(self):
+        temp = self.queue.submit('temp')
+        test = self.queue.submit('linkTest', (4,))
+        self.queue.start()
+        self.assertEqual(temp.result(5), 20.0)
+        self.assertEqual(test.result(5), {'Source': 4})
+
+    def test_cancel_and_deadline(self):
+        cancelled = self._record('cancelled')
+        late = self.queue.submit('temp', deadline=time.time() - 1)
+        self.assertTrue(cancelled.cancel())
+        self.assertEqual(self.queue.pending(), 1)
+        self.queue.start()
+        self.assertRaises(CancelledError, cancelled.result, 5)
+        self.assertTrue(isinstance(late.exception(5), DeadlineExceeded))
+        self.assertEqual(self.order, [])
+        # Too late to cancel once done
+        self.assertFalse(late.cancel())
+
+    def test_bounded(self):
+        self.queue.maxPending = 2
+        first = self._record('first')
+        self._record('second')
+        self.assertRaises(IOError, self._record, 'third')
+        first.cancel()
+        self._record('third')
+        self.assertEqual(self.queue.pending(), 2)
+
+    def test_close(self):
+        future = self._record('queued')
+        self.queue.close()
+        self.assertTrue(future.cancelled())
+        self.assertRaises(IOError, self._record, 'after')
+
+
+if __name__ == '__main__':
+    unittest.main()
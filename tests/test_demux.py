@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.demux import CONNECTION, ERROR, STATISTICS, \
+    Demultiplexer
+from AcousticModem.simulator import Simulator
+
+
+class DemultiplexerTest(unittest.TestCase):
+    def setUp(self):
+        self.data = []
+        self.events = []
+        self.demux = Demultiplexer(
+            onData=lambda view, timestamp: self.data.append(view.tobytes()))
+        self.demux.subscribe(None, self.events.append)
+
+    def _feed(self, *chunks):
+        for chunk in chunks:
+            self.demux.feed(chunk)
+        self.demux.flush()
+        return b''.join(self.data), [(e.kind, e.line) for e in self.events]
+
+    def test_status_lines(self):
+        data, events = self._feed(
+            b'abc\r\nCONNECT 002\r\nCRC: Pass\r\nRange: 1234.5 m\r\n'
+            b'Source:002 Destination:001 Range:1234.5\r\n'
+            b'RXData(0018): 18 bytes\r\nERROR\r\nxyz')
+        self.assertEqual(data, b'abc\r\nxyz')
+        self.assertEqual(events, [
+            (CONNECTION, b'CONNECT 002'), (STATISTICS, b'CRC: Pass'),
+            (STATISTICS, b'Range: 1234.5 m'),
+            (STATISTICS, b'Source:002 Destination:001 Range:1234.5'),
+            (STATISTICS, b'RXData(0018): 18 bytes'), (ERROR, b'ERROR')])
+
+    def test_poll_modem(self):
+        sim = Simulator(seed=1)
+        sim.addNode(1, (0, 0, 100), RemoteAddr=2)
+        sim.addNode(2, (1500, 0, 100))
+        local = ATM900('sim://1', 9600, transport=sim.port(1))
+        remote = ATM900('sim://2', 9600, transport=sim.port(2))
+        remote.read()
+        local.write(b'reading\r\nERROR\r\n')
+        sim.sleep(10)
+        self.assertEqual(self.demux.poll(remote), 16)
+        self.assertEqual(b''.join(self.data), b'reading\r\n')
+        self.assertEqual([(e.kind, e.line) for e in self.events],
+                         [(ERROR, b'ERROR')])
+
+    def test_payload_with_status_words(self):
+        payload = (b'RX buffer full\r\nTXT file\r\nCRC32 ok\r\n'
+                   b'Range of 3 km\r\nPktloss 2\r\nCONNECTED\r\n')
+        data, events = self._feed(payload)
+        self.assertEqual(data, payload)
+        self.assertEqual(events, [])
+
+    def test_split_status_line(self):
+        data, events = self._feed(b'data\r\nCON', b'NECT 0', b'03\r\nmore')
+        self.assertEqual(data, b'data\r\nmore')
+        self.assertEqual(events, [(CONNECTION, b'CONNECT 003')])
+
+    def test_status_must_start_a_line(self):
+        data, events = self._feed(b'xCONNECT 002\r\n')
+        self.assertEqual(data, b'xCONNECT 002\r\n')
+        self.assertEqual(events, [])
+
+    def test_added_pattern(self):
+        self.demux.addPattern('sensor', br'Temp: [\d.]+ C')
+        data, events = self._feed(b'Temp: 4.5 C\r\nTemp: warm\r\n')
+        self.assertEqual(data, b'Temp: warm\r\n')
+        self.assertEqual(events, [('sensor', b'Temp: 4.5 C')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.discovery import discover, probeOrder
+from AcousticModem.registry import NodeRegistry
+from AcousticModem.simulator import Simulator
+
+
+class ProbeOrderTest(unittest.TestCase):
+    def test_known_and_nearby_first(self):
+        order = probeOrder([20], range(0, 30), spread=2)
+        self.assertEqual(order[:5], [20, 19, 21, 18, 22])
+        self.assertEqual(sorted(order), list(range(0, 30)))
+
+
+class DiscoverTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=3)
+        self.sim.addNode(1, (0, 0, 100))
+        self.sim.addNode(4, (1200, 0, 100))
+        self.sim.addNode(6, (0, 2500, 100))
+        self.modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+
+    def test_link_test_reports_range(self):
+        result = self.modem.linkTest(4, timeout=30)
+        self.assertEqual(result['Source'], '004')
+        self.assertAlmostEqual(float(result['Range']), 1200.0, places=0)
+        self.assertEqual(result['ERR'], '000')
+
+    def test_registry_gets_range(self):
+        registry = NodeRegistry()
+        found = discover(self.modem, registry, addresses=range(2, 8),
+                         timeout=10)
+        self.assertEqual(sorted(found), [4, 6])
+        self.assertAlmostEqual(registry.get(4)['range'], 1200.0, places=0)
+        self.assertAlmostEqual(registry.get(6)['range'], 2500.0, places=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import random
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.fec import FountainDecoder, FountainEncoder, broadcast, \
+    neighbours, receiveBroadcast
+from AcousticModem.simulator import Simulator
+
+
+def _data(size, seed=1):
+    rng = random.Random(seed)
+    return bytes(bytearray(rng.randrange(256) for n in range(size)))
+
+
+class FountainCodeTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = _data(5000)
+        encoder = FountainEncoder(data, 64, messageId=9)
+        decoder = FountainDecoder()
+        for frame in encoder.frames(0.5):
+            if decoder.feed(frame):
+                break
+        self.assertTrue(decoder.done())
+        self.assertEqual(decoder.data, data)
+
+    def test_recovers_from_lost_symbols(self):
+        data = _data(4000, seed=2)
+        encoder = FountainEncoder(data, 50, messageId=3)
+        decoder = FountainDecoder(messageId=3)
+        rng = random.Random(5)
+        for frame in encoder.frames(2.0):
+            if rng.random() < 0.3:
+                continue
+            if decoder.feed(frame):
+                break
+        self.assertEqual(decoder.data, data)
+
+    def test_short_message(self):
+        encoder = FountainEncoder(b'hi', 64)
+        decoder = FountainDecoder()
+        decoder.feed(encoder.frame(0))
+        self.assertEqual(decoder.data, b'hi')
+
+    def test_symbols_are_deterministic(self):
+        self.assertEqual(neighbours(1, 2, 40), neighbours(1, 2, 40))
+        self.assertEqual(FountainEncoder(b'abc' * 50, 16, 4).symbol(7),
+                         FountainEncoder(b'abc' * 50, 16, 4).symbol(7))
+
+    def test_stream_with_noise_and_corruption(self):
+        data = _data(2000, seed=3)
+        encoder = FountainEncoder(data, 32, messageId=1)
+        stream = bytearray(b'noise\x7e' + b''.join(encoder.frames(1.0)))
+        # Damage the first frame's payload; the decoder must resynchronise
+        stream[30] ^= 0xff
+        decoder = FountainDecoder()
+        for start in range(0, len(stream), 23):
+            decoder.feed(bytes(stream[start:start + 23]))
+        self.assertEqual(decoder.data, data)
+
+    def test_ignores_other_messages(self):
+        decoder = FountainDecoder(messageId=1)
+        decoder.feed(b''.join(FountainEncoder(b'x' * 100, 16, 2).frames()))
+        self.assertEqual(decoder.received, 0)
+        self.assertIsNone(decoder.data)
+
+    def test_native_string_input(self):
+        encoder = FountainEncoder(b'text', 16)
+        decoder = FountainDecoder()
+        decoder.feed(encoder.frame(0).decode('latin-1'))
+        self.assertEqual(decoder.data, b'text')
+
+
+class BroadcastTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=6)
+        self.sim.addNode(1, (0, 0, 50))
+        self.sim.addNode(2, (900, 0, 50))
+        self.local = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        self.remote = ATM900('sim://2', 9600, transport=self.sim.port(2))
+
+    def test_over_the_air_on_simulated_time(self):
+        data = _data(600)
+        self.remote.read()
+        receiver = self.sim.spawn(receiveBroadcast, self.remote, timeout=30)
+        start = self.sim.now
+        encoder = broadcast(self.local, data, redundancy=1.0, interval=2.0)
+        self.assertTrue(self.sim.now - start >= 2.0 * encoder.k)
+        self.sim.sleep(60)
+        self.assertTrue(receiver.done)
+        self.assertIsNone(receiver.error)
+        self.assertEqual(receiver.result, data)
+
+    def test_gives_up_on_simulated_time(self):
+        self.remote.read()
+        receiver = self.sim.spawn(receiveBroadcast, self.remote, timeout=5)
+        self.sim.sleep(10)
+        self.assertTrue(receiver.done)
+        self.assertTrue(isinstance(receiver.error, IOError))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.filetransfer import Manifest, _Parts, _decodeStatus, \
+    _encodeStatus, receiveFile, sendFile
+from AcousticModem.simulator import Simulator
+
+
+def _content(size):
+    """ 'size' bytes of reproducible, incompressible file content.
+    """
+    return b''.join(hashlib.sha1(str(n).encode('ascii')).digest()
+                    for n in range(size // 20 + 1))[:size]
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'data.bin')
+        with open(self.path, 'wb') as f:
+            f.write(bytearray(random.Random(1).getrandbits(8)
+                              for _ in range(5000)))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        manifest = Manifest.fromFile(self.path, 64)
+        decoded = Manifest.decode(manifest.encode())
+        self.assertEqual(decoded.encode(), manifest.encode())
+        self.assertEqual(decoded.ident, manifest.ident)
+        self.assertEqual(decoded.count, 79)
+
+    def test_parts_reassemble_in_any_order(self):
+        manifest = Manifest.fromFile(self.path, 16)
+        parts = manifest.parts(16)
+        self.assertTrue(len(parts) > 1)
+        received = _Parts(manifest.ident, len(parts))
+        for part in reversed(parts[1:]):
+            self.assertIsNone(received.add(part))
+        self.assertEqual(received.missing(), [0])
+        self.assertEqual(received.add(parts[0]).encode(), manifest.encode())
+
+    def test_status_round_trip(self):
+        missing = [0, 1, 2, 7, 9, 10]
+        self.assertEqual(_decodeStatus(_encodeStatus(42, missing)),
+                         (42, missing))
+
+
+class TransferTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.sim = Simulator(seed=2)
+        self.sim.addNode(1, (0, 0, 50), TxRate=13, RemoteAddr=2)
+        self.sim.addNode(2, (500, 0, 50), TxRate=13, RemoteAddr=1)
+        self.sender = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        self.receiver = ATM900('sim://2', 9600, transport=self.sim.port(2))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _transfer(self, size, chunkSize):
+        source = os.path.join(self.directory, 'source.bin')
+        with open(source, 'wb') as f:
+            f.write(_content(size))
+        target = os.path.join(self.directory, 'received')
+        os.mkdir(target)
+        self.receiver.read()
+        host = self.sim.spawn(receiveFile, self.receiver, target,
+                              timeout=120.0, linger=1.0)
+        # Frames span two simulated packets, each with its own overhead, so
+        # allow for the whole window in the poll timeout
+        manifest = sendFile(self.sender, source, chunkSize=chunkSize,
+                            timeout=60.0)
+        self.sim.sleep(5)
+        self.assertTrue(host.done)
+        self.assertIsNone(host.error)
+        with open(source, 'rb') as f:
+            with open(host.result, 'rb') as g:
+                self.assertTrue(f.read() == g.read())
+        return manifest
+
+    def test_small_file(self):
+        self._transfer(3000, 200)
+
+    def test_multi_megabyte_file(self):
+        # The CRC table alone is far more than one frame can hold
+        manifest = self._transfer(3 * 1024 * 1024, 480)
+        self.assertTrue(len(manifest.encode()) > 0xffff)
+        self.assertTrue(len(manifest.parts(480)) > 100)
+
+    def test_chunk_size_too_large(self):
+        source = os.path.join(self.directory, 'source.bin')
+        open(source, 'wb').close()
+        self.assertRaises(ValueError, sendFile, self.sender, source,
+                          chunkSize=70000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import struct
+import unittest
+
+from AcousticModem.framing import extractFrames, toBytes
+
+_HEADER = struct.Struct('>2sB')
+
+
+def _measure(buf):
+    if len(buf) < _HEADER.size:
+        return None
+    return _HEADER.size + buf[2] + 1
+
+
+def _check(frame):
+    return frame[-1:] == b'!'
+
+
+def _frame(payload, end=b'!'):
+    return _HEADER.pack(b'\x7eT', len(payload)) + payload + end
+
+
+class ExtractFramesTest(unittest.TestCase):
+    def test_skips_leading_bytes(self):
+        buf = bytearray(b'junk' + _frame(b'one') + _frame(b'two'))
+        self.assertEqual(extractFrames(buf, b'\x7eT', _measure, _check),
+                         [_frame(b'one'), _frame(b'two')])
+        self.assertEqual(buf, bytearray())
+
+    def test_keeps_incomplete_frame(self):
+        frame = _frame(b'payload')
+        buf = bytearray(frame[:5])
+        self.assertEqual(extractFrames(buf, b'\x7eT', _measure, _check), [])
+        buf.extend(frame[5:])
+        self.assertEqual(extractFrames(buf, b'\x7eT', _measure, _check),
+                         [frame])
+
+    def test_keeps_partial_magic(self):
+        buf = bytearray(b'abc\x7e')
+        extractFrames(buf, b'\x7eT', _measure)
+        self.assertEqual(buf, bytearray(b'\x7e'))
+
+    def test_resynchronises_after_corrupt_frame(self):
+        buf = bytearray(_frame(b'bad', b'?') + _frame(b'good'))
+        self.assertEqual(extractFrames(buf, b'\x7eT', _measure, _check),
+                         [_frame(b'good')])
+
+    def test_skips_corrupt_length(self):
+        # A magic inside a lost frame's payload, read as a frame header
+        bogus = _HEADER.pack(b'\x7eT', 200) + b'rest of lost frame'
+        buf = bytearray(bogus + _frame(b'one'))
+        self.assertEqual(extractFrames(buf, b'\x7eT', _measure, _check),
+                         [_frame(b'one')])
+        self.assertEqual(buf, bytearray())
+
+    def test_to_bytes(self):
+        self.assertEqual(toBytes(None), b'')
+        self.assertEqual(toBytes(bytearray(b'\xff')), b'\xff')
+        self.assertEqual(toBytes(u'\xff'), b'\xff')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import ModeError
+from AcousticModem.guard import calibrateGuard
+from AcousticModem.simulator import Simulator
+
+
+class CalibrateGuardTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100))
+        self.node.guard = 0.3
+        self.modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        self.directory = tempfile.mkdtemp()
+        self.cache = os.path.join(self.directory, 'guard.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_finds_shortest_guard(self):
+        guard = calibrateGuard(self.modem, resolution=0.02)
+        self.assertTrue(0.3 * 1.25 <= guard <= 0.32 * 1.25, guard)
+        self.assertEqual(self.modem.guardTime, guard)
+        self.assertTrue(self.node.configMode)
+        self.assertEqual(self.modem.LocalAddr, 1)
+
+    def test_cached_per_modem(self):
+        start = self.sim.now
+        guard = calibrateGuard(self.modem, cache=self.cache)
+        measuring = self.sim.now - start
+        self.modem.guardTime = 1.0
+        start = self.sim.now
+        self.assertEqual(calibrateGuard(self.modem, cache=self.cache), guard)
+        self.assertEqual(self.modem.guardTime, guard)
+        # Only the identity was read, without any escape trials
+        self.assertTrue(self.sim.now - start < measuring / 10, measuring)
+
+    def test_longest_guard_must_work(self):
+        self.node.guard = 1.5
+        self.assertRaises(ModeError, calibrateGuard, self.modem)
+
+
+if __name__ == '__main__':
+    unittest.main()
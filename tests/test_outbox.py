@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import ModeError
+from AcousticModem.outbox import Outbox
+from AcousticModem.simulator import Simulator
+
+
+class OutboxTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=3)
+        self.sim.addNode(1, (0, 0, 100))
+        self.sim.addNode(2, (1500, 0, 100))
+        self.local = ATM900('sim://1', 9600,
+                            transport=self.sim.port(1, 9600))
+        self.remote = ATM900('sim://2', 9600, transport=self.sim.port(2))
+        self.outbox = Outbox(self.local, probeTimeout=30)
+
+    def tearDown(self):
+        self.outbox.close()
+
+    def test_delivers_in_order(self):
+        self.remote.read()
+        self.outbox.send(2, b'one,')
+        self.outbox.send(2, b'two')
+        self.assertEqual(self.outbox.deliver(2), 2)
+        self.assertEqual(self.outbox.pending(), [])
+        self.sim.sleep(10)
+        self.assertEqual(self.remote.read(), 'one,two')
+
+    def test_rejected_command_dropped(self):
+        # The simulator doesn't implement remote commands and answers ERROR
+        self.outbox.command(2, 'remotePower', 2, 8)
+        self.outbox.send(2, b'after')
+        self.assertEqual(self.outbox.deliver(2), 1)
+        self.assertEqual(self.outbox.pending(), [])
+
+    def test_unreachable_node_keeps_items(self):
+        self.outbox.send(7, b'later')
+        self.assertEqual(self.outbox.deliver(7), 0)
+        items = self.outbox.pending(7)
+        self.assertEqual(len(items), 1)
+        self.assertEqual(items[0][5], 1)
+
+    def test_write_failure_keeps_items(self):
+        self.local.RemoteAddr = 2
+        # Host and modem no longer agree on the baud rate
+        self.local.modem.baudrate = 19200
+        self.assertRaises(ModeError, self.local.write, b'lost')
+        self.outbox.send(2, b'later')
+        self.assertEqual(self.outbox.deliver(2, probe=False), 0)
+        self.assertEqual(len(self.outbox.pending(2)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
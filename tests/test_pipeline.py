@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import ModemError
+from AcousticModem.simulator import Simulator
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100))
+        self.modem = ATM900('sim://1', 9600,
+                            transport=self.sim.port(1, 9600))
+
+    def test_replies_in_order(self):
+        results = self.modem.pipeline([('@TxPower', 4), '@TxPower',
+                                       '@NoSuchSetting', '@LocalAddr'])
+        self.assertEqual(len(results), 4)
+        self.assertFalse(isinstance(results[0], ModemError))
+        self.assertTrue('TxPower=4' in results[1])
+        self.assertTrue(isinstance(results[2], ModemError))
+        self.assertTrue('LocalAddr=1' in results[3])
+        self.assertEqual(self.node.settings['TxPower'], '4')
+
+    def test_port_1_baud_reopens(self):
+        results = self.modem.pipeline([('@P1Baud', 19200), '@LocalAddr'])
+        self.assertEqual(self.modem.baud_rate, 19200)
+        self.assertEqual(self.sim.port(1).baudrate, 19200)
+        self.assertTrue('LocalAddr=1' in results[1])
+
+    def test_port_2_baud_leaves_port_1(self):
+        results = self.modem.pipeline([('@P2Baud', 19200), '@LocalAddr'])
+        self.assertEqual(self.node.settings['P2Baud'], '19200')
+        self.assertEqual(self.node.settings['P1Baud'], '9600')
+        self.assertEqual(self.modem.baud_rate, 9600)
+        self.assertEqual(self.sim.port(1).baudrate, 9600)
+        self.assertTrue('LocalAddr=1' in results[1])
+
+    def test_port_2_baud_property(self):
+        self.modem.P2Baud = 57600
+        self.assertEqual(self.node.settings['P2Baud'], '57600')
+        self.assertEqual(self.modem.P1Baud, 9600)
+
+
+if __name__ == '__main__':
+    unittest.main()
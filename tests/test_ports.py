@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.ports import DualPort
+from AcousticModem.simulator import Simulator
+
+
+class DualPortTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=2)
+        self.ports = {}
+        for address, remote in ((1, 2), (2, 1)):
+            node = self.sim.addNode(address, ((address - 1) * 600.0, 0, 50),
+                                    RemoteAddr=remote)
+            modem = ATM900('sim://%d' % address, 9600,
+                           transport=self.sim.port(address))
+            self.ports[address] = DualPort(modem, node.port2)
+            self.ports[address].configure()
+        self.local, self.remote = self.ports[1], self.ports[2]
+        self.remote.poll()
+
+    def _receive(self):
+        self.sim.sleep(10)
+        return self.remote.read(1), self.remote.read(2)
+
+    def test_ports_kept_apart(self):
+        self.local.write(b'ctd', port=1)
+        self.local.write(b'adcp', port=2)
+        self.assertEqual(self._receive(), (b'ctd', b'adcp'))
+
+    def test_remote_port_chosen(self):
+        self.local.write(b'to port 2', remotePort=2)
+        self.assertEqual(self._receive(), (b'', b'to port 2'))
+        # Stays pointed there until changed
+        self.local.write(b'again')
+        self.assertEqual(self._receive(), (b'', b'again'))
+        self.local.write(b'back', remotePort=1)
+        self.assertEqual(self._receive(), (b'back', b''))
+
+    def test_partial_reads(self):
+        received = []
+        self.remote.onData = lambda port, data: received.append(port)
+        self.local.write(b'0123456789', port=2)
+        self.sim.sleep(10)
+        self.assertEqual(self.remote.read(2, 4), b'0123')
+        self.assertEqual(self.remote.read(2), b'456789')
+        self.assertEqual(received, [2])
+
+    def test_invalid_port(self):
+        self.assertRaises(ValueError, self.local.write, b'x', port=3)
+        self.assertRaises(ValueError, self.local.write, b'x', remotePort=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
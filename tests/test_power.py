@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem.errors import CommandError, NoResponseError
+from AcousticModem.power import PowerOptimiser
+
+
+class FakeLink(object):
+    """ A modem and its link to one remote. Link tests pass when both ends
+    transmit at 'needed' or above; remote commands are heard at 'heard' or
+    above, by default the same level.
+    """
+    def __init__(self, needed=3, level=8, failAfter=None, heard=None):
+        self.needed = needed
+        self.heard = needed if heard is None else heard
+        self.local = level
+        self.remote = level
+        self.failAfter = failAfter
+        self.remoteCommands = []
+        self.unheard = 0
+
+    @property
+    def TxPower(self):
+        return [self.local, '']
+
+    @TxPower.setter
+    def TxPower(self, level):
+        self.local = level
+
+    def remotePower(self, address, level):
+        self.remoteCommands.append(level)
+        if self.failAfter is not None and \
+                len(self.remoteCommands) > self.failAfter:
+            raise CommandError('Modem rejected AT$P%d,%d' % (address, level))
+        if self.local < self.heard:
+            self.unheard += 1
+            raise NoResponseError('No Response Received')
+        self.remote = level
+
+    def linkTest(self, address, timeout=None):
+        if min(self.local, self.remote) >= self.needed:
+            return {'ERR': '000', 'SNR': '20.0'}
+        return {'ERR': '012', 'SNR': '04.0'}
+
+
+class PowerOptimiserTest(unittest.TestCase):
+    def test_finds_lowest_level(self):
+        link = FakeLink(needed=3)
+        self.assertEqual(PowerOptimiser(link).optimise(2), 3)
+        self.assertEqual((link.local, link.remote), (3, 3))
+
+    def test_remote_commands_are_heard(self):
+        # Stepping up raises the local level before commanding the remote
+        link = FakeLink(needed=5)
+        self.assertEqual(PowerOptimiser(link).optimise(2), 5)
+        self.assertEqual(link.unheard, 0)
+
+    def test_nothing_passes(self):
+        link = FakeLink(needed=9, heard=1)
+        self.assertEqual(PowerOptimiser(link).optimise(2), 8)
+        self.assertEqual((link.local, link.remote), (8, 8))
+
+    def test_failure_restores_levels(self):
+        link = FakeLink(needed=3, level=6, failAfter=2)
+        optimiser = PowerOptimiser(link)
+        self.assertRaises(CommandError, optimiser.optimise, 2)
+        self.assertEqual(link.local, 6)
+
+    def test_cached_level(self):
+        link = FakeLink(needed=4)
+        optimiser = PowerOptimiser(link)
+        optimiser.optimise(2)
+        link.local = 8
+        commands = len(link.remoteCommands)
+        self.assertEqual(optimiser.apply(2), 4)
+        self.assertEqual(link.local, 4)
+        self.assertEqual(len(link.remoteCommands), commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
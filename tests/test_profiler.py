@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.profiler import MIN_PROBE, LinkProfiler, ProbeParser, \
+    ResultStore, distribution, encodeProbe
+from AcousticModem.simulator import Simulator
+
+
+class ProbeParserTest(unittest.TestCase):
+    def test_split_and_corrupt_probes(self):
+        parser = ProbeParser(32)
+        first = encodeProbe(1, 0, 10.5, 32)
+        corrupt = bytearray(encodeProbe(1, 1, 11.0, 32))
+        corrupt[-1] ^= 0xff
+        last = encodeProbe(1, 2, 11.5, 32)
+        data = b'noise' + first + bytes(corrupt) + last
+        probes = []
+        for n in range(0, len(data), 7):
+            probes.extend(parser.feed(data[n:n + 7]))
+        self.assertEqual([probe[:3] for probe in probes],
+                         [(1, 0, 10.5), (1, 2, 11.5)])
+        self.assertEqual(len(encodeProbe(0, 0, 0.0, 1)), MIN_PROBE)
+
+    def test_distribution(self):
+        self.assertIsNone(distribution([]))
+        summary = distribution([4, 1, 3, 2, 5])
+        self.assertEqual((summary['min'], summary['p50'], summary['max']),
+                         (1, 3, 5))
+        self.assertEqual(summary['mean'], 3.0)
+
+
+class LinkProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=4)
+        self.sim.addNode(1, (0, 0, 50), RemoteAddr=2, PktEcho='Ena')
+        self.sim.addNode(2, (750, 0, 50), RemoteAddr=1)
+        self.local = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        self.remote = ATM900('sim://2', 9600, transport=self.sim.port(2))
+        self.store = ResultStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_round_trips(self):
+        profiler = LinkProfiler(self.local, self.remote, count=5)
+        result = profiler.measure(32)
+        self.assertEqual((result['sent'], result['received'],
+                          result['echoed']), (5, 5, 5))
+        # 750 m each way at 1500 m/s
+        self.assertTrue(result['oneWay']['min'] >= 0.5)
+        self.assertTrue(result['roundTrip']['min'] >= 1.0)
+
+    def test_streaming_sweep(self):
+        profiler = LinkProfiler(self.local, self.remote, echo=False, count=5,
+                                store=self.store, label='bench')
+        results = profiler.sweep(rates=(8, 9), sizes=(1, 2))
+        self.assertEqual([(r['txRate'], r['pktSize']) for r in results],
+                         [(8, 1), (8, 2), (9, 1), (9, 2)])
+        self.assertTrue(all(r['loss'] == 0.0 for r in results))
+        self.assertEqual(len(self.store.history('bench')), 4)
+        self.assertTrue(self.store.best('bench') in
+                        [(r['txRate'], r['pktSize']) for r in results])
+        # Settings put back
+        self.assertEqual(self.local.TxRate[0], 8)
+        self.assertEqual(self.local.PktSize[0], 2)
+        self.assertEqual(self.local.PktEcho, True)
+
+    def test_streaming_needs_remote(self):
+        self.assertRaises(ValueError, LinkProfiler, self.local, echo=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
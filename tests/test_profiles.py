@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.profiles import PortProfiles
+from AcousticModem.simulator import Simulator
+
+
+class PortProfilesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.profiles = PortProfiles(os.path.join(self.directory,
+                                                  'profiles.json'))
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _open(self, baud_rate=9600, **kwargs):
+        return ATM900('sim://1', baud_rate, transport=self.sim.port(1),
+                      profiles=self.profiles, **kwargs)
+
+    def test_store_and_discard(self):
+        self.profiles.store('a', baudRate=9600, configMode=True)
+        self.assertEqual(self.profiles.get('a')['baudRate'], 9600)
+        self.assertIsNone(self.profiles.get('b'))
+        self.profiles.discard('a')
+        self.assertIsNone(self.profiles.get('a'))
+
+    def test_recorded_at_connect_and_close(self):
+        stored = []
+        store = self.profiles.store
+        self.profiles.store = lambda port, **state: \
+            stored.append(state) or store(port, **state)
+        modem = self._open()
+        self.assertEqual(self.profiles.get('sim://1')['configMode'], True)
+        # Mode switches don't rewrite the file
+        modem.read()
+        self.assertEqual(modem.LocalAddr, 1)
+        modem.read()
+        self.assertEqual(len(stored), 1)
+        modem.close()
+        profile = self.profiles.get('sim://1')
+        self.assertEqual(profile['configMode'], False)
+        self.assertFalse('echo' in profile)
+        self.assertEqual(len(stored), 2)
+
+    def test_reopen_from_profile(self):
+        # Left online by the last user of the port
+        modem = self._open()
+        modem.read()
+        modem.close()
+        self.assertFalse(self.node.configMode)
+        self.sim.port(1).open()
+        modem = self._open(None, lazy=True)
+        self.assertEqual(modem.LocalAddr, 1)
+        self.assertEqual(modem.baud_rate, 9600)
+
+    def test_stale_mode_checked(self):
+        self.profiles.store('sim://1', baudRate=9600, configMode=True)
+        # Put online by someone not keeping the profile
+        ATM900('sim://1', 9600, transport=self.sim.port(1)).read()
+        self.assertFalse(self.node.configMode)
+        modem = self._open(None, lazy=True)
+        self.assertEqual(modem.LocalAddr, 1)
+        self.assertTrue(self.node.configMode)
+
+    def test_stale_baud_rate_detected(self):
+        self.profiles.store('sim://1', baudRate=19200, configMode=True)
+        modem = self._open(None, lazy=True)
+        self.assertEqual(modem.LocalAddr, 1)
+        self.assertEqual(modem.baud_rate, 9600)
+        self.assertEqual(self.profiles.get('sim://1')['baudRate'], 9600)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import CommandError, ModeError, ModemError, \
+    NoResponseError
+from AcousticModem.simulator import Simulator
+
+
+class RecoveryTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100))
+        self.modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+
+    def test_resyncs_after_mode_drift(self):
+        self.assertEqual(self.modem.LocalAddr, 1)
+        # The modem went online without the host knowing
+        self.node.configMode = False
+        self.assertFalse(self.modem.online)
+        self.assertEqual(self.modem.LocalAddr, 1)
+        self.assertTrue(self.node.configMode)
+
+    def test_recovers_lost_baud_rate(self):
+        self.node.settings['P1Baud'] = '19200'
+        self.assertEqual(self.modem.recover(), 19200)
+        self.assertEqual(self.modem.baud_rate, 19200)
+        self.assertEqual(self.modem.LocalAddr, 1)
+
+    def test_unreachable_modem(self):
+        self.node.settings['P1Baud'] = '1234'
+        self.assertRaises(ModeError, self.modem.resync)
+        self.assertRaises(ModeError, self.modem.recover)
+        self.assertRaises(ModeError, getattr, self.modem, 'LocalAddr')
+
+    def test_data_io_fails_alike(self):
+        self.assertEqual(self.modem.LocalAddr, 1)
+        # Host and modem no longer agree on the baud rate
+        self.node.settings['P1Baud'] = '19200'
+        for call in (self.modem.read, self.modem.readline,
+                     lambda: self.modem.write(b'data')):
+            self.assertRaises(ModeError, call)
+            self.assertFalse(self.modem.online)
+
+    def test_rejected_command(self):
+        # The simulator doesn't implement remote commands
+        try:
+            self.modem.remotePower(2, 8)
+        except CommandError as error:
+            self.assertTrue(error.command.startswith('AT'))
+            self.assertEqual(error.response.status, 'ERROR')
+        else:
+            self.fail('CommandError not raised')
+        # The modem is still in step
+        self.assertEqual(self.modem.LocalAddr, 1)
+
+    def test_errors_are_io_errors(self):
+        for error in (ModeError, CommandError, NoResponseError):
+            self.assertTrue(issubclass(error, ModemError))
+            self.assertTrue(issubclass(error, IOError))
+
+
+if __name__ == '__main__':
+    unittest.main()
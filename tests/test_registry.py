@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from AcousticModem.registry import NodeRegistry, RemoteCache
+
+
+class FakeModem(object):
+    """ Counts the remote queries that reach it.
+    """
+    def __init__(self):
+        self.queries = 0
+        self.settings = []
+
+    def linkTest(self, address, timeout=None):
+        self.queries += 1
+        return {'Source': '%03d' % address, 'SNR': '21.5'}
+
+    def remoteRegister(self, address):
+        self.queries += 1
+        return ['TxPower=8', 'TxRate=9']
+
+    def remotePower(self, address, level):
+        self.settings.append(('TxPower', address, level))
+
+    def remoteRate(self, address, rate):
+        self.settings.append(('TxRate', address, rate))
+
+
+class NodeRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'nodes.db')
+        self.registry = NodeRegistry(self.path)
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.directory)
+
+    def test_nodes(self):
+        now = time.time()
+        self.registry.seen(4, snr=20.0, range=1500.0, when=now - 100)
+        self.registry.seen(7, when=now)
+        # Unmeasured values keep the last measurement
+        self.registry.seen(4, when=now - 50)
+        self.assertEqual(self.registry.get(4)['snr'], 20.0)
+        self.assertEqual(self.registry.get(4)['last_seen'], now - 50)
+        self.assertIsNone(self.registry.get(5))
+        self.assertEqual(self.registry.known(), [7, 4])
+        self.assertEqual(self.registry.known(maxAge=10), [7])
+
+    def test_identify(self):
+        self.registry.identify(4, serial=1234, firmware='2.1')
+        self.registry.identify(4, firmware='2.2')
+        self.assertEqual(self.registry.get(4)['serial'], 1234)
+        self.assertEqual(self.registry.address(1234), 4)
+        self.assertIsNone(self.registry.address(99))
+
+    def test_properties_persist(self):
+        self.registry.store(4, 'TxPower', 6)
+        self.registry.store(4, 'old', [1, 'two'], when=time.time() - 100)
+        self.registry.close()
+        self.registry = NodeRegistry(self.path)
+        self.assertEqual(self.registry.lookup(4, 'TxPower'), 6)
+        self.assertEqual(self.registry.lookup(4, 'old'), [1, 'two'])
+        self.assertEqual(self.registry.lookup(4, 'old', maxAge=10, default=0),
+                         0)
+        self.assertEqual(sorted(self.registry.properties(4)),
+                         ['TxPower', 'old'])
+
+    def test_upgrades_old_database(self):
+        self.registry.close()
+        os.remove(self.path)
+        db = sqlite3.connect(self.path)
+        db.execute('CREATE TABLE nodes (address INTEGER PRIMARY KEY, '
+                   'last_seen REAL, snr REAL, range REAL)')
+        db.execute('INSERT INTO nodes VALUES (4, 1.0, 10.0, 100.0)')
+        db.commit()
+        db.close()
+        self.registry = NodeRegistry(self.path)
+        self.registry.identify(4, serial=1234)
+        self.assertEqual(self.registry.get(4)['snr'], 10.0)
+        self.assertEqual(self.registry.address(1234), 4)
+
+
+class RemoteCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.modem = FakeModem()
+        self.registry = NodeRegistry()
+        self.cache = RemoteCache(self.modem, self.registry)
+
+    def tearDown(self):
+        self.registry.close()
+
+    def test_queries_answered_locally(self):
+        first = self.cache.linkTest(4)
+        self.assertEqual(self.cache.linkTest(4), first)
+        self.assertEqual(self.cache.remoteRegister(4),
+                         ['TxPower=8', 'TxRate=9'])
+        self.cache.remoteRegister(4)
+        self.assertEqual(self.modem.queries, 2)
+        # A fresh test records the node
+        self.assertEqual(self.registry.get(4)['snr'], 21.5)
+        self.cache.linkTest(4, maxAge=-1)
+        self.assertEqual(self.modem.queries, 3)
+
+    def test_settings_recorded(self):
+        self.assertIsNone(self.cache.power(4))
+        self.cache.remotePower(4, 5)
+        self.cache.remoteRate(4, 10)
+        self.assertEqual(self.modem.settings,
+                         [('TxPower', 4, 5), ('TxRate', 4, 10)])
+        self.assertEqual((self.cache.power(4), self.cache.rate(4)), (5, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
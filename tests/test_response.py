@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem.response import Response, native, number, pairs
+
+
+class ResponseTest(unittest.TestCase):
+    def test_setting(self):
+        response = Response('\r\n@TxRate\r\nTxRate=9 (2560 bps)\r\nOK\r\n',
+                            '@TxRate')
+        self.assertEqual(response.echo, '@TxRate')
+        self.assertEqual(response.name, 'TxRate')
+        self.assertEqual(response.value, '9')
+        self.assertEqual(response.code, 9)
+        self.assertEqual(response.label, '2560 bps')
+        self.assertEqual(response.status, 'OK')
+        self.assertTrue(response.ok)
+        # Still indexable as the reply's lines
+        self.assertEqual(response[1], 'TxRate=9 (2560 bps)')
+        self.assertEqual(len(response), 3)
+
+    def test_error(self):
+        response = Response('@Nothing\r\nError: unknown parameter\r\n',
+                            '@Nothing')
+        self.assertEqual(response.status, 'ERROR')
+        self.assertFalse(response.ok)
+        self.assertIsNone(response.value)
+
+    def test_text_value_and_extra_lines(self):
+        response = Response('Model: ATM-900\r\nVersion 2.1\r\n'
+                            'Serial 12345\r\nOK\r\n')
+        self.assertEqual(response.name, 'Model')
+        self.assertEqual(response.value, 'ATM-900')
+        self.assertIsNone(response.code)
+        self.assertEqual(response.extra, ['Version 2.1', 'Serial 12345'])
+
+    def test_no_status(self):
+        response = Response('')
+        # Like ''.split('\r\n'), which callers used to index
+        self.assertEqual(list(response), [''])
+        self.assertIsNone(response.status)
+        self.assertIsNone(response.value)
+
+
+class HelpersTest(unittest.TestCase):
+    def test_number(self):
+        self.assertEqual(number('Voltage 12.5 V'), 12.5)
+        self.assertEqual(number('Temp=-3 C'), -3)
+        self.assertTrue(isinstance(number('7'), int))
+        self.assertRaises(ValueError, number, 'none')
+        self.assertRaises(ValueError, number, None)
+
+    def test_pairs(self):
+        self.assertEqual(pairs('SNR:21.5 ERR:0 Source:004'),
+                         {'SNR': '21.5', 'ERR': '0', 'Source': '004'})
+
+    def test_native(self):
+        for data in (b'\xb0C', bytearray(b'\xb0C'), u'\xb0C'):
+            text = native(data)
+            self.assertTrue(isinstance(text, str))
+            self.assertEqual(len(text), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
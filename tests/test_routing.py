@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.routing import FRAME_ACK, FRAME_DATA, NeighbourTable, \
+    Router, decodeFrames, encodeFrame
+from AcousticModem.simulator import Simulator
+
+
+class FakeModem(object):
+    """ Returns queued input and records what is written, on a clock of
+    its own.
+    """
+    def __init__(self, *received):
+        self.received = list(received)
+        self.written = []
+        self.RemoteAddr = None
+        self.now = 0.0
+
+    def read(self):
+        return self.received.pop(0) if self.received else ''
+
+    def write(self, data):
+        self.written.append((self.RemoteAddr, data))
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FrameTest(unittest.TestCase):
+    def test_round_trip(self):
+        frame = encodeFrame(FRAME_DATA, 1, 3, 70000, [2, 3], b'payload')
+        self.assertEqual(decodeFrames(bytearray(frame)),
+                         [(FRAME_DATA, 1, 3, 70000 & 0xffff, [2, 3],
+                           b'payload')])
+
+    def test_stream(self):
+        first = encodeFrame(FRAME_DATA, 1, 2, 5, [2], b'\x7eR inside')
+        ack = encodeFrame(FRAME_ACK, 2, 1, 5)
+        buf = bytearray(b'noise' + first + b'\x7e' + ack)
+        frames = decodeFrames(buf[:len(buf) - 3])
+        self.assertEqual(frames, [(FRAME_DATA, 1, 2, 5, [2], b'\x7eR inside')])
+        frames = decodeFrames(buf)
+        self.assertEqual([frame[0] for frame in frames],
+                         [FRAME_DATA, FRAME_ACK])
+        self.assertEqual(buf, bytearray())
+
+    def test_corrupt_frames_skipped(self):
+        good = encodeFrame(FRAME_DATA, 1, 2, 6, [2], b'good')
+        # A corrupt hop count or length no longer stalls the stream
+        for position in (7, 10, 12):
+            bad = bytearray(encodeFrame(FRAME_DATA, 1, 2, 5, [2], b'bad'))
+            bad[position] ^= 0x40
+            buf = bytearray(bytes(bad) + good)
+            self.assertEqual(decodeFrames(buf),
+                             [(FRAME_DATA, 1, 2, 6, [2], b'good')])
+
+
+class RouterTest(unittest.TestCase):
+    def test_acks_matched_on_source(self):
+        table = NeighbourTable()
+        table.setCost(1, 2, 1.0)
+        # Relay 2 acknowledging message 1 from node 5, then message 2 from
+        # node 1
+        modem = FakeModem(encodeFrame(FRAME_ACK, 5, 1, 1, [2]))
+        router = Router(modem, 1, table, ackTimeout=1.0, retries=1)
+        self.assertRaises(IOError, router.send, 2, b'data')
+        modem.received.append(encodeFrame(FRAME_ACK, 1, 1, 2, [2]))
+        table.setCost(1, 2, 1.0)
+        self.assertEqual(router.send(2, b'data'), [1, 2])
+
+    def test_delivers_when_forwarding_fails(self):
+        messages = []
+        passOn = encodeFrame(FRAME_DATA, 1, 3, 1, [2, 3], b'for 3')
+        forUs = encodeFrame(FRAME_DATA, 1, 2, 2, [2], b'for 2')
+        modem = FakeModem(passOn + forUs)
+        router = Router(modem, 2, ackTimeout=1.0, retries=1,
+                        onMessage=lambda source, data: messages.append(data))
+        self.assertRaises(IOError, router.poll)
+        self.assertEqual(messages, [b'for 2'])
+        self.assertEqual(list(router.delivered), [(1, b'for 2')])
+        # Both were acknowledged to node 1, and the relay tried node 3
+        self.assertEqual([address for address, data in modem.written],
+                         [1, 1, 3])
+        self.assertEqual(len(router.buffers()['outgoing']), 1)
+        router.reset()
+        self.assertEqual(router.poll(), [])
+
+
+class RelayTest(unittest.TestCase):
+    """ Three nodes in a line, 1 reaching 3 through 2.
+    """
+    def setUp(self):
+        self.sim = Simulator(seed=4)
+        table = NeighbourTable()
+        self.routers = {}
+        self.messages = []
+        for address in (1, 2, 3):
+            self.sim.addNode(address, ((address - 1) * 2000.0, 0, 50),
+                             TxRate=10)
+            modem = ATM900('sim://%d' % address, 9600,
+                           transport=self.sim.port(address))
+            self.routers[address] = Router(
+                modem, address, table, ackTimeout=10.0,
+                onMessage=lambda source, data: self.messages.append(data))
+        table.setCost(1, 2, 1.0)
+        table.setCost(2, 3, 1.0)
+        # The hosts of the relay and destination poll their routers
+        self.running = True
+        self.hosts = [self.sim.spawn(self._serve, self.routers[address])
+                      for address in (2, 3)]
+
+    def tearDown(self):
+        self.running = False
+        self.sim.sleep(5)
+        for host in self.hosts:
+            self.assertTrue(host.done)
+            self.assertIsNone(host.error)
+
+    def _serve(self, router):
+        while self.running:
+            router.poll()
+            router.modem.sleep(0.5)
+
+    def test_delivers_through_relay(self):
+        route = self.routers[1].send(3, b'reading 42')
+        self.assertEqual(route, [1, 2, 3])
+        self.sim.sleep(30)
+        self.assertEqual(self.messages, [b'reading 42'])
+
+    def test_retransmission_delivered_once(self):
+        router = self.routers[1]
+        router.send(3, b'once')
+        self.sim.sleep(30)
+        # The first acknowledgement was lost, so the frame is sent again
+        frame = encodeFrame(FRAME_DATA, 1, 3, router._sequence, [2, 3],
+                            b'once')
+        acks = len(router._acks)
+        router.modem.write(frame)
+        self.sim.sleep(30)
+        router._receive()
+        self.assertEqual(self.messages, [b'once'])
+        self.assertEqual(len(router._acks), acks + 1)
+
+    def test_uses_simulated_time(self):
+        self.sim.node(2).settings['LocalAddr'] = '9'
+        start = self.sim.now
+        self.assertRaises(IOError, self.routers[1].send, 3, b'lost')
+        # Three attempts of ten seconds each, none of them real
+        self.assertTrue(self.sim.now - start >= 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
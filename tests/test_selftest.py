@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.selftest import loopbackTest
+from AcousticModem.simulator import Simulator
+
+
+class LoopbackTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=2)
+        self.node = self.sim.addNode(1, (0, 0, 100), PktEcho='Ena',
+                                     RemoteAddr=4)
+        self.modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+
+    def test_probes_come_back(self):
+        echo = []
+        write = self.modem.write
+
+        def record(data):
+            echo.append(self.node.settings['PktEcho'])
+            return write(data)
+        self.modem.write = record
+        result = loopbackTest(self.modem, delay=200, count=10)
+        self.assertEqual(result['received'], 10)
+        self.assertEqual(result['loss'], 0.0)
+        self.assertTrue(result['latency']['min'] >= 0.2)
+        # Echo is off while probing and the settings are put back after
+        self.assertEqual(set(echo), set(['Dis']))
+        self.assertEqual(self.node.settings['PktEcho'], 'Ena')
+        self.assertEqual(self.node.settings['SimAcDly'], '0')
+        self.assertEqual(self.node.settings['RemoteAddr'], '4')
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, loopbackTest, self.modem, size=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem.commandqueue import CommandQueue
+from AcousticModem.demux import Demultiplexer
+from AcousticModem.routing import Router
+from AcousticModem.session import Session, SessionLimits
+
+
+class FakeModem(object):
+    maxResponse = None
+
+    def temp(self):
+        return 20.0
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        self.session = Session(FakeModem(),
+                               SessionLimits(history=4, maxPending=2,
+                                             maxLine=32))
+
+    def test_limits_applied(self):
+        router = Router(None, 1)
+        router.delivered.extend(range(10))
+        self.session.attach(router)
+        self.assertEqual(list(router.delivered), [6, 7, 8, 9])
+        router.delivered.append(10)
+        self.assertEqual(len(router.delivered), 4)
+        queue = self.session.attach(CommandQueue(FakeModem(), start=False))
+        self.assertEqual(queue.maxPending, 2)
+        demux = self.session.attach(Demultiplexer())
+        self.assertEqual(demux.maxLine, 32)
+
+    def test_reset(self):
+        router = self.session.attach(Router(None, 1))
+        router.delivered.append((2, b'message'))
+        queue = self.session.attach(CommandQueue(FakeModem(), start=False))
+        future = queue.submit('temp')
+        demux = self.session.attach(Demultiplexer())
+        demux.feed(b'held back\r\nSNR')
+        self.session.command('temp')
+        self.session.reset()
+        self.assertEqual(len(self.session.history), 0)
+        self.assertEqual(len(router.delivered), 0)
+        self.assertTrue(future.cancelled())
+        self.assertEqual(queue.buffers()['heap'], [])
+        self.assertEqual(demux.buffers()['buffer'], bytearray())
+
+    def test_report(self):
+        self.session.attach(Router(None, 1))
+        self.session.attach(Demultiplexer())
+        self.session.attach(object())
+        report = self.session.report()
+        for name in ('Router0.delivered', 'Router0.acks', 'Router0.seen',
+                     'Demultiplexer1.buffer', 'history', 'rss'):
+            self.assertTrue(name in report, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.simulator import Simulator
+
+
+class SimulatorTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.sim.addNode(1, (0, 0, 100))
+        self.sim.addNode(2, (1500, 0, 100))
+
+    def test_link_test(self):
+        modem = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        result = modem.linkTest(2, timeout=30)
+        self.assertEqual(result['ERR'], '000')
+        self.assertEqual(self.sim.stats['delivered'], 2)
+
+    def test_data_between_nodes(self):
+        local = ATM900('sim://1', 9600, transport=self.sim.port(1))
+        remote = ATM900('sim://2', 9600, transport=self.sim.port(2))
+        local.RemoteAddr = 2
+        # Put the remote modem online first
+        remote.read()
+        local.write(b'hello')
+        self.sim.sleep(10)
+        self.assertEqual(remote.read(), 'hello')
+
+    def test_spawned_programs_take_turns(self):
+        events = []
+
+        def program(name, period):
+            for n in range(3):
+                events.append((self.sim.now, name))
+                self.sim.sleep(period)
+            return name
+
+        a = self.sim.spawn(program, 'a', 1.0)
+        b = self.sim.spawn(program, 'b', 1.5)
+        self.sim.sleep(10)
+        self.assertEqual(events, [(0.0, 'a'), (0.0, 'b'), (1.0, 'a'),
+                                  (1.5, 'b'), (2.0, 'a'), (3.0, 'b')])
+        self.assertTrue(a.done and b.done)
+        self.assertEqual((a.result, b.result), ('a', 'b'))
+
+    def test_spawned_program_errors_are_kept(self):
+        def program():
+            self.sim.sleep(1)
+            raise ValueError('failed')
+
+        process = self.sim.spawn(program)
+        self.sim.sleep(2)
+        self.assertTrue(process.done)
+        self.assertTrue(isinstance(process.error, ValueError))
+
+
+if __name__ == '__main__':
+    unittest.main()
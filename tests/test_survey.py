@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+    from AcousticModem.survey import Survey, SurveyTable, parseRateTest
+except ImportError:
+    np = None
+
+
+def _lines(errors, snr=20.0):
+    """ rateTest output with 'errors' bit errors in each mode.
+    """
+    return ['MOD:%d ERR:%03d SNR:%.1f AGC:030 SPD:+00.0 CCERR:000'
+            % (mode, error, snr) for mode, error in enumerate(errors)]
+
+
+class FakeModem(object):
+    """ Modes 2 and 3 need power 5 or more to node 4; node 6 never answers.
+    """
+    def __init__(self):
+        self.TxPower = 8
+        self.remote = {}
+
+    def remotePower(self, address, level):
+        if address == 6:
+            raise IOError('No response from node 6')
+        self.remote[address] = level
+
+    def rateTest(self, address):
+        power = self.remote[address]
+        strong = power >= 5 and self.TxPower >= 5
+        return _lines([0, 0, 0 if strong else 3, 0 if strong else 9],
+                      snr=power * 3.0)
+
+
+@unittest.skipIf(np is None, 'NumPy is not installed')
+class SurveyTest(unittest.TestCase):
+    def test_parse(self):
+        rows = parseRateTest(['noise'] + _lines([0, 2]))
+        self.assertEqual(rows.shape, (2, 6))
+        self.assertEqual(rows[1].tolist(), [1, 2, 20.0, 30, 0.0, 0])
+        self.assertEqual(parseRateTest([]).shape, (0, 6))
+
+    def test_sweep(self):
+        results = []
+        survey = Survey(FakeModem(), [4, 6], powers=[2, 8], repeats=2,
+                        onResult=lambda *args: results.append(args[:3]))
+        table = survey.run()
+        self.assertEqual(len(results), 8)
+        self.assertEqual(table.err.shape, (2, 2, 4, 2))
+        success = table.successRate()
+        self.assertEqual(success[0, 0].tolist(), [1.0, 1.0, 0.0, 0.0])
+        self.assertEqual(success[0, 1].tolist(), [1.0] * 4)
+        # Node 6 never answered
+        self.assertTrue(np.isnan(table.err[1]).all())
+        self.assertTrue(np.isnan(success[1]).all())
+        self.assertEqual(table.bestMode().tolist(), [3, -1])
+        self.assertEqual(table.throughput({0: 1, 1: 2, 2: 4, 3: 8})[0]
+                         .tolist(), [2.0, 8.0])
+        self.assertEqual(table.snrPercentiles(q=(50,))[0, 0].tolist(),
+                         [15.0] * 4)
+
+    def test_save_and_load(self):
+        directory = tempfile.mkdtemp()
+        try:
+            table = SurveyTable([4], [8])
+            table.record(4, 8, 0, _lines([0, 1, 0, 0]), when=100.0)
+            path = os.path.join(directory, 'survey.npz')
+            table.save(path)
+            loaded = SurveyTable.load(path)
+            self.assertEqual(loaded.addresses, [4])
+            self.assertEqual(loaded.time[0, 0, 0], 100.0)
+            self.assertEqual(loaded.err[0, 0, :, 0].tolist(), [0, 1, 0, 0])
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.simulator import Simulator
+from AcousticModem.telemetry import Schema, TelemetryCodec, \
+    TelemetryDecoder, cobsDecode, cobsEncode, crc16, decodeVarint, \
+    encodeVarint
+
+CTD = Schema(1, [('depth', 'u32', 100), ('temperature', 'i16', 1000),
+                 ('salinity', 'f32'), ('count', 'u64')], name='ctd')
+STATUS = Schema(300, [('voltage', 'u16', 100), ('fault', 'u8')])
+
+READING = {'depth': 123.45, 'temperature': -1.5, 'salinity': 35.25,
+           'count': 1 << 40}
+
+
+class EncodingTest(unittest.TestCase):
+    def test_crc16(self):
+        self.assertEqual(crc16(b'123456789'), 0x29b1)
+
+    def test_varint_round_trip(self):
+        out = bytearray()
+        values = [0, 1, 127, 128, 300, (1 << 64) - 1]
+        for value in values:
+            encodeVarint(value, out)
+        pos = 0
+        for value in values:
+            decoded, pos = decodeVarint(out, pos)
+            self.assertEqual(decoded, value)
+        self.assertEqual(pos, len(out))
+        self.assertRaises(ValueError, decodeVarint, bytearray(b'\x80'), 0)
+
+    def test_cobs_round_trip(self):
+        for data in (b'', b'\x00', b'\x00\x00', b'ab\x00cd',
+                     bytes(bytearray(range(1, 256))) * 2 + b'\x00x'):
+            encoded = cobsEncode(data)
+            self.assertFalse(0 in encoded)
+            self.assertEqual(cobsDecode(encoded), bytearray(data))
+
+
+class CodecTest(unittest.TestCase):
+    def setUp(self):
+        self.codec = TelemetryCodec([CTD, STATUS])
+
+    def test_round_trip(self):
+        record = self.codec.encode('ctd', READING)
+        self.assertEqual(record[-1:], b'\x00')
+        self.assertFalse(b'\x00' in record[:-1])
+        decoded = self.codec.decode(record[:-1])
+        self.assertEqual(decoded.schema, CTD)
+        self.assertEqual(decoded.values, READING)
+        decoded = self.codec.decode(
+            self.codec.encode(300, {'voltage': 12.5, 'fault': 0})[:-1])
+        self.assertEqual(decoded['voltage'], 12.5)
+
+    def test_out_of_range(self):
+        values = dict(READING, temperature=40.0)
+        self.assertRaises(ValueError, self.codec.encode, 'ctd', values)
+        self.assertRaises(KeyError, self.codec.encode, 'ctd', {'depth': 1})
+
+    def test_corrupt_record(self):
+        record = bytearray(self.codec.encode('ctd', READING)[:-1])
+        record[3] ^= 0x01
+        self.assertRaises(ValueError, self.codec.decode, bytes(record))
+
+    def test_fixed_size(self):
+        codec = TelemetryCodec([CTD, STATUS], fixedSize=True)
+        records = [codec.encode('ctd', READING),
+                   codec.encode(300, {'voltage': 3.3, 'fault': 2})]
+        self.assertEqual([len(record) for record in records],
+                         [codec.recordSize()] * 2)
+        decoded = TelemetryDecoder(codec).feed(b''.join(records))
+        self.assertEqual([record.schema for record in decoded],
+                         [CTD, STATUS])
+
+
+class DecoderTest(unittest.TestCase):
+    def setUp(self):
+        self.codec = TelemetryCodec([CTD, STATUS])
+        self.records = []
+        self.decoder = TelemetryDecoder(self.codec, self.records.append)
+
+    def test_split_reads(self):
+        data = self.codec.encode('ctd', READING) * 3
+        for n in range(0, len(data), 5):
+            self.decoder.feed(data[n:n + 5])
+        self.assertEqual([record.values for record in self.records],
+                         [READING] * 3)
+
+    def test_resynchronises_after_corruption(self):
+        record = self.codec.encode('ctd', READING)
+        self.decoder.feed(b'noise' + record[4:] + record)
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.decoder.errors, 1)
+
+    def test_over_the_air(self):
+        sim = Simulator(seed=5)
+        sim.addNode(1, (0, 0, 50), RemoteAddr=2)
+        sim.addNode(2, (800, 0, 50))
+        local = ATM900('sim://1', 9600, transport=sim.port(1))
+        remote = ATM900('sim://2', 9600, transport=sim.port(2))
+        remote.read()
+        for n in range(3):
+            self.codec.send(local, 'ctd', dict(READING, count=n))
+        sim.sleep(20)
+        self.decoder.poll(remote)
+        self.assertEqual([record['count'] for record in self.records],
+                         [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+import socket
+import threading
+import time
+import unittest
+
+from AcousticModem import ATM900
+from AcousticModem.errors import NoResponseError
+from AcousticModem.simulator import Simulator
+from AcousticModem.transport import LoopbackTransport, \
+    ReconnectingTransport, TCPTransport, TransportPool
+
+
+class ByteTransport(LoopbackTransport):
+    """ Only takes bytes, like a pyserial 3 port on Python 3.
+    """
+    def write(self, data):
+        if not isinstance(data, bytes):
+            raise TypeError('unicode strings are not supported')
+        LoopbackTransport.write(self, data)
+
+
+class FakeDevice(threading.Thread):
+    """ Answers a host in real time like a modem in config mode, replying
+    to link tests after 'delay' seconds.
+    """
+    def __init__(self, port, delay=0.0):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.port = port
+        self.delay = delay
+        self.settings = {'TxRate': '9', 'LocalAddr': '1'}
+        self.running = True
+        self.start()
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def run(self):
+        line = ''
+        while self.running:
+            line += self.port.read(1)
+            if line.endswith('+++'):
+                line = ''
+                self.port.write(b'\r\nOK\r\n')
+            elif line.endswith('\r\n'):
+                self._command(line.strip())
+                line = ''
+
+    def _command(self, command):
+        name, equals, value = command[1:].partition('=')
+        if command == 'ATO':
+            reply = 'Online'
+        elif command.startswith('ATX'):
+            time.sleep(self.delay)
+            reply = ('Source:%03d Destination:001 Range:1500.0\r\n'
+                     'ERR:000 SNR:20.5 AGC:42 SPD:+00.0 CCERR:000' %
+                     int(command[3:]))
+        elif command.startswith('@') and equals:
+            self.settings[name] = value
+            reply = 'OK'
+        elif command.startswith('@') and name in self.settings:
+            reply = '%s=%s\r\nOK' % (name, self.settings[name])
+        else:
+            reply = 'ERROR'
+        self.port.write(('\r\n%s\r\n' % reply).encode('ascii'))
+
+
+class LoopbackTransportTest(unittest.TestCase):
+    def test_reads_native_strings(self):
+        a, b = LoopbackTransport.pair(timeout=0)
+        a.write(b'OK\r\nmore')
+        self.assertEqual(b.readline(), 'OK\r\n')
+        self.assertEqual(b.read(b.inWaiting()), 'more')
+        b.write('text')
+        self.assertEqual(a.read(4), 'text')
+
+
+
+class RealTimeModemTest(unittest.TestCase):
+    """ A modem answering in real time, not simulated time.
+    """
+    def setUp(self):
+        host, port = ByteTransport.pair(timeout=0.05)
+        self.device = FakeDevice(port, delay=1.0)
+        self.modem = ATM900('loop://', 9600, transport=host, lazy=True)
+        self.modem.guardTime = 0.1
+
+    def tearDown(self):
+        self.device.stop()
+
+    def test_commands(self):
+        self.assertEqual(self.modem.TxRate[0], 9)
+        self.modem.LocalAddr = 7
+        self.assertEqual(self.device.settings['LocalAddr'], '7')
+
+    def test_link_test_waits_for_reply(self):
+        start = time.time()
+        result = self.modem.linkTest(4, timeout=5.0)
+        self.assertEqual(result['Source'], '004')
+        self.assertTrue(time.time() - start >= 1.0)
+
+    def test_link_test_times_out(self):
+        self.device.delay = 3.0
+        start = time.time()
+        self.assertRaises(NoResponseError, self.modem.linkTest, 4,
+                          timeout=0.5)
+        self.assertTrue(time.time() - start >= 0.5)
+
+
+class TCPTransportTest(unittest.TestCase):
+    def test_reads_native_strings(self):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+
+        def serve():
+            client, _ = server.accept()
+            client.sendall(client.recv(64).upper())
+            client.close()
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        transport = TCPTransport('127.0.0.1', server.getsockname()[1])
+        try:
+            transport.write(b'at\r\n')
+            self.assertEqual(transport.readline(), 'AT\r\n')
+        finally:
+            transport.close()
+            thread.join()
+            server.close()
+
+
+class SharedTransportTest(unittest.TestCase):
+    def setUp(self):
+        self.sim = Simulator(seed=1)
+        self.node = self.sim.addNode(1, (0, 0, 100), RemoteAddr=2)
+        self.sim.addNode(2, (500, 0, 100))
+
+    def _reopen(self, *args):
+        port = self.sim.port(1)
+        port.open()
+        return port
+
+    def test_mode_restored_after_reconnect(self):
+        transport = ReconnectingTransport(self._reopen, 9600, backoff=0)
+        modem = ATM900('sim://1', 9600, transport=transport)
+        modem.read()
+        # The modem restarts in config mode while the port is down
+        self.sim.port(1).close()
+        self.node.configMode = True
+        modem.write(b'data')
+        self.assertEqual(transport.reconnects, 1)
+        self.assertFalse(self.node.configMode)
+        self.assertTrue(modem.online)
+        self.assertEqual(self.node.settings['RemoteAddr'], '2')
+
+    def test_pooled_port_released(self):
+        pool = TransportPool(opener=self._reopen)
+        first = ATM900('sim://1', 9600, pool=pool)
+        second = ATM900('sim://1', 9600, pool=pool)
+        first.close()
+        first.close()
+        self.assertTrue(self.sim.port(1).isOpen())
+        self.assertEqual(second.LocalAddr, 1)
+        second.close()
+        self.assertFalse(self.sim.port(1).isOpen())
+
+
+if __name__ == '__main__':
+    unittest.main()